@@ -0,0 +1,400 @@
+import argparse, csv, glob, itertools, os, re
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from configure import resolve_config
+
+def main():
+    args = parse_args()
+    # the logs of a run are named after the hash of its configuration 日志目录以配置哈希命名
+    args.config = resolve_config(args.config)
+    run = analyze_run(args.config, args.work_dir, args.output_dir or f'results/{args.config}',
+                      args.format, args.chunk_lines)
+    print_run_summary(run)
+
+def parse_args(test_args=None):
+    """
+    Parsing command-line arguments 解析命令行参数
+    >>> args = parse_args(['_test_', '--format', 'npy'])
+    >>> args.config, args.work_dir, args.output_dir, args.format, args.chunk_lines
+    ('_test_', '/tmp/minindn', None, 'npy', 200000)
+    """
+    parser = argparse.ArgumentParser(description="Analysis of the cwnd, RTT and application logs of a run")
+
+    parser.add_argument('config', help='the configuration of the run, the message given to configure.py or its hash')
+    parser.add_argument('-w', '--work-dir', default='/tmp/minindn', help='Mini-NDN working directory of the run')
+    parser.add_argument('-o', '--output-dir', default=None, help='output directory, default is results/<config>')
+    parser.add_argument('-f', '--format', default='npy', choices=['npy', 'parquet'],
+                        help='format of the time series store, parquet requires pyarrow')
+    parser.add_argument('--chunk-lines', type=int, default=CHUNK_LINES,
+                        help='number of log lines read at once, bounds the memory usage')
+
+    return parser.parse_args(test_args)
+
+CHUNK_LINES = 200000
+# Columns written by the StatisticsCollector of the pipelines, time in s and RTT in ms
+CWND_COLUMNS = ['time', 'cwndsize']
+RTT_COLUMNS = ['segment', 'rtt', 'rttvar', 'srtt', 'rto']
+# Log spaced RTT histogram from 1 us to 1000 s, percentiles are within 0.3% of the exact value
+RTT_BINS = np.logspace(-3, 6, 4001)
+THROUGHPUT_UNITS = {'bit/s': 1, 'kbit/s': 1e3, 'Mbit/s': 1e6, 'Gbit/s': 1e9, 'Tbit/s': 1e12}
+
+def read_columns(path, n_columns, chunk_lines=CHUNK_LINES):
+    """
+    Stream a tab separated log as float64 arrays of at most chunk_lines rows 分块读取日志
+    The header and incomplete or malformed lines, e.g. the last line of a running app, are skipped.
+    >>> with open('_test_.txt', 'w') as f:
+    ...     _ = f.write("time\\tcwndsize\\n0.1\\t2\\n0.2\\t3\\n0.3\\tbad\\n0.4\\t4\\n0.5")
+    >>> [chunk.tolist() for chunk in read_columns('_test_.txt', 2, chunk_lines=2)]
+    [[[0.1, 2.0]], [[0.2, 3.0]], [[0.4, 4.0]]]
+    >>> os.remove('_test_.txt')
+    """
+    with open(path, 'r', errors='replace') as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_lines))
+            if not lines:
+                return
+            try:
+                chunk = np.loadtxt(lines, dtype=np.float64, ndmin=2)
+            except ValueError:
+                # Only chunks holding the header or a malformed line take the slow path
+                rows = [row for row in (line.split() for line in lines) if len(row) == n_columns]
+                chunk = np.array([values for values in map(_to_floats, rows) if values is not None],
+                                 dtype=np.float64)
+            if len(chunk) and chunk.size == len(chunk) * n_columns:
+                yield chunk.reshape(-1, n_columns)
+
+def _to_floats(row):
+    try:
+        return [float(value) for value in row]
+    except ValueError:
+        return None
+
+class SeriesStore(object):
+    """
+    Columnar store of a log, written chunk by chunk: one .npy file per column, or one parquet file
+    """
+    def __init__(self, path, columns, fmt='npy'):
+        if fmt == 'parquet' and pq is None:
+            raise ImportError('Writing parquet files requires pyarrow')
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        if fmt == 'parquet':
+            schema = pa.schema([(column, pa.float64()) for column in columns])
+            self.writer = pq.ParquetWriter(f'{path}.parquet', schema)
+        else:
+            # The row count is only known at the end, columns are appended to raw files first
+            self.raw_files = [open(f'{path}.{column}.raw', 'wb') for column in columns]
+
+    def append(self, chunk):
+        self.rows += len(chunk)
+        if self.fmt == 'parquet':
+            self.writer.write_table(pa.table({column: chunk[:, i] for i, column in enumerate(self.columns)}))
+        else:
+            for i, raw_file in enumerate(self.raw_files):
+                np.ascontiguousarray(chunk[:, i]).tofile(raw_file)
+
+    def close(self, chunk_lines=CHUNK_LINES):
+        if self.fmt == 'parquet':
+            self.writer.close()
+            return
+        for column, raw_file in zip(self.columns, self.raw_files):
+            raw_file.close()
+            raw_path = f'{self.path}.{column}.raw'
+            array = np.lib.format.open_memmap(f'{self.path}.{column}.npy', mode='w+',
+                                              dtype=np.float64, shape=(self.rows,))
+            for start in range(0, self.rows, chunk_lines):
+                count = min(chunk_lines, self.rows - start)
+                array[start:start + count] = np.fromfile(raw_path, dtype=np.float64, count=count,
+                                                         offset=start * 8)
+            array.flush()
+            del array
+            os.remove(raw_path)
+
+class CwndStats(object):
+    """
+    Congestion window dynamics accumulated over chunks 拥塞窗口统计
+    >>> stats = CwndStats()
+    >>> stats.update(np.array([[0.0, 2.0], [1.0, 4.0]]))
+    >>> stats.update(np.array([[2.0, 2.0], [4.0, 3.0]]))
+    >>> stats.result()
+    {'samples': 4, 'duration': 4.0, 'cwnd_mean': 2.5, 'cwnd_max': 4.0, 'cwnd_final': 3.0, 'cwnd_decreases': 1}
+    """
+    def __init__(self):
+        self.samples = 0
+        self.first = None
+        self.last = None
+        self.weighted_sum = 0.0
+        self.maximum = -np.inf
+        self.decreases = 0
+
+    def update(self, chunk):
+        if self.last is not None:
+            chunk = np.vstack([self.last, chunk])
+        else:
+            self.first = chunk[0, 0]
+        times, cwnd = chunk[:, 0], chunk[:, 1]
+        # The window holds its value until the next change
+        self.weighted_sum += float(np.sum(np.diff(times) * cwnd[:-1]))
+        self.decreases += int(np.count_nonzero(np.diff(cwnd) < 0))
+        self.maximum = max(self.maximum, float(cwnd.max()))
+        self.samples += len(chunk) - (1 if self.last is not None else 0)
+        self.last = chunk[-1:]
+
+    def result(self):
+        if not self.samples:
+            return {'samples': 0}
+        duration = float(self.last[0, 0] - self.first)
+        return {'samples': self.samples, 'duration': duration,
+                'cwnd_mean': self.weighted_sum / duration if duration > 0 else float(self.last[0, 1]),
+                'cwnd_max': self.maximum, 'cwnd_final': float(self.last[0, 1]),
+                'cwnd_decreases': self.decreases}
+
+class RttStats(object):
+    """
+    RTT distribution accumulated over chunks in a fixed size histogram RTT统计
+    >>> stats = RttStats()
+    >>> stats.update(np.array([[i, rtt, 1, rtt, 200] for i, rtt in enumerate(range(1, 101))], dtype=float))
+    >>> result = stats.result()
+    >>> result['samples'], result['rtt_min'], result['rtt_max'], result['rtt_mean'], result['rto_max']
+    (100, 1.0, 100.0, 50.5, 200.0)
+    >>> [round(result[f'rtt_p{p}']) for p in (50, 90, 99)]
+    [50, 90, 99]
+    """
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self.histogram = np.zeros(len(RTT_BINS) + 1, dtype=np.int64)
+        self.samples = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.rto_maximum = -np.inf
+        self.srtt_final = None
+
+    def update(self, chunk):
+        rtt = chunk[:, 1]
+        self.histogram += np.bincount(np.searchsorted(RTT_BINS, rtt), minlength=len(self.histogram))
+        self.samples += len(rtt)
+        self.total += float(rtt.sum())
+        self.minimum = min(self.minimum, float(rtt.min()))
+        self.maximum = max(self.maximum, float(rtt.max()))
+        self.rto_maximum = max(self.rto_maximum, float(chunk[:, 4].max()))
+        self.srtt_final = float(chunk[-1, 3])
+
+    def merge(self, other):
+        self.histogram += other.histogram
+        self.samples += other.samples
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.rto_maximum = max(self.rto_maximum, other.rto_maximum)
+
+    def percentile(self, p):
+        # Geometric middle of the bin holding the p-th percentile, clamped to the observed range
+        index = int(np.searchsorted(np.cumsum(self.histogram), p / 100 * self.samples))
+        low = RTT_BINS[index - 1] if index > 0 else self.minimum
+        high = RTT_BINS[index] if index < len(RTT_BINS) else self.maximum
+        return float(min(max(np.sqrt(low * high), self.minimum), self.maximum))
+
+    def result(self):
+        if not self.samples:
+            return {'samples': 0}
+        result = {'samples': self.samples, 'rtt_min': self.minimum, 'rtt_max': self.maximum,
+                  'rtt_mean': self.total / self.samples}
+        for p in self.PERCENTILES:
+            result[f'rtt_p{p}'] = self.percentile(p)
+        result['srtt_final'] = self.srtt_final
+        result['rto_max'] = self.rto_maximum
+        return result
+
+def analyze_series(path, columns, stats, store_path=None, fmt='npy', chunk_lines=CHUNK_LINES):
+    """
+    Stream a cwnd or RTT log into its statistics and, if store_path is given, a columnar store 处理时间序列日志
+    >>> with open('_test_.txt', 'w') as f:
+    ...     _ = f.write("time\\tcwndsize\\n0\\t2\\n1\\t4\\n2\\t2\\n")
+    >>> analyze_series('_test_.txt', CWND_COLUMNS, CwndStats(), '_test_', chunk_lines=2)['cwnd_mean']
+    3.0
+    >>> np.load('_test_.cwndsize.npy').tolist()
+    [2.0, 4.0, 2.0]
+    >>> for path in ['_test_.txt', '_test_.time.npy', '_test_.cwndsize.npy']:
+    ...     os.remove(path)
+    """
+    store = SeriesStore(store_path, columns, fmt) if store_path else None
+    for chunk in read_columns(path, len(columns), chunk_lines):
+        stats.update(chunk)
+        if store:
+            store.append(chunk)
+    if store:
+        store.close(chunk_lines)
+    return stats.result()
+
+SUMMARY_PATTERNS = {
+    'time_elapsed': re.compile(r'Time elapsed: ([\d.eE+-]+)'),
+    'segments_received': re.compile(r'Segments received: (\d+)'),
+    'transferred_kb': re.compile(r'Transferred size: ([\d.eE+-]+) kB'),
+    'goodput': re.compile(r'Goodput: ([\d.eE+-]+) ([kMGT]?bit/s)'),
+    'timeouts': re.compile(r'Timeouts: (\d+)'),
+    'congestion_marks': re.compile(r'Congestion marks: (\d+)'),
+    'retransmitted': re.compile(r'Retransmitted segments: (\d+) \(([\d.eE+-]+)%\)'),
+}
+
+def parse_app_log(path):
+    """
+    Sum the transfer summaries an application printed into its log 解析应用日志中的传输摘要
+    Returns None when the log holds no summary, e.g. for producers.
+    >>> with open('_test_.log', 'w') as f:
+    ...     for elapsed, size in [(2, 1000), (1, 500)]:
+    ...         _ = f.write(f"All segments of chunk0 of flow /a have been received.\\n"
+    ...                     f"Time elapsed: {elapsed} seconds\\nSegments received: 100\\n"
+    ...                     f"Transferred size: {size} kB\\nGoodput: {size * 8 / elapsed:f} kbit/s\\n"
+    ...                     f"Congestion marks: 0 (caused 0 window decreases)\\n"
+    ...                     f"Timeouts: 5 (caused 2 window decreases)\\n"
+    ...                     f"Retransmitted segments: 5 (4.7619%), skipped: 0\\n")
+    >>> summary = parse_app_log('_test_.log')
+    >>> summary['transfers'], summary['transferred_kb'], summary['goodput_bps'], summary['timeouts']
+    (2, 1500.0, 4000000.0, 10)
+    >>> round(summary['retransmission_rate'], 4), summary['goodput_mean_bps']
+    (0.0476, 4000000.0)
+    >>> with open('_test_.log', 'a') as f:
+    ...     _ = f.write("Time elapsed: 1 seconds\\nSegments received: 100\\nTransferred size: 500 kB\\n"
+    ...                 "Goodput: 4000 kbit/s\\nRetransmitted segments: 0 (0%), skipped: 0\\n")
+    >>> round(parse_app_log('_test_.log')['retransmission_rate'], 4)
+    0.0323
+    >>> os.remove('_test_.log')
+    """
+    totals = dict.fromkeys(['transfers', 'time_elapsed', 'segments_received', 'transferred_kb',
+                            'timeouts', 'congestion_marks', 'retransmitted', 'sent'], 0)
+    goodputs = []
+    received = None
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            for key, pattern in SUMMARY_PATTERNS.items():
+                match = pattern.search(line)
+                if not match:
+                    continue
+                if key == 'goodput':
+                    goodputs.append(float(match.group(1)) * THROUGHPUT_UNITS[match.group(2)])
+                    totals['transfers'] += 1
+                elif key == 'retransmitted':
+                    retransmitted, percentage = int(match.group(1)), float(match.group(2))
+                    totals['retransmitted'] += retransmitted
+                    # Transfers without retransmission only sent the segments they received
+                    totals['sent'] += round(retransmitted * 100 / percentage) if percentage > 0 \
+                                      else received or 0
+                    received = None
+                elif key in ('time_elapsed', 'transferred_kb'):
+                    totals[key] += float(match.group(1))
+                elif key == 'segments_received':
+                    # A summary without retransmission line counts what it received as sent
+                    totals['sent'] += received or 0
+                    received = int(match.group(1))
+                    totals[key] += received
+                else:
+                    totals[key] += int(match.group(1))
+                break
+
+    if not totals['transfers']:
+        return None
+    sent = totals.pop('sent') + (received or 0)
+    totals['goodput_bps'] = totals['transferred_kb'] * 8e3 / totals['time_elapsed'] \
+                            if totals['time_elapsed'] else 0.0
+    totals['goodput_mean_bps'] = sum(goodputs) / len(goodputs)
+    totals['retransmission_rate'] = totals['retransmitted'] / sent if sent else 0.0
+    return totals
+
+def analyze_run(config, work_dir, output_dir, fmt='npy', chunk_lines=CHUNK_LINES):
+    """
+    Analyze the logs of every node of a run and write the time series stores and summary.csv 分析整个运行
+    >>> for name, text in [('con0/logs/_test_/con-cwnd.txt', "time\\tcwndsize\\n0\\t2\\n2\\t4\\n"),
+    ...                    ('con0/logs/_test_/con-rtt.txt', "segment\\trtt\\trttvar\\tsrtt\\trto\\n0\\t10\\t1\\t10\\t200\\n"),
+    ...                    ('con0/log/consumer.log', "Time elapsed: 2 seconds\\nSegments received: 10\\n"
+    ...                                              "Transferred size: 100 kB\\nGoodput: 400 kbit/s\\n"),
+    ...                    ('pro0/log/pro0.log', "serving\\n")]:
+    ...     os.makedirs(os.path.dirname(f'_test_work_/{name}'), exist_ok=True)
+    ...     with open(f'_test_work_/{name}', 'w') as f:
+    ...         _ = f.write(text)
+    >>> run = analyze_run('_test_', '_test_work_', '_test_results_')
+    >>> [(row['node'], row['source'], row['kind']) for row in run['rows']]
+    [('con0', 'con-cwnd', 'cwnd'), ('con0', 'con-rtt', 'rtt'), ('con0', 'consumer', 'app')]
+    >>> run['goodput_bps'], run['rtt_p50'], sorted(os.listdir('_test_results_/con0'))
+    (400000.0, 10.0, ['con-cwnd.cwndsize.npy', 'con-cwnd.time.npy', 'con-rtt.rto.npy', 'con-rtt.rtt.npy', 'con-rtt.rttvar.npy', 'con-rtt.segment.npy', 'con-rtt.srtt.npy'])
+    >>> os.path.exists('_test_results_/summary.csv')
+    True
+    >>> import shutil; shutil.rmtree('_test_work_'); shutil.rmtree('_test_results_')
+    """
+    rows = []
+    run_rtt = RttStats()
+    for node in sorted(os.listdir(work_dir)):
+        node_dir = os.path.join(work_dir, node)
+        if not os.path.isdir(node_dir):
+            continue
+
+        # log-cwnd and log-rtt paths of configure.py are relative to the home directory of the node
+        for path in sorted(glob.glob(f'{node_dir}/logs/{config}/*.txt')):
+            source = os.path.basename(path)[:-len('.txt')]
+            if source.endswith('-cwnd'):
+                kind, columns, stats = 'cwnd', CWND_COLUMNS, CwndStats()
+            elif source.endswith('-rtt'):
+                kind, columns, stats = 'rtt', RTT_COLUMNS, RttStats()
+            else:
+                continue
+            os.makedirs(f'{output_dir}/{node}', exist_ok=True)
+            result = analyze_series(path, columns, stats, f'{output_dir}/{node}/{source}', fmt, chunk_lines)
+            if kind == 'rtt' and stats.samples:
+                run_rtt.merge(stats)
+            rows.append(dict(node=node, source=source, kind=kind, **result))
+
+        # Logs of the applications started with Application.start
+        for path in sorted(glob.glob(f'{node_dir}/log/*.log')):
+            summary = parse_app_log(path)
+            if summary:
+                rows.append(dict(node=node, source=os.path.basename(path)[:-len('.log')], kind='app', **summary))
+
+    os.makedirs(output_dir, exist_ok=True)
+    write_summary(rows, f'{output_dir}/summary.csv')
+
+    apps = [row for row in rows if row['kind'] == 'app']
+    cwnds = [row for row in rows if row['kind'] == 'cwnd' and row['samples']]
+    transferred = sum(row['transferred_kb'] for row in apps)
+    elapsed = sum(row['time_elapsed'] for row in apps)
+    run = {'config': config, 'rows': rows, 'nodes': len({row['node'] for row in rows}),
+           'transfers': sum(row['transfers'] for row in apps), 'transferred_kb': transferred,
+           'goodput_bps': transferred * 8e3 / elapsed if elapsed else 0.0,
+           'retransmitted': sum(row['retransmitted'] for row in apps),
+           'cwnd_mean': sum(row['cwnd_mean'] for row in cwnds) / len(cwnds) if cwnds else None,
+           'cwnd_decreases': sum(row['cwnd_decreases'] for row in cwnds)}
+    run.update({key: value for key, value in run_rtt.result().items() if key.startswith('rtt_')})
+    return run
+
+def write_summary(rows, path):
+    columns = []
+    for row in rows:
+        columns += [key for key in row if key not in columns]
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_run_summary(run):
+    print(f"------ Run {run['config']} ------")
+    print(f"nodes: {run['nodes']}, transfers: {run['transfers']}, transferred: {run['transferred_kb']:.1f} kB")
+    print(f"goodput: {run['goodput_bps'] / 1e6:.3f} Mbit/s, retransmitted segments: {run['retransmitted']}")
+    if 'rtt_p50' in run:
+        print(f"RTT p50/p90/p99: {run['rtt_p50']:.2f}/{run['rtt_p90']:.2f}/{run['rtt_p99']:.2f} ms")
+    if run['cwnd_mean'] is not None:
+        print(f"mean cwnd: {run['cwnd_mean']:.2f}, window decreases: {run['cwnd_decreases']}")
+    for row in run['rows']:
+        if row['kind'] == 'app':
+            print(f"{row['node']}/{row['source']}: {row['goodput_bps'] / 1e6:.3f} Mbit/s, "
+                  f"retransmission rate {row['retransmission_rate'] * 100:.2f}%")
+
+if __name__ == "__main__":
+    main()
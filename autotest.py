@@ -1,6 +1,8 @@
-import argparse, os, sys
+import argparse, json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from time import sleep
-from mininet.log import setLogLevel, info
+from mininet.log import setLogLevel, info, warn
 
 from minindn.minindn import Minindn
 from minindn.util import MiniNDNCLI
@@ -8,23 +10,55 @@ from minindn.apps.app_manager import AppManager
 from minindn.apps.nfd import Nfd
 from minindn.apps.nlsr import Nlsr
 from minindn.apps.application import Application
+from minindn.helpers.experiment import Experiment
+from minindn.helpers.scenario import Scenario
+from minindn.helpers.teardown import Teardown
+
+from configure import resolve_config
 
 def main():
     args = parse_args()
     sys.argv = []  # Clear sys.argv to prevent interference with Mininet
-    
+
+    # configure.py names configurations by hash, messages are looked up in its index
+    args.message, args.config = args.config, resolve_config(args.config)
     detect_test_config(args)
     print_test_config(args)
     ndn = start_server(args)
-    start_nodes(args, ndn)
-    MiniNDNCLI(ndn.net)
+    apps = start_nodes(args, ndn)
+    if not args.headless:
+        MiniNDNCLI(ndn.net)
+        return
+    sys.exit(run_headless(args, ndn, apps))
 
 
 def parse_args(test_args=None):
     parser = argparse.ArgumentParser(description="A parser for arguments of autotest.py")
 
-    parser.add_argument('config', help='the specified configuration, equals to directory name')
+    parser.add_argument('config', help='the specified configuration, the message given to configure.py or its hash')
     parser.add_argument('-a', '--algorithm', default='aimd', help='web server algorithm: aimd, rubic')
+    parser.add_argument('--probe-timeout', type=float, default=60,
+                        help='seconds to wait for a node of a startup tier to become ready')
+    parser.add_argument('--probe-interval', type=float, default=0.2,
+                        help='seconds between two readiness probes')
+    parser.add_argument('--ready-log-line', default=None,
+                        help='line producers and aggregators log once ready, probed in addition to their FIB prefix')
+
+    headless_group = parser.add_argument_group('Headless run')
+    headless_group.add_argument('--headless', action='store_true',
+                                help='stop the experiment once the consumer completed instead of opening the CLI')
+    headless_group.add_argument('--timeout', type=float, default=3600,
+                                help='seconds after which a headless run is stopped if the consumer did not complete')
+    headless_group.add_argument('--done-log-line', default=None,
+                                help='line of consumer.log marking completion, in addition to the consumer exiting')
+    headless_group.add_argument('--result-dir', default=None,
+                                help='directory the results of the run are moved to once it is stopped')
+    headless_group.add_argument('--work-dir', default=None,
+                                help='Mini-NDN working directory of the run, /tmp/minindn by default')
+    headless_group.add_argument('--scenario', default=None,
+                                help='timeline of link and node failures run while the consumer fetches, see Scenario')
+    headless_group.add_argument('--seed', type=int, default=0,
+                                help='seed drawing the random targets of the scenario')
 
     return parser.parse_args(test_args)
 
@@ -35,21 +69,94 @@ def print_test_config(args):
     print("starting autotest with the following configuration: \n")
     return None
 
+def wait_until(probe, timeout, interval):
+    """
+    Poll probe() until it returns True, returns the time it took or None on timeout 轮询直到就绪
+    >>> wait_until(lambda: True, 1, 0.01) < 1
+    True
+    >>> wait_until(lambda: False, 0.05, 0.01) is None
+    True
+    """
+    start = time.time()
+    while not probe():
+        if time.time() - start + interval > timeout:
+            return None
+        sleep(interval)
+    return time.time() - start
+
+def log_contains(logfile, text):
+    """
+    Check whether an application log file contains a line 检查日志文件是否包含指定内容
+    >>> with open('_test_.log', 'w') as f:
+    ...     _ = f.write("starting\\nready to serve\\n")
+    >>> log_contains('_test_.log', 'ready'), log_contains('_test_.log', 'done'), log_contains('_none_.log', 'ready')
+    (True, False, False)
+    >>> os.remove('_test_.log')
+    """
+    try:
+        with open(logfile, 'r', errors='replace') as f:
+            return any(text in line for line in f)
+    except IOError:
+        return False
+
+def launch_tier(tier, nodes, launch, probe, args):
+    """
+    Launch every node of a startup tier concurrently and wait for all of them to pass their
+    readiness probe. Returns the critical path time of the tier, i.e. the slowest node.
+    启动同一层的所有节点并等待其就绪
+    """
+    if not nodes:
+        return 0.0
+    start = time.time()
+
+    def launch_and_probe(node):
+        launch(node)
+        ready = wait_until(lambda: probe(node), args.probe_timeout, args.probe_interval)
+        if ready is None:
+            warn(f'[{node.name}] not ready after {args.probe_timeout} seconds ({tier})\n')
+        return time.time() - start
+
+    with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+        critical_path = max(executor.map(launch_and_probe, nodes))
+    info(f'Tier {tier}: {len(nodes)} node(s) ready in {critical_path:.2f}s\n')
+    return critical_path
+
+def print_startup_report(report):
+    info('------ Startup critical path ------\n')
+    for tier, duration in report.items():
+        info(f'{tier:<14} {duration:8.2f}s\n')
+    info(f'{"total":<14} {sum(report.values()):8.2f}s\n')
+
 def start_server(args):
     relative_path = f"./configure/{args.config}/web.conf"
     setLogLevel('info')
     Minindn.cleanUp()
     Minindn.verifyDependencies()
 
-    ndn = Minindn(topoFile=relative_path)
+    ndn = Minindn(topoFile=relative_path, workDir=args.work_dir)
+    if args.result_dir is not None:
+        Minindn.resultDir = os.path.abspath(args.result_dir)
 
     ndn.start()
+    ndn.startupReport = {}
 
     info('Starting NFD on nodes\n')
+    start = time.time()
     nfds = AppManager(ndn, ndn.net.hosts, Nfd)
+    ndn.appManagers = {'nfd': nfds}
+    # NFD is ready once its unix socket exists
+    for nfd in nfds:
+        if wait_until(lambda: os.path.exists(nfd.sockFile), args.probe_timeout, args.probe_interval) is None:
+            warn(f'[{nfd.node.name}] NFD socket {nfd.sockFile} missing after {args.probe_timeout} seconds\n')
+    ndn.startupReport['nfd'] = time.time() - start
+
     info('Starting NLSR on nodes\n')
+    start = time.time()
     nlsrs = AppManager(ndn, ndn.net.hosts, Nlsr)
-    sleep(10)
+    ndn.appManagers['nlsr'] = nlsrs
+    # NLSR is ready once every router and site prefix is in every FIB
+    Experiment.waitForConvergence(ndn, ndn.net.hosts, args.probe_timeout, args.probe_interval)
+    ndn.startupReport['nlsr'] = time.time() - start
 
     return ndn
 
@@ -59,30 +166,153 @@ def start_nodes(args, ndn):
     consumer = ndn.net['con0']
     aggregators = [h for h in ndn.net.hosts if h.name.startswith('agg')]
     producers = [h for h in ndn.net.hosts if h.name.startswith('pro')]
-    
+    report = getattr(ndn, 'startupReport', {})
+    apps = {}
+
+    def app_ready(node):
+        # Application is ready once its prefix is registered in the local FIB
+        if f'/{node.name}' not in Experiment.getFibPrefixes(node):
+            return False
+        if args.ready_log_line is None:
+            return True
+        return log_contains(f'{apps[node.name].logDir}/{node.name}.log', args.ready_log_line)
+
     # 启动生产者
     producer_path = os.path.abspath(f'./exec/putapps/producer')
-    for pro in producers:
+    def start_producer(pro):
         info(f'Starting Producer {pro.name}\n')
-        Application(pro).start(f'{producer_path} --prefix /{pro.name} --config {relative_path}/proconfig.ini', f'{pro.name}.log')
-        sleep(5)
+        apps[pro.name] = Application(pro)
+        apps[pro.name].start(f'{producer_path} --prefix /{pro.name} --config {relative_path}/proconfig.ini', f'{pro.name}.log')
+    report['producers'] = launch_tier('producers', producers, start_producer, app_ready, args)
     
     # 启动聚合器
     agg_path = os.path.abspath(f'./exec/aggapps/aggregator')
-    for agg in aggregators:
+    def start_aggregator(agg):
         info(f'Starting Aggregator {agg.name}\n')
-        Application(agg).start(f'{agg_path} --prefix /{agg.name} --config {relative_path}/aggregatorput.ini', f'{agg.name}.log')
-        sleep(5)
+        apps[agg.name] = Application(agg)
+        apps[agg.name].start(f'{agg_path} --prefix /{agg.name} --config {relative_path}/aggregatorput.ini', f'{agg.name}.log')
+    report['aggregators'] = launch_tier('aggregators', aggregators, start_aggregator, app_ready, args)
     
-    # 通告路由
-    for node in producers + aggregators:
-        node.cmd(f'nlsrc advertise /{node.name}')
-        sleep(2)
+    # 通告路由, advertisement is done once the prefix reached the consumer's FIB
+    consumer_lock = Lock()
+    def advertised(node):
+        # Mininet nodes cannot run commands from several threads at once
+        with consumer_lock:
+            return f'/{node.name}' in Experiment.getFibPrefixes(consumer)
+    report['advertise'] = launch_tier('advertise', producers + aggregators,
+                                      lambda node: node.cmd(f'nlsrc advertise /{node.name}'),
+                                      advertised, args)
     
     # 启动消费者
     info('Starting Consumer\n')
     consumer_path = os.path.abspath(f'./exec/catapps/consumer')
-    Application(consumer).start(f'{consumer_path} --config {relative_path}/conconfig.ini', 'consumer.log')
+    apps[consumer.name] = Application(consumer)
+    apps[consumer.name].start(f'{consumer_path} --config {relative_path}/conconfig.ini', 'consumer.log')
+
+    print_startup_report(report)
+    return apps
+
+def wait_for_completion(process, logfile, done_log_line, timeout, interval=1):
+    """
+    Wait until the consumer exits or logs done_log_line, returns the status and the waited time 等待消费者完成
+    >>> class Process:
+    ...     def __init__(self, code): self.code = code
+    ...     def poll(self): return self.code
+    >>> wait_for_completion(Process(0), '_none_.log', None, 1, 0.01)[0]
+    'exited'
+    >>> with open('_test_.log', 'w') as f:
+    ...     _ = f.write("fetching\\ndone\\n")
+    >>> wait_for_completion(Process(None), '_test_.log', 'done', 1, 0.01)[0]
+    'log'
+    >>> wait_for_completion(Process(None), '_test_.log', 'never', 0.05, 0.01)[0]
+    'timeout'
+    >>> os.remove('_test_.log')
+    """
+    status = {}
+
+    def completed():
+        if process.poll() is not None:
+            status['status'] = 'exited'
+        elif done_log_line is not None and log_contains(logfile, done_log_line):
+            status['status'] = 'log'
+        return bool(status)
+
+    waited = wait_until(completed, timeout, interval)
+    if waited is None:
+        return 'timeout', timeout
+    return status['status'], waited
+
+def collect_exit_codes(apps, app_managers):
+    """
+    Exit code of every application, None for the ones still running 收集各应用的退出码
+    >>> from types import SimpleNamespace
+    >>> app = lambda name, code: SimpleNamespace(node=SimpleNamespace(name=name), process=SimpleNamespace(poll=lambda: code))
+    >>> collect_exit_codes({'con0': app('con0', 0), 'pro0': app('pro0', None)}, {'nfd': [app('con0', 1)]})
+    {'apps': {'con0': 0, 'pro0': None}, 'nfd': {'con0': 1}}
+    """
+    exit_codes = {'apps': {name: app.process.poll() if app.process else None for name, app in apps.items()}}
+    for kind, manager in app_managers.items():
+        exit_codes[kind] = {app.node.name: app.process.poll() if app.process else None for app in manager}
+    return exit_codes
+
+def start_scenario(args, ndn, apps):
+    """
+    Run the failure scenario in the background while the consumer fetches 后台运行故障场景
+    Every segment the consumer receives is a line of its RTT log, which measures the throughput.
+    """
+    consumer = ndn.net['con0']
+    scenario = Scenario(ndn, args.scenario, apps=dict(getattr(ndn, 'appManagers', {}), app=apps), seed=args.seed,
+                        throughputLogs=[f'{consumer.params["params"]["homeDir"]}/logs/{args.config}/*-rtt.txt'])
+    scenario.start()
+    return scenario
+
+def run_headless(args, ndn, apps):
+    """
+    Wait for the consumer, stop the experiment and write run-summary.json, returns the exit status 无界面运行
+    """
+    consumer = apps['con0']
+    consumer_log = consumer.logfile.name
+    scenario = start_scenario(args, ndn, apps) if args.scenario else None
+    info(f'Waiting for the consumer to complete, at most {args.timeout} seconds\n')
+    status, duration = wait_for_completion(consumer.process, consumer_log, args.done_log_line, args.timeout)
+    if status == 'timeout':
+        warn(f'Consumer did not complete after {args.timeout} seconds, stopping the run\n')
+    if scenario is not None:
+        # Events after the completion of the consumer are not run
+        scenario.stop()
+        scenario.join()
+
+    exit_codes = collect_exit_codes(apps, getattr(ndn, 'appManagers', {}))
+    # Imported here so that the interactive mode does not depend on numpy
+    from analyze import parse_app_log
+    transfers = (parse_app_log(consumer_log) if os.path.exists(consumer_log) else None) or {}
+    summary = {
+        'config': args.config,
+        'message': args.message,
+        'algorithm': args.algorithm,
+        'status': status,
+        'duration': duration,
+        'timeout': args.timeout,
+        'bytes_fetched': int(transfers.get('transferred_kb', 0) * 1000),
+        'transfers': transfers.get('transfers', 0),
+        'goodput_bps': transfers.get('goodput_bps', 0.0),
+        'retransmission_rate': transfers.get('retransmission_rate', 0.0),
+        'startup': getattr(ndn, 'startupReport', {}),
+        'exit_codes': exit_codes,
+        'result_dir': Minindn.resultDir,
+        'scenario': scenario.results if scenario is not None else None,
+    }
+    # Written before stopping so that it is moved to the result directory with the logs
+    summary_file = f'{Minindn.workDir}/run-summary.json'
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+    info(f'Run summary written to {summary_file}\n')
+
+    # Applications started directly are not part of the Mini-NDN cleanups, all are signaled at once
+    Teardown.stopApplications(apps.values())
+    ndn.stop()
+
+    return 0 if status != 'timeout' and exit_codes['apps'][consumer.node.name] in (0, None) else 1
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
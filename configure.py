@@ -1,11 +1,28 @@
-import os, argparse, sys, shutil, yaml, csv, configparser
-def main():
-    args = parse_args()
+import os, argparse, sys, shutil, yaml, csv, configparser, fcntl, hashlib, json
+
+# maps the messages given to configure.py to the hash of their configuration 消息到配置哈希的索引
+INDEX_FILE = 'configure/index.yaml'
+
+def main(test_args=None):
+    """
+    Generate the configuration bundle of the inputs unless it is cached, returns its hash 生成或复用配置
+    """
+    args = parse_args(test_args)
     print_args(args)
-    generate_config_directory(args)
-    save_args(args)
-    generate_node_config(args)
-    generate_general_config(args)
+
+    # bundles are keyed by their normalized inputs, the message only points to one 配置以输入的哈希为键
+    key = config_hash(normalize_inputs(args, read_structure(args.structure)))
+    bundle = argparse.Namespace(**dict(vars(args), message=key, init_cwnd=str(float(args.init_cwnd))))
+    if bundle_exists(key):
+        print(f"Reusing cached configuration \"configure/{key}\"")
+    else:
+        generate_config_directory(bundle)
+        generate_node_config(bundle)
+        generate_general_config(bundle)
+        # args.yaml is written last and marks the bundle as complete 最后写入args.yaml标记配置完整
+        save_args(bundle)
+    update_index(args.message, key, args.yes)
+    return key
 
 def parse_args(test_args=None):
     """
@@ -19,6 +36,10 @@ def parse_args(test_args=None):
     '2MB'
     >>> args.total_size
     '100MB'
+    >>> args.algorithms, args.pipeline_type, args.init_cwnd, args.yes
+    (['aimd', 'rubic'], 'hybla', '2.0', False)
+    >>> parse_args(['structure.file', '--algorithms', 'cubic', '--init-cwnd', '10', '-y']).algorithms
+    ['cubic']
     """
 
     from datetime import datetime
@@ -33,7 +54,15 @@ def parse_args(test_args=None):
     chunk_group = parser.add_argument_group('Chunk configuration')
     chunk_group.add_argument('--chunk-size', default='1MB', help='size of a single chunk')
     chunk_group.add_argument('--total-size', default='10MB', help='size of the total file')
-    
+
+    # Add pipeline arguments 添加拥塞控制相关参数
+    pipeline_group = parser.add_argument_group('Pipeline configuration')
+    pipeline_group.add_argument('--algorithms', nargs='+', default=['aimd', 'rubic'],
+                                help='algorithms to generate a directory for, used as pipeline type of the aggregators')
+    pipeline_group.add_argument('--pipeline-type', default='hybla', help='pipeline type of the consumer')
+    pipeline_group.add_argument('--init-cwnd', default='2.0', help='initial congestion window of the consumer and aggregators')
+
+    parser.add_argument('-y', '--yes', action='store_true', help='point an existing message to a new configuration without asking')
     parser.add_argument('-m', '--message', default=timestamp_str, help='message to mark the configuration, default is localtime (e.g. test, bw100-loss1)')
 
     # Default: reading from argv except passing in list 不传入参数:默认从argv中获取
@@ -48,13 +77,15 @@ def print_args(args):
     structure: _test_.csv
     message: _test_
     chunk_size: 2MB, total_size: 100MB
+    algorithms: aimd rubic, pipeline_type: hybla, init_cwnd: 2.0
     <BLANKLINE>
     """
 
     print('------ Arguments ------')
     print(f"structure: {args.structure}")
     print(f'message: {args.message}')
-    print(f"chunk_size: {args.chunk_size}, total_size: {args.total_size}\n")
+    print(f"chunk_size: {args.chunk_size}, total_size: {args.total_size}")
+    print(f"algorithms: {' '.join(args.algorithms)}, pipeline_type: {args.pipeline_type}, init_cwnd: {args.init_cwnd}\n")
 
 def generate_config_directory(args):
     """
@@ -83,22 +114,108 @@ def generate_config_directory(args):
     if not os.path.exists(args.structure):
         FileNotFoundError(f"Structure file {args.structure} does not exist")
 
-    # create directory if not exists 如果目录不存在则创建
+    # an existing directory is a bundle whose generation was interrupted 已存在的目录是未完成的配置
     if os.path.exists(relative_path):
-        result = input(f"Directory \"{relative_path}\" exists, do you want to rewrite it? (Y/N)\n")
-        result = result.upper()
-        if (result == "Y" or result == "YES"):
-            print(f"Cleaning files in Directory \"{relative_path}\"")
-
-            # equals to "rm -rf {relative_path}" 等价于递归删除目录
-            shutil.rmtree(relative_path)   
-        else:
-            print("Execution terminated")
-            sys.exit()
-    
+        print(f"Cleaning files in Directory \"{relative_path}\"")
+
+        # equals to "rm -rf {relative_path}" 等价于递归删除目录
+        shutil.rmtree(relative_path)
+
     os.makedirs(relative_path + '/algorithm')
-    os.makedirs(relative_path + '/algorithm/aimd')
-    os.makedirs(relative_path + '/algorithm/rubic')            
+    for algorithm in args.algorithms:
+        os.makedirs(relative_path + f'/algorithm/{algorithm}')
+
+def read_structure(path):
+    """
+    Read the rows of a structure csv file, ignoring empty lines 读取结构文件的所有行
+    >>> with open('_test_.csv', 'w') as f:
+    ...     _ = f.write("from,to,bw\\r\\ncon0,agg0,100\\n\\n")
+    >>> read_structure('_test_.csv')
+    [['from', 'to', 'bw'], ['con0', 'agg0', '100']]
+    >>> os.remove('_test_.csv')
+    """
+    with open(path, 'r', newline='') as file:
+        return [row for row in csv.reader(file) if row]
+
+def normalize_inputs(args, rows):
+    """
+    Inputs a configuration bundle depends on, in a canonical form 规范化配置的输入
+    >>> args = parse_args(['_test_.csv', '--chunk-size', '1024KB', '--init-cwnd', '2', '--algorithms', 'rubic', 'aimd'])
+    >>> inputs = normalize_inputs(args, [['from', 'to'], ['con0', 'agg0']])
+    >>> inputs['chunk_size'], inputs['total_size'], inputs['init_cwnd'], inputs['algorithms']
+    (1048576, 10485760, 2.0, ['aimd', 'rubic'])
+    """
+    return {
+        'structure': rows,
+        'chunk_size': analyse_size(args.chunk_size),
+        'total_size': analyse_size(args.total_size),
+        'algorithms': sorted(set(args.algorithms)),
+        'pipeline_type': args.pipeline_type,
+        'init_cwnd': float(args.init_cwnd),
+    }
+
+def config_hash(inputs):
+    """
+    Hash of normalized inputs, used as name of the configuration bundle 计算配置的哈希值
+    >>> rows = [['from', 'to'], ['con0', 'agg0']]
+    >>> a = config_hash(normalize_inputs(parse_args(['a.csv', '--chunk-size', '1MB']), rows))
+    >>> b = config_hash(normalize_inputs(parse_args(['b.csv', '--chunk-size', '1024KB', '-m', 'other']), rows))
+    >>> c = config_hash(normalize_inputs(parse_args(['a.csv', '--chunk-size', '2MB']), rows))
+    >>> a == b, a == c, len(a)
+    (True, False, 16)
+    """
+    data = json.dumps(inputs, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+def bundle_exists(key):
+    return os.path.exists(f'configure/{key}/args.yaml')
+
+def read_index(index_file=None):
+    try:
+        with open(index_file or INDEX_FILE, 'r') as file:
+            return yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        return {}
+
+def update_index(message, key, yes=False, index_file=None):
+    """
+    Point a message to the hash of its configuration 更新消息到配置哈希的索引
+    >>> update_index('_test_', '0123456789abcdef', index_file='_test_.yaml')
+    Message "_test_" points to "configure/0123456789abcdef"
+    >>> update_index('_test_', 'fedcba9876543210', yes=True, index_file='_test_.yaml')
+    Message "_test_" moved from "configure/0123456789abcdef" to "configure/fedcba9876543210"
+    >>> read_index('_test_.yaml'), resolve_config('_test_', '_test_.yaml'), resolve_config('test01', '_test_.yaml')
+    ({'_test_': 'fedcba9876543210'}, 'fedcba9876543210', 'test01')
+    >>> os.remove('_test_.yaml'); os.remove('_test_.yaml.lock')
+    """
+    index_file = index_file or INDEX_FILE
+    os.makedirs(os.path.dirname(index_file) or '.', exist_ok=True)
+    # several configure.py processes may update the index at once, e.g. from sweep.py 多进程写索引时加锁
+    with open(index_file + '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        index = read_index(index_file)
+        previous = index.get(message)
+        if previous == key:
+            return
+        if previous is not None:
+            result = "Y" if yes else input(f"Message \"{message}\" points to \"configure/{previous}\", "
+                                           f"do you want to point it to \"configure/{key}\"? (Y/N)\n")
+            if result.upper() not in ("Y", "YES"):
+                print("Execution terminated")
+                sys.exit()
+        index[message] = key
+        with open(index_file, 'w') as file:
+            yaml.safe_dump(index, file, default_flow_style=False)
+    if previous is None:
+        print(f"Message \"{message}\" points to \"configure/{key}\"")
+    else:
+        print(f"Message \"{message}\" moved from \"configure/{previous}\" to \"configure/{key}\"")
+
+def resolve_config(config, index_file=None):
+    """
+    Configuration directory of a message, or config itself when it is a hash or an unindexed directory 解析配置名
+    """
+    return read_index(index_file).get(config, config)
 
 def save_args(args):
     """
@@ -190,7 +307,7 @@ def generate_general_config(args):
     """
     Writing conconfig.ini, preconfig.ini, aggregatorcat.ini, aggregatorput.ini 写入四个通用配置文件
     """
-    for algorithm in ['aimd', 'rubic']:
+    for algorithm in args.algorithms:
         generate_conconfig(args, algorithm)
         generate_proconfig(args, algorithm)
         generate_aggregatorcat(args, algorithm)
@@ -212,7 +329,7 @@ def generate_conconfig(args, algorithm : str):
         'name': f'/{args.message}-con',                             # configuration name identifier 配置名称标识符
         'lifetime': '4000',                                         # interest packet lifetime (ms) 兴趣包生存时间(毫秒)
         'retries': '1024',                                          # maximum retry count 最大重传次数
-        'pipeline-type': 'hybla',                                   # pipeline algorithm type 管道算法类型
+        'pipeline-type': args.pipeline_type,                        # pipeline algorithm type 管道算法类型
         'naming-convention': 'typed',                               # naming convention type 命名约定类型
         'quiet': 'false',                                           # quiet mode switch 静默模式开关
         'verbose': 'false',                                         # verbose output switch 详细输出开关
@@ -228,7 +345,7 @@ def generate_conconfig(args, algorithm : str):
     parser['AdaptivePipeline'] = {
         'ignore-marks': 'false',                                    # ignore congestion marks 忽略拥塞标记
         'disable-cwa': 'false',                                     # disable congestion window avoidance 禁用拥塞窗口避免
-        'init-cwnd': '2.0',                                         # initial congestion window size 初始拥塞窗口大小
+        'init-cwnd': str(args.init_cwnd),                           # initial congestion window size 初始拥塞窗口大小
         'init-ssthresh': '1.7976931348623157e+308',                 # initial slow start threshold 初始慢启动阈值
         'rto-alpha': '0.125',                                       # RTO smoothing factor α RTO平滑因子α
         'rto-beta': '0.25',                                         # RTO variance smoothing factor β RTO方差平滑因子β
@@ -327,7 +444,7 @@ def generate_aggregatorcat(args, algorithm):
     parser['AdaptivePipeline'] = {
         'ignore-marks': 'false',                                    # ignore congestion marks 忽略拥塞标记
         'disable-cwa': 'false',                                     # disable congestion window avoidance 禁用拥塞窗口避免
-        'init-cwnd': '2.0',                                         # initial congestion window size 初始拥塞窗口大小
+        'init-cwnd': str(args.init_cwnd),                           # initial congestion window size 初始拥塞窗口大小
         'init-ssthresh': '1.7976931348623157e+308',                 # initial slow start threshold 初始慢启动阈值
         'rto-alpha': '0.125',                                       # RTO smoothing factor α RTO平滑因子α
         'rto-beta': '0.25',                                         # RTO variance smoothing factor β RTO方差平滑因子β
@@ -21,33 +21,87 @@
 # along with Mini-NDN, e.g., in COPYING.md file.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mininet.log import warn
 from mininet.node import Node
 
+from minindn.helpers.teardown import Teardown
+
 class AppManager(object):
-    def __init__(self, minindn, hosts, cls, **appParams):
+    def __init__(self, minindn, hosts, cls, parallel=False, maxWorkers=None, onReady=None, **appParams):
+        """
+        Construct and start an application of class cls on every host
+
+        :param parallel: Construct and start the applications on a pool of maxWorkers threads.
+          Failures are collected in self.failures instead of aborting the startup
+        :param maxWorkers: Size of the thread pool used in parallel mode (optional)
+        :param onReady: Callback invoked with each application once it has been started (optional)
+        """
         self.cls = cls
         self.apps = []
-        for host in hosts:
-            # Don't run NDN apps on switches
-            if isinstance(host, Node):
+        self.appIndex = {}
+        self.onReady = onReady
+        # Node name -> exception raised while constructing or starting its application
+        self.failures = {}
+        # Node name -> (construct duration, start duration) in seconds
+        self.durations = {}
+
+        # Don't run NDN apps on switches
+        nodes = [host for host in hosts if isinstance(host, Node)]
+        if parallel:
+            self.startOnNodes(nodes, maxWorkers, **appParams)
+        else:
+            for host in nodes:
                 self.startOnNode(host, **appParams)
 
         minindn.cleanups.append(self.cleanup)
 
-    def startOnNode(self, host, **appParams):
+    def _createApp(self, host, **appParams):
+        start = time.time()
         app = self.cls(host, **appParams)
+        constructed = time.time()
         app.start()
+        self.durations[host.name] = (constructed - start, time.time() - constructed)
+        if self.onReady is not None:
+            self.onReady(app)
+        return app
+
+    def startOnNode(self, host, **appParams):
+        app = self._createApp(host, **appParams)
         self.apps.append(app)
+        self.appIndex[host.name] = app
+
+    def startOnNodes(self, hosts, maxWorkers=None, **appParams):
+        """Construct and start the application on all hosts concurrently, collecting per-node failures"""
+        def createOrFail(host):
+            try:
+                return self._createApp(host, **appParams)
+            # Applications call sys.exit() on misconfiguration, which must not end the whole startup
+            except (Exception, SystemExit) as e:
+                self.failures[host.name] = e
+                return None
+
+        if not hosts:
+            return
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            apps = list(executor.map(createOrFail, hosts))
+
+        for host, app in zip(hosts, apps):
+            if app is not None:
+                self.apps.append(app)
+                self.appIndex[host.name] = app
+            else:
+                warn('[{}] Failed to start {}: {!r}\n'.format(host.name, self.cls.__name__,
+                                                             self.failures[host.name]))
 
     def cleanup(self):
-        for app in self.apps:
-            app.stop()
+        # All the applications are signaled at once and share the stop deadline
+        Teardown.stopApplications(self.apps)
 
     def __getitem__(self, nodeName):
-        for app in self.apps:
-            if app.node.name == nodeName:
-                return app
-        return None
+        return self.appIndex.get(nodeName)
 
     def __iter__(self):
         return self.apps.__iter__()
@@ -22,12 +22,16 @@
 # If not, see <http://www.gnu.org/licenses/>.
 
 from minindn.util import getPopen
+from minindn.minindn import Minindn
+from minindn.helpers.teardown import Teardown
 
 class Application(object):
     def __init__(self, node):
         self.node = node
         self.process = None
         self.logfile = None
+        # Arguments of the last start, to restart the application
+        self.startArgs = None
         self.homeDir = self.node.params['params']['homeDir']
 
         # Make directory for log file
@@ -36,15 +40,31 @@ class Application(object):
 
     def start(self, command, logfile, envDict=None):
         if self.process is None:
-            self.logfile = open('{}/{}'.format(self.logDir, logfile), 'w')
+            # A restarted application appends to the log of its previous runs
+            self.logfile = open('{}/{}'.format(self.logDir, logfile), 'w' if self.startArgs is None else 'a')
+            self.startArgs = (command, logfile, envDict)
             if isinstance(command, str):
                 command = command.split()
             self.process = getPopen(self.node, command, envDict,
                                     stdout=self.logfile, stderr=self.logfile)
+            if Minindn.cgroups is not None:
+                # Popen processes are not children of the host shell
+                Minindn.cgroups.attachProcess(self.node, self.process.pid)
+            Teardown.trackApplication(self)
 
-    def stop(self):
+    def stop(self, timeout=Teardown.TIMEOUT):
+        """Terminates the process, killing it if it did not exit after timeout seconds"""
         if self.process is not None:
-            self.process.kill()
+            Teardown.stopProcesses([self.process], timeout=timeout)
             self.process = None
         if self.logfile is not None:
             self.logfile.close()
+        Teardown.untrackApplication(self)
+
+    def restart(self):
+        """Stops the application and starts it again, subclasses through their own start()"""
+        self.stop()
+        if type(self).start is Application.start:
+            self.start(*self.startArgs)
+        else:
+            self.start()
@@ -25,11 +25,14 @@ import os
 
 from minindn.apps.application import Application
 from minindn.util import copyExistentFile
+from minindn.helpers.info_tree import InfoTree
+from minindn.helpers.nfdc import FaceCache
+from minindn.helpers.teardown import Teardown
 from minindn.minindn import Minindn
 
 class Nfd(Application):
     def __init__(self, node, logLevel='NONE', csSize=65536,
-                 csPolicy='lru', csUnsolicitedPolicy='drop-all'):
+                 csPolicy='lru', csUnsolicitedPolicy='drop-all', useInfoconv=False):
         Application.__init__(self, node)
         self.logLevel = node.params['params'].get('nfd-log-level', logLevel)
 
@@ -37,10 +40,42 @@ class Nfd(Application):
         self.logFile = 'nfd.log'
         self.ndnFolder = '{}/.ndn'.format(self.homeDir)
         self.clientConf = '{}/client.conf'.format(self.ndnFolder)
-        # Copy nfd.conf file from /usr/local/etc/ndn or /etc/ndn to the node's home directory
-        # Use nfd.conf as default configuration for NFD, else use the sample
+        # Use nfd.conf from /usr/local/etc/ndn or /etc/ndn as default configuration for NFD,
+        # else use the sample
         possibleConfPaths = ['/usr/local/etc/ndn/nfd.conf', '/usr/local/etc/ndn/nfd.conf.sample',
                              '/etc/ndn/nfd.conf', '/etc/ndn/nfd.conf.sample']
+
+        if useInfoconv:
+            self.createConfigFileWithInfoconv(possibleConfPaths, csSize, csPolicy, csUnsolicitedPolicy)
+        else:
+            # The base configuration is parsed once and only rendered with this node's values
+            confTree = InfoTree.loadTemplate(possibleConfPaths)
+            confTree.put('log.default_level', self.logLevel)
+            # Retrieve the default socket path from the conf file; this avoids issues from #5316
+            self.setSockFile(confTree.get('face_system.unix.path'))
+            confTree.put('face_system.unix.path', self.sockFile)
+            confTree.put('tables.cs_max_packets', csSize)
+            confTree.put('tables.cs_policy', csPolicy)
+            confTree.put('tables.cs_unsolicited_policy', csUnsolicitedPolicy)
+            confTree.write(self.confFile)
+
+        if not Minindn.ndnSecurityDisabled:
+            # Generate key and install cert for /localhost/operator to be used by NFD
+            node.cmd('ndnsec-key-gen /localhost/operator | ndnsec-cert-install -')
+
+    def setSockFile(self, defaultSockFile):
+        # Set socket file name and path
+        self.sockFile = '{}/{}.sock'.format(os.path.dirname(defaultSockFile), self.node.name)
+        # Create client configuration for host to ensure socket path is consistent
+        # Suppress error if working directory exists from prior run
+        os.makedirs(self.ndnFolder, exist_ok=True)
+        # This will overwrite any existing client.conf files, which should not be an issue
+        with open(self.clientConf, "w") as client_conf_file:
+            client_conf_file.write("transport=unix://{}\n".format(self.sockFile))
+
+    def createConfigFileWithInfoconv(self, possibleConfPaths, csSize, csPolicy, csUnsolicitedPolicy):
+        node = self.node
+        # Copy nfd.conf file from /usr/local/etc/ndn or /etc/ndn to the node's home directory
         copyExistentFile(node, possibleConfPaths, self.confFile)
 
         # Using infoconv, we convert the local nfd.conf file to JSON and parse it into an object
@@ -49,18 +84,10 @@ class Nfd(Application):
         # Set log level
         conf_file["log"]["default_level"] = self.logLevel
 
-        # Set socket file name and path
         # Retrieve the default socket path from the conf file; this avoids issues from #5316
-        default_socket_path = os.path.dirname(conf_file["face_system"]["unix"]["path"])
-        self.sockFile = '{}/{}.sock'.format(default_socket_path, node.name)
+        self.setSockFile(conf_file["face_system"]["unix"]["path"])
         # Set socket path in conf file to new socket
         conf_file["face_system"]["unix"]["path"] = self.sockFile
-        # Create client configuration for host to ensure socket path is consistent
-        # Suppress error if working directory exists from prior run
-        os.makedirs(self.ndnFolder, exist_ok=True)
-        # This will overwrite any existing client.conf files, which should not be an issue
-        with open(self.clientConf, "w") as client_conf_file:
-            client_conf_file.write("transport=unix://{}\n".format(self.sockFile))
 
         # Set CS parameters
         conf_file["tables"]["cs_max_packets"] = csSize
@@ -77,10 +104,12 @@ class Nfd(Application):
         # Remove the intermediate JSON file
         os.remove("{}/temp_nfd_conf.json".format(self.homeDir))
 
-        if not Minindn.ndnSecurityDisabled:
-            # Generate key and install cert for /localhost/operator to be used by NFD
-            node.cmd('ndnsec-key-gen /localhost/operator | ndnsec-cert-install -')
-
     def start(self):
+        # Face IDs of a previous NFD instance are meaningless to the new one
+        FaceCache.invalidate(self.node)
         Application.start(self, 'nfd --config {}'.format(self.confFile), logfile=self.logFile)
         Minindn.sleep(0.5)
+
+    def stop(self, timeout=Teardown.TIMEOUT):
+        Application.stop(self, timeout)
+        FaceCache.invalidate(self.node)
@@ -32,6 +32,7 @@ from mininet.node import Switch
 from minindn.apps.application import Application
 from minindn.util import scp, copyExistentFile, MACToEther
 from minindn.helpers.nfdc import Nfdc
+from minindn.helpers.info_tree import InfoTree
 from minindn.minindn import Minindn
 
 class Nlsr(Application):
@@ -95,7 +96,13 @@ class Nlsr(Application):
         self.neighborLocations = []
         self.interfaceForNeighbor = dict()
         possibleConfPaths = ['/usr/local/etc/ndn/nlsr.conf.sample', '/etc/ndn/nlsr.conf.sample']
-        copyExistentFile(node, possibleConfPaths, '{}/nlsr.conf'.format(self.homeDir))
+        # Local routers edit the configuration in memory and write it once,
+        # remote routers still edit their copy of the sample with infoedit
+        if isinstance(node, RemoteMixin) and node.isRemote:
+            self.confTree = None
+            copyExistentFile(node, possibleConfPaths, '{}/nlsr.conf'.format(self.homeDir))
+        else:
+            self.confTree = InfoTree.loadTemplate(possibleConfPaths)
 
         self.createConfigFile()
 
@@ -204,18 +211,46 @@ class Nlsr(Application):
         self.__editFibSection()
         self.__editAdvertisingSection()
         self.__editSecuritySection()
+        if self.confTree is not None:
+            self.confTree.write(self.confFile)
+
+    def __setValue(self, key, value):
+        if self.confTree is None:
+            self.node.cmd('{} -s {} -v {}'.format(self.infocmd, key, value))
+        else:
+            self.confTree.put(key, value)
+
+    def __pushValue(self, key, value):
+        if self.confTree is None:
+            self.node.cmd('{} -p {} -v {}'.format(self.infocmd, key, value))
+        else:
+            self.confTree.add(key, value)
+
+    def __deleteKey(self, key):
+        if self.confTree is None:
+            self.node.cmd('{} -d {}'.format(self.infocmd, key))
+        else:
+            self.confTree.erase(key)
+
+    def __addNeighbor(self, name, location, linkCost):
+        neighbor = 'name {}{}-site/%C1.Router/cs/{} face-uri {}://{}\n link-cost {}' \
+                   .format(self.network, name, name, self.faceType, location, linkCost)
+        if self.confTree is None:
+            self.node.cmd('{} -a neighbors.neighbor <<<\'{}\''.format(self.infocmd, neighbor))
+        else:
+            self.confTree.addChild('neighbors.neighbor', InfoTree.parse(neighbor))
 
     def __editGeneralSection(self):
 
-        self.node.cmd('{} -s general.network -v {}'.format(self.infocmd, self.network))
-        self.node.cmd('{} -s general.site -v /{}-site'.format(self.infocmd, self.node.name))
-        self.node.cmd('{} -s general.router -v /%C1.Router/cs/{}'.format(self.infocmd, self.node.name))
-        self.node.cmd('{} -s general.state-dir -v {}/log'.format(self.infocmd, self.homeDir))
-        self.node.cmd('{} -s general.sync-protocol -v {}'.format(self.infocmd, self.sync))
+        self.__setValue('general.network', self.network)
+        self.__setValue('general.site', '/{}-site'.format(self.node.name))
+        self.__setValue('general.router', '/%C1.Router/cs/{}'.format(self.node.name))
+        self.__setValue('general.state-dir', '{}/log'.format(self.homeDir))
+        self.__setValue('general.sync-protocol', self.sync)
 
     def __editNeighborsSection(self):
 
-        self.node.cmd('{} -d neighbors.neighbor'.format(self.infocmd))
+        self.__deleteKey('neighbors.neighbor')
         for intf in self.node.intfList():
             link = intf.link
             if not link:
@@ -246,14 +281,11 @@ class Nlsr(Application):
             if self.faceType == Nfdc.PROTOCOL_ETHER:
                 self.interfaceForNeighbor[location] = intf
 
-            self.node.cmd('{} -a neighbors.neighbor \
-                          <<<\'name {}{}-site/%C1.Router/cs/{} face-uri {}://{}\n link-cost {}\''
-                          .format(self.infocmd, self.network, other.name, other.name,
-                                  self.faceType, location, linkCost))
+            self.__addNeighbor(other.name, location, linkCost)
 
     def __editNeighborsSectionManual(self):
 
-        self.node.cmd('{} -d neighbors.neighbor'.format(self.infocmd))
+        self.__deleteKey('neighbors.neighbor')
         if self.node not in self.faceDict:
             return
         for link in self.faceDict[self.node]:
@@ -261,39 +293,36 @@ class Nlsr(Application):
             nodeIP = link[1]
             linkCost = link[2]
 
-            self.node.cmd('{} -a neighbors.neighbor \
-                          <<<\'name {}{}-site/%C1.Router/cs/{} face-uri {}://{}\n link-cost {}\''
-                          .format(self.infocmd, self.network, nodeName, nodeName,
-                                  self.faceType, nodeIP, linkCost))
+            self.__addNeighbor(nodeName, nodeIP, linkCost)
 
 
     def __editHyperbolicSection(self):
 
-        self.node.cmd('{} -s hyperbolic.state -v {}'.format(self.infocmd, self.hyperbolicState))
-        self.node.cmd('{} -s hyperbolic.radius -v {}'.format(self.infocmd, self.hyperRadius))
-        self.node.cmd('{} -s hyperbolic.angle -v {}'.format(self.infocmd, self.hyperAngle))
+        self.__setValue('hyperbolic.state', self.hyperbolicState)
+        self.__setValue('hyperbolic.radius', self.hyperRadius)
+        self.__setValue('hyperbolic.angle', self.hyperAngle)
 
     def __editFibSection(self):
 
-        self.node.cmd('{} -s fib.max-faces-per-prefix  -v {}'.format(self.infocmd, self.nFaces))
+        self.__setValue('fib.max-faces-per-prefix', self.nFaces)
 
     def __editAdvertisingSection(self):
 
-        self.node.cmd('{} -d advertising.prefix'.format(self.infocmd))
-        self.node.cmd('{} -s advertising.prefix -v {}{}-site/{}'
-                      .format(self.infocmd, self.network, self.node.name, self.node.name))
+        self.__deleteKey('advertising.prefix')
+        self.__setValue('advertising.prefix', '{}{}-site/{}'
+                        .format(self.network, self.node.name, self.node.name))
 
     def __editSecuritySection(self):
 
-        self.node.cmd('{} -d security.cert-to-publish'.format(self.infocmd))
+        self.__deleteKey('security.cert-to-publish')
         if not self.security:
-            self.node.cmd('{} -s security.validator.trust-anchor.type -v any'.format(self.infocmd))
-            self.node.cmd('{} -d security.validator.trust-anchor.file-name'.format(self.infocmd))
-            self.node.cmd('{} -s security.prefix-update-validator.trust-anchor.type -v any'.format(self.infocmd))
-            self.node.cmd('{} -d security.prefix-update-validator.trust-anchor.file-name'.format(self.infocmd))
+            self.__setValue('security.validator.trust-anchor.type', 'any')
+            self.__deleteKey('security.validator.trust-anchor.file-name')
+            self.__setValue('security.prefix-update-validator.trust-anchor.type', 'any')
+            self.__deleteKey('security.prefix-update-validator.trust-anchor.file-name')
         else:
-            self.node.cmd('{} -s security.validator.trust-anchor.file-name -v security/root.cert'.format(self.infocmd))
-            self.node.cmd('{} -s security.prefix-update-validator.trust-anchor.file-name -v security/site.cert'.format(self.infocmd))
-            self.node.cmd('{} -p security.cert-to-publish -v security/site.cert'.format(self.infocmd))
-            self.node.cmd('{} -p security.cert-to-publish -v security/op.cert'.format(self.infocmd))
-            self.node.cmd('{} -p security.cert-to-publish -v security/router.cert'.format(self.infocmd))
\ No newline at end of file
+            self.__setValue('security.validator.trust-anchor.file-name', 'security/root.cert')
+            self.__setValue('security.prefix-update-validator.trust-anchor.file-name', 'security/site.cert')
+            self.__pushValue('security.cert-to-publish', 'security/site.cert')
+            self.__pushValue('security.cert-to-publish', 'security/op.cert')
+            self.__pushValue('security.cert-to-publish', 'security/router.cert')
\ No newline at end of file
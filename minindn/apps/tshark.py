@@ -22,6 +22,7 @@
 # If not, see <http://www.gnu.org/licenses/>.
 
 from minindn.apps.application import Application
+from minindn.helpers.teardown import Teardown
 from mininet.log import debug
 
 
@@ -40,6 +41,7 @@ class Tshark(Application):
 
         Application.__init__(self, node)
 
+        self.pids = []
         self.logFolder = logFolder
         self.singleLogFile = singleLogFile
 
@@ -53,8 +55,14 @@ class Tshark(Application):
         if self.singleLogFile:
             interfaces = ["-i " + intf for intf in self.node.intfNames()]
             ndnDumpOutputFile = "{}/{}-interfaces.pcap".format(self.logFolder, self.node.name)
-            self.node.cmd("tshark {} -w {} -q &".format(" ".join(interfaces), ndnDumpOutputFile))
+            self.pids.append(Teardown.runInBackground(self.node, "tshark {} -w {} -q &".format(" ".join(interfaces), ndnDumpOutputFile)))
         else:
             for intf in self.node.intfNames():
                 ndnDumpOutputFile = "{}/{}.pcap".format(self.logFolder, intf)
-                self.node.cmd("tshark -i {} -w {} -q &".format(intf, ndnDumpOutputFile))
+                self.pids.append(Teardown.runInBackground(self.node, "tshark -i {} -w {} -q &".format(intf, ndnDumpOutputFile)))
+
+    def stop(self, timeout=Teardown.TIMEOUT):
+        # SIGTERM lets tshark finish writing its capture files
+        Teardown.stopProcesses(pids=[pid for pid in self.pids if pid is not None], timeout=timeout)
+        self.pids = []
+        Application.stop(self, timeout)
@@ -0,0 +1,96 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from mininet.node import Switch
+from mininet.util import ipStr, ipParse
+from mininet.log import debug, warn
+
+class AddressPlanner(object):
+    """
+    Assigns a /30 subnet to every link between two hosts of a switch-less topology.
+    The whole allocation is planned up front, then every host applies the addresses of
+    its interfaces with a single 'ip -batch' invocation, all hosts in parallel.
+
+     Usage: `AddressPlanner.apply(AddressPlanner.plan(net.hosts))`
+    """
+    PREFIX_LEN = 30
+
+    @staticmethod
+    def plan(hosts, base='10.0.0.0'):
+        """Returns (interface, ip) pairs, allocated in the order of the hosts and their interfaces"""
+        assignments = []
+        planned = set()
+        subnet = ipParse(base)
+        for host in hosts:
+            for intf in host.intfList():
+                link = intf.link
+                if link is None or link in planned:
+                    continue
+                if isinstance(link.intf1.node, Switch) or isinstance(link.intf2.node, Switch):
+                    continue
+                planned.add(link)
+                assignments.append((link.intf1, ipStr(subnet + 1)))
+                assignments.append((link.intf2, ipStr(subnet + 2)))
+                subnet += 4
+        return assignments
+
+    @staticmethod
+    def batchCommands(intfs):
+        """
+        Replaces the IPv4 address Mininet gave each interface, as setIP() does through ifconfig.
+        The IPv6 link-local address stays, NFD's udp6 multicast faces rely on it.
+        """
+        commands = []
+        for intf, ip in intfs:
+            commands.append('-4 address flush dev {}'.format(intf.name))
+            commands.append('address add {}/{} dev {}'.format(ip, AddressPlanner.PREFIX_LEN, intf.name))
+            commands.append('link set dev {} up'.format(intf.name))
+        return commands
+
+    @staticmethod
+    def applyOnNode(node, intfs):
+        batchFile = '{}/ip.batch'.format(node.params['params']['homeDir'])
+        with open(batchFile, 'w') as batch:
+            batch.write('\n'.join(AddressPlanner.batchCommands(intfs)) + '\n')
+        # -force keeps going after a failing command so that every failure is reported
+        output = node.cmd('ip -force -batch {}'.format(batchFile))
+        if output.strip():
+            warn('[{}] ip -batch: {}\n'.format(node.name, output.strip()))
+        for intf, ip in intfs:
+            intf.ip, intf.prefixLen = ip, AddressPlanner.PREFIX_LEN
+
+    @staticmethod
+    def apply(assignments, maxWorkers=None):
+        """Applies a plan with one 'ip -batch' per node, nodes being configured concurrently"""
+        byNode = OrderedDict()
+        for intf, ip in assignments:
+            byNode.setdefault(intf.node, []).append((intf, ip))
+        if not byNode:
+            return
+        debug('Assigning {} addresses on {} nodes\n'.format(len(assignments), len(byNode)))
+        # Every node has its own shell, so the commands of different nodes do not interfere
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            list(executor.map(lambda item: AddressPlanner.applyOnNode(*item), byNode.items()))
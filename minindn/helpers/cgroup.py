@@ -0,0 +1,201 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import time
+from threading import Event, Lock, Thread
+
+from mininet.log import debug, info, warn
+
+class CgroupAccounting(object):
+    '''
+    Places the processes of each host in its own cgroup v2 group and samples the CPU,
+    memory and IO usage of every group from a single thread.
+
+    The shell of a host is attached when the host is added, so everything started with
+    node.cmd(), including background commands, is accounted to the host. Processes started
+    with node.popen() are children of Mini-NDN and have to be attached with attachProcess(),
+    which Application.start does. Each host gets a time series in <homeDir>/cgroup-stats.csv
+    and the totals of all hosts are written to <workDir>/cgroup-summary.csv on stop.
+    '''
+    CONTROLLERS = ['cpu', 'memory', 'io']
+    COLUMNS = ['time', 'cpuUsec', 'userUsec', 'systemUsec', 'throttledUsec', 'cpuPressureUsec',
+               'memoryBytes', 'readBytes', 'writeBytes']
+
+    def __init__(self, workDir, interval=1, groupName=None):
+        self.root = CgroupAccounting.findCgroup2Mount()
+        if self.root is None:
+            raise OSError('No cgroup v2 hierarchy is mounted')
+        self.workDir = workDir
+        self.interval = interval
+        self.groupDir = '{}/{}'.format(self.root, groupName or 'minindn-{}'.format(os.getpid()))
+        self.hosts = {}
+        self.lock = Lock()
+        self._stopEvent = Event()
+        self._thread = None
+
+        os.makedirs(self.groupDir, exist_ok=True)
+        # Controllers have to be enabled on every ancestor for their files to exist in the host groups,
+        # they can be missing on hybrid hierarchies where they are bound to cgroup v1
+        self.controllers = self.enableControllers(self.root) and self.enableControllers(self.groupDir)
+        if not {'memory', 'io'}.issubset(self.controllers):
+            warn('cgroup controllers {} are not available, only the base CPU usage is accounted\n'
+                 .format(', '.join(sorted(set(CgroupAccounting.CONTROLLERS) - set(self.controllers)))))
+
+    @staticmethod
+    def findCgroup2Mount():
+        with open('/proc/mounts', 'r') as mounts:
+            for line in mounts:
+                fields = line.split()
+                if fields[2] == 'cgroup2':
+                    return fields[1]
+        return None
+
+    @staticmethod
+    def enableControllers(groupDir):
+        '''Enables the available controllers for the children of a group, returns the enabled ones'''
+        with open('{}/cgroup.controllers'.format(groupDir), 'r') as controllers:
+            available = [c for c in controllers.read().split() if c in CgroupAccounting.CONTROLLERS]
+        enabled = []
+        for controller in available:
+            try:
+                with open('{}/cgroup.subtree_control'.format(groupDir), 'w') as subtreeControl:
+                    subtreeControl.write('+{}'.format(controller))
+                enabled.append(controller)
+            except OSError as e:
+                debug('Cannot enable the {} controller in {}: {}\n'.format(controller, groupDir, e))
+        return enabled
+
+    def addHost(self, host):
+        hostDir = '{}/{}'.format(self.groupDir, host.name)
+        os.makedirs(hostDir, exist_ok=True)
+        statsFile = open('{}/cgroup-stats.csv'.format(host.params['params']['homeDir']), 'w')
+        statsFile.write(','.join(CgroupAccounting.COLUMNS) + '\n')
+        with self.lock:
+            self.hosts[host.name] = {'dir': hostDir, 'file': statsFile, 'last': None, 'peakMemory': 0}
+        self.attachProcess(host, host.pid)
+
+    def attachProcess(self, host, pid):
+        '''Moves a process of host to the group of the host, its future children follow it'''
+        if host.name not in self.hosts:
+            return
+        try:
+            with open('{}/cgroup.procs'.format(self.hosts[host.name]['dir']), 'w') as procs:
+                procs.write(str(pid))
+        except OSError as e:
+            # The process may already have exited
+            debug('Cannot attach process {} to the cgroup of {}: {}\n'.format(pid, host.name, e))
+
+    @staticmethod
+    def _readKeyedFile(path):
+        try:
+            with open(path, 'r') as keyedFile:
+                return dict(line.split()[:2] for line in keyedFile if line.strip())
+        except OSError:
+            return {}
+
+    @staticmethod
+    def readStats(hostDir):
+        cpu = CgroupAccounting._readKeyedFile('{}/cpu.stat'.format(hostDir))
+        pressure = 0
+        try:
+            with open('{}/cpu.pressure'.format(hostDir), 'r') as cpuPressure:
+                # Time during which at least one task of the group waited for a CPU
+                pressure = int(cpuPressure.readline().rsplit('total=', 1)[1])
+        except (OSError, IndexError, ValueError):
+            pass
+        try:
+            with open('{}/memory.current'.format(hostDir), 'r') as memory:
+                memoryBytes = int(memory.read())
+        except OSError:
+            memoryBytes = 0
+        readBytes = writeBytes = 0
+        try:
+            with open('{}/io.stat'.format(hostDir), 'r') as ioStat:
+                for line in ioStat:
+                    for field in line.split()[1:]:
+                        key, value = field.split('=')
+                        if key == 'rbytes':
+                            readBytes += int(value)
+                        elif key == 'wbytes':
+                            writeBytes += int(value)
+        except OSError:
+            pass
+        return [int(cpu.get('usage_usec', 0)), int(cpu.get('user_usec', 0)), int(cpu.get('system_usec', 0)),
+                int(cpu.get('throttled_usec', 0)), pressure, memoryBytes, readBytes, writeBytes]
+
+    def sample(self):
+        currentTime = time.time()
+        with self.lock:
+            hosts = list(self.hosts.values())
+        for host in hosts:
+            stats = CgroupAccounting.readStats(host['dir'])
+            host['last'] = stats
+            host['peakMemory'] = max(host['peakMemory'], stats[5])
+            host['file'].write('{:.3f},{}\n'.format(currentTime, ','.join(map(str, stats))))
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stopEvent.is_set():
+            self.sample()
+            deadline = max(deadline + self.interval, time.monotonic())
+            self._stopEvent.wait(deadline - time.monotonic())
+
+    def start(self):
+        self._thread = Thread(target=self._run, name='CgroupAccounting', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Takes a last sample, writes the summary of every host and removes the groups'''
+        if self._thread is not None:
+            self._stopEvent.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+
+        summaryFile = '{}/cgroup-summary.csv'.format(self.workDir)
+        with open(summaryFile, 'w') as summary:
+            summary.write('host,cpuSeconds,userSeconds,systemSeconds,cpuPressureSeconds,'
+                          'peakMemoryBytes,readBytes,writeBytes\n')
+            for name, host in sorted(self.hosts.items()):
+                host['file'].close()
+                if host['last'] is None:
+                    continue
+                cpuUsec, userUsec, systemUsec, _, pressure, _, readBytes, writeBytes = host['last']
+                summary.write('{},{:.3f},{:.3f},{:.3f},{:.3f},{},{},{}\n'
+                              .format(name, cpuUsec / 1e6, userUsec / 1e6, systemUsec / 1e6, pressure / 1e6,
+                                      host['peakMemory'], readBytes, writeBytes))
+        info('Per host resource usage written to {}\n'.format(summaryFile))
+
+        for host in self.hosts.values():
+            self._removeGroup(host['dir'])
+        self._removeGroup(self.groupDir)
+        self.hosts = {}
+
+    @staticmethod
+    def _removeGroup(groupDir):
+        # Groups can only be removed once all their processes exited
+        try:
+            os.rmdir(groupDir)
+        except OSError as e:
+            debug('Cannot remove cgroup {}: {}\n'.format(groupDir, e))
@@ -25,6 +25,7 @@ import time
 import sys
 import argparse
 from itertools import cycle
+from joblib import Parallel, delayed
 
 from mininet.log import info
 
@@ -33,6 +34,8 @@ from minindn.helpers.ndnping import NDNPing
 from minindn.util import getSafeName
 
 class Experiment(object):
+    MAX_POLLING_THREADS = 256
+
     @staticmethod
     def checkConvergence(ndn, hosts, convergenceTime, quit=False, returnConvergenceInfo=False):
         # Wait for convergence time period
@@ -89,6 +92,93 @@ class Experiment(object):
         else:
             return didNlsrConverge
 
+    @staticmethod
+    def getFibPrefixes(host):
+        """Returns the set of name prefixes in the FIB of a host, from a single nfdc fib list"""
+        prefixes = set()
+        for line in host.cmd('nfdc fib list').splitlines():
+            fields = line.split()
+            if fields and fields[0].startswith('/'):
+                prefixes.add(fields[0])
+        return prefixes
+
+    @staticmethod
+    def waitForHostConvergence(host, hosts, start, deadline, pollInterval=1):
+        """
+        Poll the FIB of a host until it has the router prefix of every host and the name
+        prefix of every other host, or until the deadline (time.time() based) has passed.
+        Returns the time since start it took to converge (None if it did not) and the
+        missing prefixes.
+        """
+        expected = set()
+        for node in hosts:
+            # Node has its own router name in the fib list, but not name prefix
+            expected.add('/ndn/{}-site/%C1.Router/cs/{}'.format(node.name, node.name))
+            if host.name != node.name:
+                expected.add('/ndn/{}-site/{}'.format(node.name, node.name))
+
+        while True:
+            missing = expected - Experiment.getFibPrefixes(host)
+            if not missing:
+                convergenceTime = time.time() - start
+                break
+            if time.time() + pollInterval > deadline:
+                convergenceTime = None
+                break
+            time.sleep(pollInterval)
+
+        with open('{}/convergence-result'.format(host.params['params']['homeDir']), 'w') as result:
+            result.write('{}\n'.format(convergenceTime is not None))
+        return convergenceTime, missing
+
+    @staticmethod
+    def waitForConvergence(ndn, hosts, timeout, pollInterval=1, quit=False, returnConvergenceInfo=False):
+        """
+        Event-driven alternative to checkConvergence: instead of sleeping a fixed time, the FIB
+        of every host is polled concurrently and the method returns as soon as all of them have
+        converged, or once timeout seconds have passed.
+
+        With returnConvergenceInfo, returns (didNlsrConverge, convergeInfo, convergenceTimes)
+        where convergeInfo is formatted as in checkConvergence and convergenceTimes maps every
+        host name to its time to converge in seconds (None if it did not converge).
+        """
+        info('Waiting up to {} seconds for convergence...\n'.format(timeout))
+        start = time.time()
+        deadline = start + timeout
+        # Polling is I/O bound, so use one thread per host rather than one per CPU
+        nJobs = max(1, min(len(hosts), Experiment.MAX_POLLING_THREADS))
+        results = Parallel(n_jobs=nJobs, require='sharedmem', prefer="threads")(
+            delayed(Experiment.waitForHostConvergence)(host, hosts, start, deadline, pollInterval)
+            for host in hosts)
+
+        convergeInfo = {}
+        convergenceTimes = {}
+        for host, (convergenceTime, missing) in zip(hosts, results):
+            convergenceTimes[host.name] = convergenceTime
+            convergeInfo[host.name] = {}
+            for node in hosts:
+                nodeMissing = [prefix for prefix in sorted(missing)
+                               if prefix.startswith('/ndn/{}-site/'.format(node.name))]
+                if nodeMissing:
+                    convergeInfo[host.name][node.name] = nodeMissing
+
+        didNlsrConverge = all(t is not None for t in convergenceTimes.values())
+        if didNlsrConverge and convergenceTimes:
+            info('NLSR has converged successfully in {:.1f} seconds.\n'.format(max(convergenceTimes.values())))
+        elif not didNlsrConverge:
+            notConverged = [name for name, t in convergenceTimes.items() if t is None]
+            info('NLSR has not converged on {} host(s): {}\n'.format(len(notConverged), ' '.join(notConverged)))
+
+        if quit:
+            info('Exiting...\n')
+            ndn.stop()
+            sys.exit(0 if didNlsrConverge else 1)
+
+        if returnConvergenceInfo:
+            return didNlsrConverge, convergeInfo, convergenceTimes
+        else:
+            return didNlsrConverge
+
     @staticmethod
     def setupPing(hosts, strategy):
         for host in hosts:
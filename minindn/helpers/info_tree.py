@@ -0,0 +1,292 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+'''
+This module reads and writes the Boost property tree INFO format used by the NFD and
+NLSR configuration files. Parsing and writing follow boost::property_tree::read_info
+and write_info, so a tree edited here is written byte for byte like infoedit and
+infoconv would write it, without spawning one process per edit.
+'''
+
+import copy
+import os
+from threading import Lock
+
+_ESCAPES = {'0': '\0', 'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r',
+            't': '\t', 'v': '\v', '"': '"', "'": "'", '\\': '\\'}
+# write_info does not escape tabs, those make the value quoted instead
+_CREATE_ESCAPES = {'\0': '\\0', '\a': '\\a', '\b': '\\b', '\f': '\\f', '\n': '\\n',
+                   '\r': '\\r', '\v': '\\v', '"': '\\"', '\\': '\\\\'}
+_NOT_SIMPLE = set(' \t{};\n"')
+_WHITESPACE = ' \t\n\v\f\r'
+
+class InfoParseError(ValueError):
+    def __init__(self, message, lineNumber=0):
+        ValueError.__init__(self, 'line {}: {}'.format(lineNumber, message))
+        self.lineNumber = lineNumber
+
+def _expandEscapes(text, lineNumber):
+    if '\\' not in text:
+        return text
+    result = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 1
+            if index == len(text):
+                raise InfoParseError('character expected after backslash', lineNumber)
+            if text[index] not in _ESCAPES:
+                raise InfoParseError('unknown escape sequence', lineNumber)
+            char = _ESCAPES[text[index]]
+        result.append(char)
+        index += 1
+    return ''.join(result)
+
+def _createEscapes(text):
+    return ''.join(_CREATE_ESCAPES.get(char, char) for char in text)
+
+def _isSimple(text):
+    return text != '' and not _NOT_SIMPLE.intersection(text)
+
+class _LineReader(object):
+    '''Cursor over one line of an INFO file, mirroring the boost read_info helpers'''
+    def __init__(self, line, lineNumber):
+        self.line = line
+        self.pos = 0
+        self.lineNumber = lineNumber
+
+    def skipWhitespace(self):
+        while self.pos < len(self.line) and self.line[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def peek(self):
+        return self.line[self.pos] if self.pos < len(self.line) else ''
+
+    def readWord(self):
+        self.skipWhitespace()
+        start = self.pos
+        while self.pos < len(self.line) and self.line[self.pos] not in _WHITESPACE \
+              and self.line[self.pos] not in ';\0':
+            self.pos += 1
+        return _expandEscapes(self.line[start:self.pos], self.lineNumber)
+
+    def readString(self):
+        '''Returns the quoted string at the cursor and whether it continues on the next line'''
+        self.skipWhitespace()
+        if self.peek() != '"':
+            raise InfoParseError('expected "', self.lineNumber)
+        self.pos += 1
+        start = self.pos
+        escaped = False
+        while self.pos < len(self.line) and (escaped or self.line[self.pos] != '"'):
+            escaped = not escaped and self.line[self.pos] == '\\'
+            self.pos += 1
+        if self.pos == len(self.line):
+            raise InfoParseError('unexpected end of line', self.lineNumber)
+        result = _expandEscapes(self.line[start:self.pos], self.lineNumber)
+        self.pos += 1
+        self.skipWhitespace()
+        if self.peek() != '\\':
+            return result, False
+        self.pos += 1
+        self.skipWhitespace()
+        if self.peek() not in ('', ';'):
+            raise InfoParseError('expected end of line after \\', self.lineNumber)
+        return result, True
+
+    def readKey(self):
+        self.skipWhitespace()
+        if self.peek() == '"':
+            return self.readString()[0]
+        return self.readWord()
+
+    def readData(self):
+        self.skipWhitespace()
+        if self.peek() == '"':
+            return self.readString()
+        return self.readWord(), False
+
+class InfoTree(object):
+    '''
+    Ordered tree of (key, subtree) children with a string value, like a Boost ptree.
+    Paths are dot separated and resolve to the first child with a matching key.
+    '''
+    # Parsed templates keyed by (path, mtime), shared by every node of the experiment
+    templates = {}
+    templatesLock = Lock()
+
+    def __init__(self, data=''):
+        self.data = data
+        self.children = []
+
+    @staticmethod
+    def parse(text):
+        '''Parses INFO formatted text into a tree; #include directives are not supported'''
+        root = InfoTree()
+        stack = [root]
+        last = None
+        state = 'key'
+
+        if text.startswith('\ufeff'):
+            text = text[1:]
+        for lineNumber, line in enumerate(text.split('\n'), 1):
+            reader = _LineReader(line, lineNumber)
+            reader.skipWhitespace()
+            if reader.peek() == '#':
+                raise InfoParseError('directives are not supported', lineNumber)
+
+            while True:
+                reader.skipWhitespace()
+                if reader.peek() in ('', ';'):
+                    if state == 'data':
+                        state = 'key'
+                    break
+
+                char = reader.peek()
+                if state in ('key', 'data') and char == '{':
+                    if last is None:
+                        raise InfoParseError('unexpected {', lineNumber)
+                    stack.append(last)
+                    last = None
+                    reader.pos += 1
+                    state = 'key'
+                elif state in ('key', 'data') and char == '}':
+                    if len(stack) <= 1:
+                        raise InfoParseError('unmatched }', lineNumber)
+                    stack.pop()
+                    last = None
+                    reader.pos += 1
+                    state = 'key'
+                elif state == 'key':
+                    last = InfoTree()
+                    stack[-1].children.append((reader.readKey(), last))
+                    state = 'data'
+                elif state == 'data':
+                    last.data, needMoreLines = reader.readData()
+                    state = 'continuation' if needMoreLines else 'key'
+                else:
+                    if char != '"':
+                        raise InfoParseError('expected " after \\ in previous line', lineNumber)
+                    data, needMoreLines = reader.readString()
+                    last.data += data
+                    state = 'continuation' if needMoreLines else 'key'
+
+        if state == 'continuation':
+            raise InfoParseError('unexpected end of file after \\', lineNumber)
+        if len(stack) != 1:
+            raise InfoParseError('unmatched {', lineNumber)
+        return root
+
+    @staticmethod
+    def load(path):
+        with open(path, 'r') as infoFile:
+            return InfoTree.parse(infoFile.read())
+
+    @staticmethod
+    def loadTemplate(possiblePaths):
+        '''
+        Returns a copy of the first existing file of possiblePaths,
+        which is only parsed again when it is modified
+        '''
+        for templatePath in possiblePaths:
+            if os.path.isfile(templatePath):
+                key = (templatePath, os.path.getmtime(templatePath))
+                with InfoTree.templatesLock:
+                    if key not in InfoTree.templates:
+                        InfoTree.templates[key] = InfoTree.load(templatePath)
+                    return InfoTree.templates[key].copy()
+        raise IOError('{} not found in expected directory.'.format(possiblePaths[0].split('/')[-1]))
+
+    def dump(self):
+        '''Returns the tree in INFO format, as written by write_info with default settings'''
+        lines = []
+        self._dumpChildren(lines, 0)
+        return ''.join(lines)
+
+    def _dumpChildren(self, lines, indent):
+        for key, child in self.children:
+            key = _createEscapes(key)
+            lines.append('    ' * indent + (key if _isSimple(key) else '"{}"'.format(key)))
+            data = _createEscapes(child.data)
+            if data:
+                lines.append(' {}\n'.format(data if _isSimple(data) else '"{}"'.format(data)))
+            elif not child.children:
+                lines.append(' ""\n')
+            else:
+                lines.append('\n')
+            if child.children:
+                lines.append('    ' * indent + '{\n')
+                child._dumpChildren(lines, indent + 1)
+                lines.append('    ' * indent + '}\n')
+
+    def write(self, path):
+        with open(path, 'w') as infoFile:
+            infoFile.write(self.dump())
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def getChild(self, path):
+        '''Returns the subtree at path, or None if it does not exist'''
+        tree = self
+        for key in path.split('.'):
+            tree = next((child for childKey, child in tree.children if childKey == key), None)
+            if tree is None:
+                return None
+        return tree
+
+    def get(self, path, default=None):
+        child = self.getChild(path)
+        return default if child is None else child.data
+
+    def _forcePath(self, keys):
+        tree = self
+        for key in keys:
+            child = next((child for childKey, child in tree.children if childKey == key), None)
+            if child is None:
+                child = InfoTree()
+                tree.children.append((key, child))
+            tree = child
+        return tree
+
+    def put(self, path, value):
+        '''Sets the value at path, creating it if needed (infoedit -s)'''
+        keys = path.split('.')
+        self._forcePath(keys).data = str(value)
+
+    def add(self, path, value):
+        '''Adds a new child at path even if one with the same key exists (infoedit -p)'''
+        self.addChild(path, InfoTree(str(value)))
+
+    def addChild(self, path, subtree):
+        '''Adds subtree as a new child at path (infoedit -a)'''
+        keys = path.split('.')
+        self._forcePath(keys[:-1]).children.append((keys[-1], subtree))
+
+    def erase(self, path):
+        '''Removes every child matching the last key of path (infoedit -d)'''
+        keys = path.split('.')
+        parent = self.getChild('.'.join(keys[:-1])) if len(keys) > 1 else self
+        if parent is not None:
+            parent.children = [(key, child) for key, child in parent.children if key != keys[-1]]
@@ -21,8 +21,10 @@
 # along with Mini-NDN, e.g., in COPYING.md file.
 # If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
+
 from igraph import Graph
-from mininet.log import info, debug
+from mininet.log import info, debug, warn
 
 
 class LinkInfo(object):
@@ -43,7 +45,12 @@ class IPRoutingHelper(object):
     reachable, even when relaying is required.
 
      Usage from Experiment folder: `IPRoutingHelper.calcAllRoutes(self.net)`
+
+    With mode=IPRoutingHelper.MODE_SHORTEST_PATH_TREE, routes are computed from one shortest
+    path tree per node and installed with one 'ip -batch' per node, all nodes in parallel.
     """
+    MODE_ALL_PAIRS = 'all-pairs'
+    MODE_SHORTEST_PATH_TREE = 'spt'
 
     @staticmethod
     def findLinkInformation(links, first_node, second_node):
@@ -109,7 +116,7 @@ class IPRoutingHelper(object):
         return path
 
     @staticmethod
-    def calcAllRoutes(net):
+    def calcAllRoutes(net, mode=MODE_ALL_PAIRS, maxWorkers=None):
         """ Configures IP routes between all nodes in the emulation topology. This is done in three
          steps:
 
@@ -118,7 +125,13 @@ class IPRoutingHelper(object):
         3) Route add commands are used to actually configure the ip routes
 
         :param net:
+        :param mode: MODE_ALL_PAIRS, or MODE_SHORTEST_PATH_TREE to compute the routes from one
+            shortest path tree per node and install them in one batch per node
+        :param maxWorkers: Number of nodes configured at once in MODE_SHORTEST_PATH_TREE
         """
+        if mode == IPRoutingHelper.MODE_SHORTEST_PATH_TREE:
+            IPRoutingHelper.installRoutes(net, IPRoutingHelper.calcTreeRoutes(net), maxWorkers)
+            return
 
         mini_nodes = net.hosts
         mini_links = net.links
@@ -201,3 +214,107 @@ class IPRoutingHelper(object):
                           .format(start_node, addr, start_intf, gateway_ip))
                     mini_start.cmd('route add -host {} dev {} gw {}'
                                    .format(addr, start_intf, gateway_ip))
+
+    @staticmethod
+    def shortestPathTrees(node_names, edges):
+        """ Returns, for every source node, the first hop towards every node it can reach.
+
+        Paths are shortest in hops, and ties are broken by giving the i-th edge in sorted order an
+        additional weight of 2**i. Sums of distinct powers of two differ, so every shortest path is
+        unique: the path from b to a is the reverse of the path from a to b, and every subpath of a
+        path is itself the chosen path, which the all-pairs mode ensures by rewriting subpaths.
+
+        :param node_names: Names of all nodes
+        :param edges: Pairs of directly connected nodes
+        :return: Dict mapping every source to a dict mapping destinations to first hops
+        """
+        neighbors = {name: [] for name in node_names}
+        for index, (a, b) in enumerate(sorted({tuple(sorted(edge)) for edge in edges})):
+            weight = 1 << index
+            neighbors[a].append((b, weight))
+            neighbors[b].append((a, weight))
+
+        first_hops = {}
+        for source in node_names:
+            hops = {source: 0}
+            ties = {source: 0}
+            first = {}
+            # Breadth first, the ties of a level are final once the previous level is processed
+            level = [source]
+            while level:
+                next_level = []
+                for node in level:
+                    for neighbor, weight in neighbors[node]:
+                        tie = ties[node] + weight
+                        neighbor_hops = hops.get(neighbor)
+                        if neighbor_hops is None:
+                            hops[neighbor] = hops[node] + 1
+                            next_level.append(neighbor)
+                        elif neighbor_hops != hops[node] + 1 or tie >= ties[neighbor]:
+                            continue
+                        ties[neighbor] = tie
+                        first[neighbor] = neighbor if node == source else first[node]
+                level = next_level
+            first_hops[source] = first
+        return first_hops
+
+    @staticmethod
+    def calcTreeRoutes(net):
+        """ Returns the 'ip route' batch commands of every node, from one shortest path tree per node
+
+        :param net: Network whose hosts are routed
+        :return: Dict mapping node names to lists of commands for 'ip -batch'
+        """
+        node_names = [node.name for node in net.hosts]
+        hosts = set(node_names)
+        # The first link between two nodes is used, like findLinkInformation does
+        pair_links = {}
+        for link in net.links:
+            a, b = link.intf1.node.name, link.intf2.node.name
+            if a in hosts and b in hosts:
+                pair_links.setdefault((a, b), LinkInfo(link.intf1.name, link.intf1.ip, link.intf2.name, link.intf2.ip))
+                pair_links.setdefault((b, a), LinkInfo(link.intf2.name, link.intf2.ip, link.intf1.name, link.intf1.ip))
+
+        first_hops = IPRoutingHelper.shortestPathTrees(node_names, pair_links.keys())
+        addresses = {node.name: [intf.ip for intf in node.intfs.values() if intf.ip] for node in net.hosts}
+
+        routes = {}
+        for start_node in node_names:
+            commands = []
+            for end_node, next_hop in first_hops[start_node].items():
+                link_info = pair_links[(start_node, next_hop)]
+                # Same routes as the all-pairs mode: direct neighbors are reached through the exit
+                # interface, further nodes through the neighbor as gateway
+                if next_hop == end_node:
+                    suffix = 'dev {}'.format(link_info.start_intf_name)
+                else:
+                    suffix = 'via {} dev {}'.format(link_info.end_ip, link_info.start_intf_name)
+                for addr in addresses[end_node]:
+                    commands.append('route replace {}/32 {}'.format(addr, suffix))
+            routes[start_node] = commands
+        return routes
+
+    @staticmethod
+    def installRoutes(net, routes, maxWorkers=None):
+        """ Enables IP forwarding and installs the routes of every node with one 'ip -batch',
+        nodes being configured concurrently
+
+        :param net: Network whose hosts are routed
+        :param routes: Dict mapping node names to lists of commands for 'ip -batch'
+        :param maxWorkers: Number of nodes configured at once
+        """
+        def installOnNode(node):
+            batch_file = '{}/ip-routes.batch'.format(node.params['params']['homeDir'])
+            with open(batch_file, 'w') as batch:
+                batch.write('\n'.join(routes.get(node.name, [])) + '\n')
+            # -force keeps going after a failing route so that every failure is reported
+            output = node.cmd('sysctl -q -w net.ipv4.ip_forward=1 && ip -force -batch {}'.format(batch_file))
+            if output.strip():
+                warn('[{}] ip -batch: {}\n'.format(node.name, output.strip()))
+
+        info('Configure IP forwarding and {} routes on all nodes\n'.format(sum(map(len, routes.values()))))
+        if not net.hosts:
+            return
+        # Every node has its own shell, so the commands of different nodes do not interfere
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            list(executor.map(installOnNode, net.hosts))
@@ -0,0 +1,238 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+
+import csv
+import heapq
+import subprocess
+import time
+from itertools import count
+from threading import Condition, Lock, Thread
+
+from mininet.link import TCIntf
+from mininet.log import debug, info, warn
+
+from minindn.helpers.topology_loader import LINK_SCHEMA
+
+class LinkController(object):
+    '''
+    Changes the bandwidth, delay, jitter, loss and queue size of running TCLinks with
+    'tc class change' and 'tc qdisc change', and replays link traces from a single
+    scheduler thread.
+
+    The shaping of a link is changed in place, so a link needs the htb class (bw) and the
+    netem qdisc (delay, jitter, loss or max_queue_size) it is changed on from its topology
+    parameters. netem resets every option missing from a change, so each change restates
+    all of them. Commands run with one 'tc -batch' process per interface rather than in the
+    node shells, which the scheduler thread would otherwise share with the experiment.
+
+    Every change appends one line per interface to <workDir>/link-changes.csv with its wall
+    clock time, to be correlated with the application logs, the lateness of traced changes,
+    whether tc applied it and the resulting shaping of the interface. The parameters of an
+    interface are only updated when its tc batch succeeded, so that readers never see shaping
+    the kernel does not have, and each interface restates its own parameters.
+    '''
+    PARAMS = ['bw', 'delay', 'jitter', 'loss', 'max_queue_size']
+    LOG_COLUMNS = ['time', 'latenessMs', 'link', 'intf', 'source', 'applied'] + PARAMS
+    # Default limit of netem, restated when max_queue_size is not set
+    NETEM_LIMIT = 1000
+
+    def __init__(self, net, workDir, linkParams=None):
+        self.net = net
+        self.linkParams = linkParams
+        self.lock = Lock()
+        self.logFile = '{}/link-changes.csv'.format(workDir)
+        self.log = open(self.logFile, 'w')
+        self.log.write(','.join(LinkController.LOG_COLUMNS) + '\n')
+
+        self._events = []
+        self._sequence = count()
+        self._condition = Condition()
+        self._stopped = False
+        self._thread = None
+
+    def getLink(self, node1, node2):
+        links = self.net.linksBetween(self.net[node1], self.net[node2])
+        if not links:
+            raise ValueError('No link between {} and {}'.format(node1, node2))
+        return links[0]
+
+    @staticmethod
+    def normalizeParams(params):
+        '''Converts user or trace values like the topology parameters, e.g. delay=10 to '10ms' '''
+        normalized = {}
+        for key, value in params.items():
+            if key not in LinkController.PARAMS:
+                raise ValueError('Unknown link parameter {!r}'.format(key))
+            if value is None or value == '':
+                continue
+            normalized[key] = LINK_SCHEMA[key](str(value))
+        return normalized
+
+    @staticmethod
+    def tcCommands(intf, params):
+        '''Returns the tc batch lines applying params, the whole shaping of intf, on intf'''
+        built = intf.params
+        if built.get('use_hfsc') or built.get('use_tbf'):
+            raise ValueError('{}: only htb bandwidth limits can be changed'.format(intf))
+        commands = []
+        if built.get('bw') is not None:
+            commands.append('class change dev {} parent 5:0 classid 5:1 htb rate {:f}Mbit burst 15k'
+                            .format(intf, params['bw']))
+        elif 'bw' in params:
+            raise ValueError('{}: the link has no bandwidth limit to change'.format(intf))
+
+        if built.get('delay') or built.get('jitter') or built.get('loss') or \
+           built.get('max_queue_size') is not None:
+            if built.get('enable_ecn') or built.get('enable_red'):
+                parent = 'parent 6:'
+            else:
+                parent = 'parent 5:1' if built.get('bw') is not None else 'root'
+            netem = ['delay {}'.format(params.get('delay', '0ms'))]
+            if params.get('jitter'):
+                netem.append(params['jitter'])
+            netem.append('loss {:.5f}%'.format(params.get('loss', 0)))
+            netem.append('limit {}'.format(params.get('max_queue_size', LinkController.NETEM_LIMIT)))
+            commands.append('qdisc change dev {} {} handle 10: netem {}'.format(intf, parent, ' '.join(netem)))
+        elif set(params) & {'delay', 'jitter', 'loss', 'max_queue_size'}:
+            raise ValueError('{}: the link has no netem qdisc to change'.format(intf))
+        return commands
+
+    @staticmethod
+    def applyOnIntf(intf, commands):
+        # tc reads the batch from its standard input and keeps going with -force
+        process = intf.node.popen(['tc', '-force', '-batch', '-'], stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate('\n'.join(commands).encode('utf-8'))[0].decode('utf-8')
+        if process.returncode != 0:
+            warn('[{}] tc -batch: {}\n'.format(intf.node.name, output.strip()))
+        return process.returncode == 0
+
+    def change(self, node1, node2, source='api', scheduled=None, **params):
+        '''
+        Changes the given parameters of the link between node1 and node2 on both its
+        interfaces, e.g. change('a', 'b', bw=5, loss=1). Other parameters keep their value.
+        '''
+        link = self.getLink(node1, node2)
+        params = LinkController.normalizeParams(params)
+        with self.lock:
+            lateness = '' if scheduled is None else '{:.3f}'.format((time.monotonic() - scheduled) * 1000)
+            commands = []
+            for intf in [link.intf1, link.intf2]:
+                if not isinstance(intf, TCIntf):
+                    raise ValueError('{} is not a TCLink interface'.format(intf))
+                # Each interface restates its own parameters, they differ after a failed change
+                current = {key: intf.params[key] for key in LinkController.PARAMS if key in intf.params}
+                current.update(params)
+                # Both interfaces are validated before either is changed
+                commands.append((intf, current, LinkController.tcCommands(intf, current)))
+
+            applied = True
+            for intf, current, intfCommands in commands:
+                intfApplied = LinkController.applyOnIntf(intf, intfCommands)
+                if intfApplied:
+                    # Keep the parameters current for the readers of intf.params, such as Nlsr
+                    intf.params.update(params)
+                    if self.linkParams is not None and 'delay' in params:
+                        self.linkParams.update(intf.node, intf, params['delay'])
+                else:
+                    applied = False
+                    # The interface keeps the shaping it had
+                    current = intf.params
+                self.log.write('{:.6f},{},{}:{},{},{},{:d},{}\n'.format(
+                    time.time(), lateness, link.intf1.node.name, link.intf2.node.name, intf.name, source,
+                    intfApplied, ','.join(str(current.get(key, '')) for key in LinkController.PARAMS)))
+            self.log.flush()
+        debug('Link {}:{} changed by {}\n'.format(link.intf1.node.name, link.intf2.node.name, params))
+        return applied
+
+    @staticmethod
+    def readTrace(traceFile):
+        '''
+        Reads a CSV trace with a time column, in seconds from the start of the replay,
+        and any of the bw, delay, jitter, loss and max_queue_size columns. Empty cells
+        keep the previous value. Returns the (time, params) changes sorted by time.
+        '''
+        events = []
+        with open(traceFile, 'r') as trace:
+            reader = csv.DictReader(trace)
+            if 'time' not in (reader.fieldnames or []):
+                raise ValueError('{}: missing time column'.format(traceFile))
+            for line, row in enumerate(reader, 2):
+                try:
+                    offset = float(row.pop('time'))
+                    events.append((offset, LinkController.normalizeParams(row)))
+                except ValueError as e:
+                    raise ValueError('{}: line {}: {}'.format(traceFile, line, e))
+        return sorted(events, key=lambda event: event[0])
+
+    def replay(self, node1, node2, traceFile, startTime=None):
+        '''
+        Schedules the changes of a trace on the link between node1 and node2, relative to
+        startTime (time.monotonic(), now by default). Traces of several links may be replayed
+        at once, they share the scheduler thread.
+        '''
+        self.getLink(node1, node2)
+        events = LinkController.readTrace(traceFile)
+        if startTime is None:
+            startTime = time.monotonic()
+        with self._condition:
+            for offset, params in events:
+                heapq.heappush(self._events, (startTime + offset, next(self._sequence),
+                                              node1, node2, traceFile, params))
+            self._condition.notify()
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='LinkController', daemon=True)
+            self._thread.start()
+        info('Replaying {} changes of {} on {}:{}\n'.format(len(events), traceFile, node1, node2))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and (not self._events or self._events[0][0] > time.monotonic()):
+                    timeout = self._events[0][0] - time.monotonic() if self._events else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                scheduled, _, node1, node2, source, params = heapq.heappop(self._events)
+            try:
+                self.change(node1, node2, source=source, scheduled=scheduled, **params)
+            except ValueError as e:
+                warn('Cannot apply {} to {}:{}: {}\n'.format(source, node1, node2, e))
+
+    def pending(self):
+        with self._condition:
+            return len(self._events)
+
+    def stop(self):
+        '''Cancels the pending trace changes and closes the change log'''
+        with self._condition:
+            self._stopped = True
+            self._events = []
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self.lock:
+            if not self.log.closed:
+                self.log.close()
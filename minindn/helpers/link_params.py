@@ -0,0 +1,111 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+
+from mininet.link import TCIntf
+from mininet.log import debug, warn
+
+from minindn.helpers.topology_loader import toMilliseconds
+
+class LinkParamIndex(object):
+    """
+    Netem delay of the interfaces of a network, in milliseconds. The delays of TCLink
+    interfaces are taken from the parameters they were created with, other interfaces
+    are read with a single 'tc -j qdisc show' per host the first time one is needed.
+
+     Usage: `index = LinkParamIndex(net)` then `index.delay(node, intf)`
+    """
+    # Handle of the netem qdisc added by TCIntf
+    NETEM_HANDLE = '10:'
+
+    def __init__(self, net):
+        self.net = net
+        self.delays = {}
+        self.queriedNodes = set()
+        for link in net.links:
+            for intf in [link.intf1, link.intf2]:
+                self.indexIntf(intf)
+
+    @staticmethod
+    def key(node, intf):
+        # Interfaces may be given by name, as for the wifi interfaces
+        return (node.name, str(intf))
+
+    def indexIntf(self, intf):
+        if not isinstance(intf, TCIntf):
+            return
+        delay = intf.params.get('delay')
+        try:
+            self.delays[self.key(intf.node, intf)] = float(toMilliseconds(str(delay))[:-2]) if delay else 0.0
+        except ValueError:
+            debug('Unknown delay {} of {}, reading it with tc\n'.format(delay, intf))
+
+    def update(self, node, intf, delay):
+        """Records the delay of an interface changed after the network was built, e.g. '20ms'"""
+        self.delays[self.key(node, intf)] = float(toMilliseconds(str(delay))[:-2])
+
+    def invalidate(self, node=None):
+        """Forgets the delays of node, or of every node, which are then read with tc again"""
+        if node is None:
+            self.delays.clear()
+            self.queriedNodes.clear()
+            return
+        self.delays = {key: delay for key, delay in self.delays.items() if key[0] != node.name}
+        self.queriedNodes.discard(node.name)
+
+    def queryNode(self, node):
+        """Reads the netem delay of every interface of node with one tc call"""
+        self.queriedNodes.add(node.name)
+        output = node.cmd('tc -j qdisc show')
+        try:
+            qdiscs = json.loads(output)
+        except ValueError:
+            warn('[{}] Cannot parse the output of tc -j qdisc show: {}\n'.format(node.name, output.strip()))
+            return
+        for qdisc in qdiscs:
+            if qdisc.get('kind') != 'netem' or qdisc.get('handle') != self.NETEM_HANDLE:
+                continue
+            delay = qdisc.get('options', {}).get('delay', 0)
+            if isinstance(delay, dict):
+                delay = delay.get('delay', 0)
+            # tc prints times in seconds in its JSON output
+            self.delays.setdefault(self.key(node, qdisc['dev']), float(delay) * 1000)
+
+    def delay(self, node, intf):
+        """Returns the netem delay of intf of node in milliseconds, 0.0 without netem qdisc"""
+        key = self.key(node, intf)
+        if key not in self.delays and node.name not in self.queriedNodes:
+            self.queryNode(node)
+        return self.delays.get(key, 0.0)
+
+    def bestConnection(self, node, connections):
+        """Returns the (intf, otherIntf) pair of connections with the lowest delay on node's side, and its delay"""
+        best = None
+        bestDelay = None
+        for connection in connections:
+            delay = self.delay(node, connection[0])
+            if bestDelay is None or delay < bestDelay:
+                best, bestDelay = connection, delay
+        return best, bestDelay
@@ -28,6 +28,7 @@ routes and their costs from the given Mini-NDN topology
 '''
 
 import sys
+import time
 import heapq
 from math import sin, cos, sinh, cosh, acos, acosh
 import json
@@ -35,8 +36,13 @@ import operator
 from collections import defaultdict
 from joblib import Parallel, delayed
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from mininet.log import info, debug, error, warn
-from minindn.helpers.nfdc import Nfdc as nfdc
+from minindn.helpers.nfdc import Nfdc as nfdc, NfdcBatch, FaceCache
 
 from minindn.util import MACToEther
 
@@ -71,6 +77,30 @@ def dijkstra(graph, start, end, ignoredNode=None):
             debug("Distance from {} to {} is {}".format(start, end, cost))
             return cost, None
 
+def dijkstraTree(graph, start, ignoredNode=None):
+    """
+    Compute the shortest path tree rooted at a given source using Dijkstra algorithm.
+    Ties are broken in the same order as dijkstra(), so the cost and path found for
+    every destination are identical to a per-destination dijkstra() call.
+
+    :param Graph graph: given network topology/graph
+    :param Start start: source node in a given network graph/topology
+    :param Node ignoredNode: node to ignore computing shortest paths from
+    :return: dict mapping every reachable node to a (cost, path) tuple
+    """
+    tree = {}
+    queue = [(0, start, [])]
+    while queue:
+        (cost, v, path) = heapq.heappop(queue)
+        if v not in tree:
+            path = path + [v]
+            tree[v] = (cost, path)
+            for (_next, c) in graph[v].items():
+                # Ignore path going via ignoreNode, settled nodes can never be improved
+                if _next != ignoredNode and _next not in tree:
+                    heapq.heappush(queue, (cost + c, _next, path))
+    return tree
+
 def calculateAngularDistance(angleVectorI, angleVectorJ):
     """
     For hyperbolic/geohyperbolic routing algorithm, this function computes angular distance between
@@ -136,6 +166,49 @@ def getHyperbolicDistance(sourceNode, destNode):
     debug("Distance from {} to {} is {}".format(sourceNode, destNode, hyperbolicDistance))
     return hyperbolicDistance
 
+def getHyperbolicDistanceMatrix(nodeDict, nodeNames):
+    """
+    Return the N x N matrix of hyperbolic or geohyperbolic distances between the given nodes.
+    Every entry is computed with the same floating point operations as calculateAngularDistance
+    and getHyperbolicDistance, but for all pairs at once with NumPy.
+
+    :param NodeDict nodeDict: node name to {radius: angle vector} mapping
+    :param NodeNames nodeNames: nodes to compute distances for, in matrix order
+    :return: distance matrix, or None if NumPy is not available or the angle vectors of the
+      nodes do not have the same size
+    """
+    if np is None or not nodeNames:
+        return None
+
+    coordinates = [next(iter(nodeDict[name].items())) for name in nodeNames]
+    dimension = len(coordinates[0][1])
+    if any(len(angles) != dimension for _, angles in coordinates):
+        return None
+
+    radius = np.array([r for r, _ in coordinates], dtype=float)
+    angles = np.array([angles for _, angles in coordinates], dtype=float)
+    sinAngles = np.sin(angles)
+
+    # Euclidean coordinates on the unit sphere, see calculateAngularDistance
+    x0 = np.cos(angles[:, 0])
+    xn = sinAngles[:, dimension - 1]
+    for k in range(0, dimension - 1):
+        xn = xn * sinAngles[:, k]
+    innerProduct = np.outer(x0, x0) + np.outer(xn, xn)
+    if dimension > 1:
+        xm = np.cos(angles[:, dimension - 1])
+        for l in range(0, dimension - 1):
+            xm = xm * sinAngles[:, l]
+        innerProduct += np.outer(xm, xm)
+    dtheta = np.arccos(np.clip(innerProduct, -1.0, 1.0))
+
+    zeta = 1.0
+    coshR = np.cosh(zeta * radius)
+    sinhR = np.sinh(zeta * radius)
+    hyperbolicDistance = (1./zeta) * np.arccosh(np.maximum(np.outer(coshR, coshR) -\
+                                                           np.outer(sinhR, sinhR) * np.cos(dtheta), 1.0))
+    return hyperbolicDistance
+
 class _CalculateRoutes(object):
     """
     Creates a route calculation object, which is used to compute routes from a node to
@@ -217,21 +290,44 @@ class _CalculateRoutes(object):
     def computeHyperbolic(self):
         paths = self.getNestedDictionary()
         nodeNames = self.getNodeNames()
+        distanceMatrix = getHyperbolicDistanceMatrix(self.nodeDict, nodeNames)
+        # Neighbor to destination costs are shared by every node having that neighbor
+        neighborCosts = {}
         for node in self.nodeDict:
             neighbors = [k for k in self.adjacenctMatrix[node]]
             for viaNeighbor in neighbors:
                 others = [x for x in nodeNames if x not in [viaNeighbor, node]]
                 paths[node][viaNeighbor][viaNeighbor] = 0
+                if viaNeighbor not in neighborCosts:
+                    neighborCosts[viaNeighbor] = self.getHyperbolicCosts(viaNeighbor, nodeNames,
+                                                                         distanceMatrix)
                 # Compute distance from neighbors to no-neighbors
                 for destinationNode in others:
-                    hyperbolicDistance = getHyperbolicDistance(self.nodeDict[viaNeighbor],
-                                                               self.nodeDict[destinationNode])
-                    hyperbolicCost = int(HYPERBOLIC_COST_ADJUSTMENT_FACTOR \
-                                         * round(hyperbolicDistance, 6))
-                    paths[node][destinationNode][viaNeighbor] = hyperbolicCost
+                    paths[node][destinationNode][viaNeighbor] = neighborCosts[viaNeighbor][destinationNode]
         debug("Shortest Distance Matrix: {}".format(json.dumps(paths)))
         return paths
 
+    def getHyperbolicCosts(self, sourceNode, nodeNames, distanceMatrix=None):
+        """
+        Return the hyperbolic cost from a node to every other node. Distances are read from
+        distanceMatrix (see getHyperbolicDistanceMatrix) if given, else computed pairwise.
+        """
+        costs = {}
+        if distanceMatrix is not None:
+            # tolist() yields Python floats, so round() behaves as for the pairwise distances
+            distances = distanceMatrix[nodeNames.index(sourceNode)].tolist()
+        for index, destinationNode in enumerate(nodeNames):
+            if destinationNode == sourceNode:
+                continue
+            if distanceMatrix is not None:
+                hyperbolicDistance = distances[index]
+            else:
+                hyperbolicDistance = getHyperbolicDistance(self.nodeDict[sourceNode],
+                                                           self.nodeDict[destinationNode])
+            costs[destinationNode] = int(HYPERBOLIC_COST_ADJUSTMENT_FACTOR \
+                                         * round(hyperbolicDistance, 6))
+        return costs
+
     def computeDijkastra(self):
         """
         Dijkstra computation: Compute all the shortest paths from nodes to the destinations.
@@ -240,9 +336,14 @@ class _CalculateRoutes(object):
         distanceMatrix = self.getNestedDictionary()
         nodeNames = self.getNodeNames()
         for node in nodeNames:
+            # One shortest path tree per source instead of one search per destination
+            tree = dijkstraTree(self.adjacenctMatrix, node)
             others = [x for x in nodeNames if x not in [node]]
             for destinationNode in others:
-                cost, path = dijkstra(self.adjacenctMatrix, node, destinationNode)
+                if destinationNode not in tree:
+                    debug("No path from {} to {}".format(node, destinationNode))
+                    continue
+                cost, path = tree[destinationNode]
                 viaNeighbor = path[1]
                 distanceMatrix[node][destinationNode][viaNeighbor] = cost
 
@@ -265,12 +366,17 @@ class _CalculateRoutes(object):
             for viaNeighbor in neighbors:
                 directCost = self.adjacenctMatrix[node][viaNeighbor]
                 distanceMatrixViaNeighbor[node][viaNeighbor][viaNeighbor] = directCost
+                # One shortest path tree per (neighbor, excluded node) pair covers
+                # every destination reachable via this neighbor
+                tree = dijkstraTree(self.adjacenctMatrix, viaNeighbor, node)
                 others = [x for x in nodeNames if x not in [viaNeighbor, node]]
                 for destinationNode in others:
+                    if destinationNode not in tree:
+                        continue
                     nodeNeighborCost = self.adjacenctMatrix[node][viaNeighbor]
                     # path variable is not used for now
-                    cost, path = dijkstra(self.adjacenctMatrix, viaNeighbor, destinationNode, node)
-                    if cost != 0 and path != None:
+                    cost, path = tree[destinationNode]
+                    if cost != 0:
                         totalCost = cost + nodeNeighborCost
                         distanceMatrixViaNeighbor[node][destinationNode][viaNeighbor] = totalCost
 
@@ -285,13 +391,19 @@ class NdnRoutingHelper(object):
     :param NetObject netObject: Mininet net object
     :param FaceType faceType: UDP, Ethernet etc.
     :param Routing routingType: (optional) Routing algorithm, link-state or hr etc
+    :param bool useBatch: (optional) Install the faces and routes of each node through a single
+      nfdc batch file instead of one nfdc command per face and route
 
     """
-    def __init__(self, netObject, faceType=nfdc.PROTOCOL_UDP, routingType="link-state", permanentFaces=False):
+    def __init__(self, netObject, faceType=nfdc.PROTOCOL_UDP, routingType="link-state", permanentFaces=False,
+                 useBatch=False):
         self.net = netObject
         self.faceType = faceType
         self.routingType = routingType
         self.permanentFaces = permanentFaces
+        self.useBatch = useBatch
+        # Node name to (install time in seconds, number of failed nfdc commands), batch mode only
+        self.installReport = {}
         self.routes = []
         self.namePrefixes = {host_name.name: [] for host_name in self.net.hosts}
         self.routeObject = _CalculateRoutes(self.net, self.routingType)
@@ -299,7 +411,9 @@ class NdnRoutingHelper(object):
     def globalRoutingHelperHandler(self):
         info('Creating faces and adding routes to FIB\n')
 
-        if self.faceType == nfdc.PROTOCOL_ETHER:
+        if self.useBatch:
+            add_route_method = self.addNodeRoutesBatch
+        elif self.faceType == nfdc.PROTOCOL_ETHER:
             add_route_method = self.addNodeRoutesEther
         else:
             add_route_method = self.addNodeRoutes
@@ -307,6 +421,11 @@ class NdnRoutingHelper(object):
         res = Parallel(n_jobs=-1, require='sharedmem',
                        prefer="threads", verbose=1)(delayed(add_route_method)(host) for host in self.net.hosts)
 
+        if self.useBatch and self.installReport:
+            failed = sum(nFailed for _, nFailed in self.installReport.values())
+            slowest = max(self.installReport, key=lambda name: self.installReport[name][0])
+            info('Batch install finished, slowest node {} took {:.2f}s, {} failed nfdc commands\n'
+                 .format(slowest, self.installReport[slowest][0], failed))
         info('Processed all the routes to NFD\n')
 
     def addNodeRoutes(self, node):
@@ -329,6 +448,38 @@ class NdnRoutingHelper(object):
         neighborFaces = self.createEtherFaces(node, neighborAddrs)
         self.routeAdd(node, neighborFaces)
 
+    def addNodeRoutesBatch(self, node):
+        """
+        Create faces to neighbors and add all routes for one node with a single nfdc batch
+        file, recording the install time and number of failed commands in installReport
+
+        :param Node node: Node from net object
+        """
+        start = time.time()
+        batch = NfdcBatch()
+        neighborFaces = {}
+        if self.faceType == nfdc.PROTOCOL_ETHER:
+            for k, (localIntf, etherAddr) in self.getNeighborEther(node).items():
+                batch.createFace(etherAddr, self.faceType, self.permanentFaces, localIntf)
+                neighborFaces[k] = etherAddr
+        else:
+            for k, ip in self.getNeighborIP(node).items():
+                batch.createFace(ip, self.faceType, self.permanentFaces)
+                neighborFaces[k] = ip
+
+        # Routes refer to the face by its remote URI as its ID is not known before execution
+        for prefix, nextHop, cost in self.getNodeRoutes(node):
+            batch.registerRoute(prefix, neighborFaces[nextHop], self.faceType, cost=cost)
+
+        process = batch.executeBatch(node, 'nfdc_routes.batch')
+        output = process.communicate()[0].decode('utf-8')
+        debug(output)
+        failed = batch.countFailedCommands(output)
+        if failed:
+            warn('[{}] {} of {} nfdc batch commands failed\n'.format(node.name, failed,
+                                                                    len(batch.batch_commands)))
+        self.installReport[node.name] = (time.time() - start, failed)
+
     def addOrigin(self, nodes, prefix):
         """
         Add prefix/s as origin on node/s
@@ -365,19 +516,41 @@ class NdnRoutingHelper(object):
         self.calculateNPossibleRoutes(nFaces=1)
 
     def createFaces(self, node, neighborIPs):
-        neighborFaces = {}
-        for k, ip in neighborIPs.items():
-            faceID = nfdc.createFace(node, ip, self.faceType, self.permanentFaces)
-            if not isinstance(faceID, str): raise ValueError(faceID)
-            neighborFaces[k] = faceID
-        return neighborFaces
+        faces = {k: (ip, '') for k, ip in neighborIPs.items()}
+        return self.createFacesFromCache(node, faces)
 
     def createEtherFaces(self, node, neighborLocations):
+        faces = {k: (etherAddr, localIntf) for k, (localIntf, etherAddr) in neighborLocations.items()}
+        return self.createFacesFromCache(node, faces)
+
+    def createFacesFromCache(self, node, faces):
+        """
+        Create faces to neighbors with one nfdc batch and resolve their IDs from the node's
+        FaceCache. Only faces missing from the batch output cost an nfdc round-trip.
+
+        :param Node node: Node from net object
+        :param dict faces: neighbor name to (remote address, local interface) tuple
+        """
+        batch = NfdcBatch()
+        for address, localIntf in faces.values():
+            batch.createFace(address, self.faceType, self.permanentFaces, localIntf)
+        faceCache = FaceCache.forNode(node)
+        if batch.batch_commands:
+            output = batch.executeBatch(node, 'nfdc_faces.batch').communicate()[0].decode('utf-8')
+            debug(output)
+            faceCache.update(output)
+
         neighborFaces = {}
-        for k, intfLocTuple in neighborLocations.items():
-            localIntf, etherAddr = intfLocTuple 
-            faceID = nfdc.createFace(node, etherAddr, self.faceType, self.permanentFaces, localIntf)
-            if not isinstance(faceID, str): raise ValueError(faceID)
+        refreshed = False
+        for k, (address, localIntf) in faces.items():
+            faceID = faceCache.getFaceId(address, self.faceType, localIntf)
+            if faceID == -1 and not refreshed:
+                faceCache.refresh()
+                refreshed = True
+                faceID = faceCache.getFaceId(address, self.faceType, localIntf)
+            if faceID == -1:
+                faceID = nfdc.createFace(node, address, self.faceType, self.permanentFaces, localIntf)
+                if not isinstance(faceID, str): raise ValueError(faceID)
             neighborFaces[k] = faceID
         return neighborFaces
 
@@ -389,6 +562,17 @@ class NdnRoutingHelper(object):
         :param Node node: source node (Mininet net.host)
         :param IP neighborIPs: IP addresses of neighbors
         """
+        for prefix, nextHop, cost in self.getNodeRoutes(node):
+            # Register routes to all the available destination name prefix/s
+            nfdc.registerRoute(node, prefix, neighborFaces[nextHop], cost=cost)
+
+    def getNodeRoutes(self, node):
+        """
+        Yield (prefix, next hop node name, cost) for every prefix advertised by the
+        destinations of the computed routes of a node
+
+        :param Node node: source node (Mininet net.host)
+        """
         neighbors = self.routes[node.name]
         for route in neighbors:
             destination = route[0]
@@ -397,8 +581,7 @@ class NdnRoutingHelper(object):
             defaultPrefix = "/ndn/{}-site/{}".format(destination, destination)
             prefixes = [defaultPrefix] + self.namePrefixes[destination]
             for prefix in prefixes:
-                # Register routes to all the available destination name prefix/s
-                nfdc.registerRoute(node, prefix, neighborFaces[nextHop], cost=cost)
+                yield prefix, nextHop, cost
 
     @staticmethod
     def getNeighborIP(node):
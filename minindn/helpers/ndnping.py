@@ -23,6 +23,8 @@
 
 import time
 
+from minindn.helpers.teardown import Teardown
+
 # Todo: convert to app
 
 class NDNPing(object):
@@ -33,7 +35,7 @@ class NDNPing(object):
         print('Scheduling ping(s) from {} for {}'.format(source.name, prefix))
         # Use '&' to run in background and perform parallel pings
         source.cmd("mkdir -p ping-data")
-        source.cmd('ndnping{1}{2}{3}{4}{5}{6}{7} {0} >> ping-data/{8}.txt &'
+        Teardown.runInBackground(source, 'ndnping{1}{2}{3}{4}{5}{6}{7} {0} >> ping-data/{8}.txt &'
         .format(
             prefix,
             ' -c {}'.format(nPings),
@@ -70,4 +72,4 @@ class NDNPing(object):
             '{}'.format('-q') if quiet else '',
             pingDataFile
         )
-        source.cmd(cmd)
\ No newline at end of file
+        Teardown.runInBackground(source, cmd)
\ No newline at end of file
@@ -26,11 +26,16 @@ from minindn.minindn import Minindn
 from minindn.util import MACToEther, getPopen
 
 from subprocess import PIPE
+from threading import Lock
 
 # If needed (e.g. to speed up the process), use a smaller (or larger value)
 # based on your machines resource (CPU, memory)
 SLEEP_TIME = 0.0015
 
+# Status words printed by nfdc for commands that took effect
+_SUCCESS_STATUSES = ('face-created', 'face-exists', 'face-updated', 'face-destroyed',
+                     'route-add-accepted', 'route-removed', 'strategy-set', 'strategy-unset')
+
 class _NfdcBase(object):
     STRATEGY_ASF = 'asf'
     STRATEGY_BEST_ROUTE = 'best-route'
@@ -99,6 +104,80 @@ def _unsetStrategy(namePrefix):
     cmd = f'strategy unset {namePrefix}'
     return cmd
 
+def _faceUri(remoteNodeAddress, protocol=_NfdcBase.PROTOCOL_UDP, portNum="6363"):
+    '''Returns the canonical FaceUri NFD reports for a remote address, e.g. udp4://10.0.0.2:6363'''
+    if protocol == "ether":
+        return f'ether://{MACToEther(remoteNodeAddress).lower()}'
+    if protocol in (_NfdcBase.PROTOCOL_UDP, _NfdcBase.PROTOCOL_TCP):
+        if remoteNodeAddress.count(':') > 1:
+            return f'{protocol}6://[{remoteNodeAddress.strip("[]")}]:{portNum}'
+        if ':' not in remoteNodeAddress:
+            remoteNodeAddress = f'{remoteNodeAddress}:{portNum}'
+        return f'{protocol}4://{remoteNodeAddress}'
+    return f'{protocol}://{remoteNodeAddress}'
+
+class FaceCache(object):
+    '''Per-node cache of the faces of a node's NFD instance, keyed by canonical remote FaceUri.
+    It is populated from a single "nfdc face list" and updated from the output of face
+    creations, so face IDs can be resolved without one nfdc round-trip per face.'''
+    _caches = {}
+    _lock = Lock()
+
+    def __init__(self, node):
+        self.node = node
+        # Remote FaceUri -> list of (faceId, local FaceUri)
+        self.faces = {}
+
+    @staticmethod
+    def forNode(node):
+        '''Returns the face cache of a node, creating an empty one if needed'''
+        with FaceCache._lock:
+            if node not in FaceCache._caches:
+                FaceCache._caches[node] = FaceCache(node)
+            return FaceCache._caches[node]
+
+    @staticmethod
+    def invalidate(node=None):
+        '''Drops the cache of a node, or of all nodes if none is given'''
+        with FaceCache._lock:
+            if node is None:
+                FaceCache._caches.clear()
+            else:
+                FaceCache._caches.pop(node, None)
+
+    def refresh(self):
+        '''Reloads the cache from a single "nfdc face list" dump'''
+        output = self.node.cmd('nfdc face list')
+        debug(output)
+        self.faces = {}
+        self.update(output)
+
+    def update(self, output):
+        '''Adds the faces listed ("faceid=") or created ("face-created id=", "face-exists id=",
+        "face-updated id=") in nfdc output to the cache, replacing the entry of the same
+        remote and local FaceUri'''
+        for line in output.splitlines():
+            line = line.strip()
+            if not line.startswith(('faceid=', 'face-created', 'face-exists', 'face-updated')):
+                continue
+            fields = dict(token.split('=', 1) for token in line.split() if '=' in token)
+            faceId = fields.get('faceid', fields.get('id'))
+            remote = fields.get('remote')
+            if faceId is None or remote is None:
+                continue
+            local = fields.get('local', '')
+            # A face recreated for the same remote and local FaceUri supersedes the old one
+            entries = [entry for entry in self.faces.get(remote, [])
+                       if entry[0] != faceId and entry[1] != local]
+            self.faces[remote] = entries + [(faceId, local)]
+
+    def getFaceId(self, remoteNodeAddress, protocol=_NfdcBase.PROTOCOL_UDP, localInterface='', portNum="6363"):
+        '''Returns the cached faceId for a remote node, or -1 if the face is not in the cache'''
+        for faceId, local in self.faces.get(_faceUri(remoteNodeAddress, protocol, portNum), []):
+            if not localInterface or local == f'dev://{localInterface}':
+                return faceId
+        return -1
+
 class Nfdc(_NfdcBase):
     @staticmethod
     def registerRoute(node, namePrefix, remoteNode, protocol=_NfdcBase.PROTOCOL_UDP, origin=255,
@@ -132,6 +211,7 @@ class Nfdc(_NfdcBase):
     def destroyFace(node, remoteNode, protocol=_NfdcBase.PROTOCOL_UDP):
         cmd = "nfdc " + _destroyFace(remoteNode, protocol)
         debug(node.cmd(cmd))
+        FaceCache.invalidate(node)
         Minindn.sleep(SLEEP_TIME)
 
     @staticmethod
@@ -150,8 +230,14 @@ class Nfdc(_NfdcBase):
         Minindn.sleep(SLEEP_TIME)
 
     @staticmethod
-    def getFaceId(node, remoteNodeAddress, localEndpoint=None, protocol=_NfdcBase.PROTOCOL_UDP, portNum="6363"):
-        '''Returns the faceId for a remote node based on FaceURI, or -1 if a face is not found'''
+    def getFaceId(node, remoteNodeAddress, localEndpoint=None, protocol=_NfdcBase.PROTOCOL_UDP, portNum="6363",
+                  useCache=False):
+        '''Returns the faceId for a remote node based on FaceURI, or -1 if a face is not found.
+        With useCache, the node's FaceCache is consulted before querying NFD.'''
+        if useCache and not localEndpoint:
+            faceId = FaceCache.forNode(node).getFaceId(remoteNodeAddress, protocol, portNum=portNum)
+            if faceId != -1:
+                return faceId
         # Because this is an interactive helper method, we don't split this into _NfdcBase.
         local = ""
         if localEndpoint:
@@ -190,6 +276,12 @@ class NfdcBatch(_NfdcBase):
         # temporary files.
         return process
 
+    def countFailedCommands(self, output):
+        '''Returns the number of batch commands not confirmed in the output of an executed batch.
+        nfdc stops at the first failing command, so this also counts the commands never run.'''
+        succeeded = sum(1 for line in output.splitlines() if line.startswith(_SUCCESS_STATUSES))
+        return max(len(self.batch_commands) - succeeded, 0)
+
     def registerRoute(self, namePrefix, remoteNode, protocol=_NfdcBase.PROTOCOL_UDP, origin=255,
                       cost=0, inheritFlag=True, captureFlag=False, expirationInMillis=None):
         self.batch_commands.append(_registerRoute(namePrefix, remoteNode, protocol, origin, cost, inheritFlag, captureFlag, expirationInMillis))
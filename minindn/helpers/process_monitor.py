@@ -21,9 +21,14 @@
 # along with Mini-NDN, e.g., in COPYING.md file.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import os
+import struct
 import time
 
-from threading import Timer
+from threading import Event, Lock, Thread, Timer
+
+from mininet.log import debug, info
 
 class ProcessMonitor(object):
     def __init__(self, processId, processName, outputDir, interval=1):
@@ -50,3 +55,160 @@ class ProcessMonitor(object):
     def start(self):
         self._timer = Timer(self._interval, self._recordStats)
         self._timer.start()
+
+class ProcessSampler(object):
+    '''
+    Samples /proc/<pid>/stat, statm and io of every registered process from a single thread
+    and writes fixed-width binary records to one preallocated file. The file metadata
+    (record fields, process names and the measured sampler overhead) goes to <outputFile>.json.
+    '''
+    # time (s), pid, utime and stime (clock ticks), RSS, read and write bytes
+    FIELDS = ['time', 'pid', 'utime', 'stime', 'rss', 'readBytes', 'writeBytes']
+    RECORD = struct.Struct('<dQQQQQQ')
+    # Same layout for numpy, e.g. numpy.fromfile(outputFile, dtype=ProcessSampler.DTYPE)
+    DTYPE = [(field, '<f8' if field == 'time' else '<u8') for field in FIELDS]
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+    def __init__(self, outputFile, interval=1, capacity=100000):
+        self.outputFile = outputFile
+        self.interval = interval
+        self.capacity = capacity
+        self.processes = {}
+        # Every process ever registered, exited ones included, named in the metadata
+        self.names = {}
+        self.records = 0
+        self.lock = Lock()
+        self._stopEvent = Event()
+        self._thread = None
+        self._fd = os.open(outputFile, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._preallocate(capacity)
+        self._ticks = 0
+        self._tickTime = 0.0
+        self._maxTickTime = 0.0
+        self._overruns = 0
+        self._cpuTime = 0.0
+        self._wallTime = 0.0
+
+    def _preallocate(self, capacity):
+        try:
+            os.posix_fallocate(self._fd, 0, capacity * self.RECORD.size)
+        except (AttributeError, OSError):
+            os.ftruncate(self._fd, capacity * self.RECORD.size)
+        self.capacity = capacity
+
+    def register(self, processId, processName):
+        with self.lock:
+            pid = int(str(processId).strip())
+            self.processes[pid] = processName
+            self.names[pid] = processName
+
+    def unregister(self, processId):
+        with self.lock:
+            self.processes.pop(int(str(processId).strip()), None)
+
+    @staticmethod
+    def _read(path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.read(fd, 4096)
+        finally:
+            os.close(fd)
+
+    def readProcess(self, pid):
+        '''Returns (utime, stime, rss, readBytes, writeBytes) of a process'''
+        # The command name can hold spaces and parentheses, fields start after the last ')'
+        stat = self._read('/proc/{}/stat'.format(pid))
+        fields = stat[stat.rindex(b')') + 2:].split()
+        rss = int(self._read('/proc/{}/statm'.format(pid)).split()[1]) * self.PAGE_SIZE
+        readBytes = writeBytes = 0
+        try:
+            for line in self._read('/proc/{}/io'.format(pid)).splitlines():
+                if line.startswith(b'read_bytes:'):
+                    readBytes = int(line.split()[1])
+                elif line.startswith(b'write_bytes:'):
+                    writeBytes = int(line.split()[1])
+        except PermissionError:
+            pass
+        return int(fields[11]), int(fields[12]), rss, readBytes, writeBytes
+
+    def sample(self):
+        currentTime = time.time()
+        with self.lock:
+            pids = list(self.processes)
+        buffer = bytearray()
+        for pid in pids:
+            try:
+                buffer += self.RECORD.pack(currentTime, pid, *self.readProcess(pid))
+            except (OSError, ValueError, IndexError):
+                debug('Process {} ({}) exited, no longer sampled\n'.format(pid, self.processes.get(pid)))
+                self.unregister(pid)
+
+        count = len(buffer) // self.RECORD.size
+        if self.records + count > self.capacity:
+            self._preallocate(max(2 * self.capacity, self.records + count))
+        os.pwrite(self._fd, bytes(buffer), self.records * self.RECORD.size)
+        self.records += count
+
+    def _run(self):
+        start = time.monotonic()
+        startCpu = time.thread_time()
+        deadline = start
+        while not self._stopEvent.is_set():
+            tickStart = time.monotonic()
+            self.sample()
+            tickTime = time.monotonic() - tickStart
+            self._ticks += 1
+            self._tickTime += tickTime
+            self._maxTickTime = max(self._maxTickTime, tickTime)
+
+            deadline += self.interval
+            if deadline < time.monotonic():
+                # Skip the missed ticks rather than sampling in a burst
+                self._overruns += 1
+                deadline = time.monotonic()
+            self._stopEvent.wait(deadline - time.monotonic())
+        self._cpuTime = time.thread_time() - startCpu
+        self._wallTime = time.monotonic() - start
+
+    def start(self):
+        self._thread = Thread(target=self._run, name='ProcessSampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Stops sampling, trims the file to the recorded samples and returns the overhead report'''
+        if self._thread is not None:
+            self._stopEvent.set()
+            self._thread.join()
+            self._thread = None
+        os.ftruncate(self._fd, self.records * self.RECORD.size)
+        os.close(self._fd)
+
+        overhead = self.overhead()
+        with open('{}.json'.format(self.outputFile), 'w') as metadata:
+            json.dump({'fields': self.FIELDS, 'format': self.RECORD.format, 'interval': self.interval,
+                       'processes': {str(pid): name for pid, name in self.names.items()},
+                       'records': self.records, 'overhead': overhead}, metadata, indent=2)
+        info('Process sampler: {} records in {} ticks, {:.3f} ms per tick (max {:.3f} ms), '
+             '{:.2f}% of a CPU, {} overruns\n'
+             .format(self.records, overhead['ticks'], overhead['meanTickMs'], overhead['maxTickMs'],
+                     overhead['cpuPercent'], overhead['overruns']))
+        return overhead
+
+    def overhead(self):
+        return {'ticks': self._ticks,
+                'meanTickMs': 1000 * self._tickTime / self._ticks if self._ticks else 0.0,
+                'maxTickMs': 1000 * self._maxTickTime,
+                'cpuSeconds': self._cpuTime,
+                'cpuPercent': 100 * self._cpuTime / self._wallTime if self._wallTime else 0.0,
+                'overruns': self._overruns}
+
+    @staticmethod
+    def readRecords(outputFile):
+        '''Yields the records of a sampler file as dictionaries'''
+        with open(outputFile, 'rb') as samples:
+            while True:
+                chunk = samples.read(ProcessSampler.RECORD.size * 4096)
+                if not chunk:
+                    return
+                for record in ProcessSampler.RECORD.iter_unpack(chunk):
+                    yield dict(zip(ProcessSampler.FIELDS, record))
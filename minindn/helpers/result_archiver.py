@@ -0,0 +1,303 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+
+import errno
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from mininet.log import info, warn
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class _HashingReader(object):
+    '''File object wrapper computing the sha256 and size of what is read through it'''
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.sha256.update(data)
+        self.size += len(data)
+        return data
+
+class ResultArchiver(object):
+    '''
+    Saves the files of a working directory into a result directory on a thread pool, one
+    task per node directory, and removes the saved originals and the directories they leave
+    empty, as moving them used to. Paths relative to the working directory are matched
+    against the include and exclude globs, e.g. exclude=['*.pcap', '*/log/nfd.log'].
+    Symbolic links are saved as links, special files such as sockets are left in place.
+
+    FORMAT_FILES moves the files as they are, copying them only across file systems.
+    FORMAT_TAR streams every node directory into a
+    compressed <node>.tar.gz (or .tar.zst) archive. FORMAT_STORE compresses every distinct file
+    content once into objects/, named after its sha256, which deduplicates the configuration
+    files and keys shared by the nodes. Files at the top of the working directory, such as run
+    summaries, are always moved as they are.
+
+    manifest.json lists the size, sha256 and location of every saved file, and the target of
+    every link, readFile() uses it to read one file back without extracting the others.
+    '''
+    FORMAT_FILES = 'files'
+    FORMAT_TAR = 'tar'
+    FORMAT_STORE = 'store'
+    FORMATS = [FORMAT_FILES, FORMAT_TAR, FORMAT_STORE]
+    COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+    MANIFEST = 'manifest.json'
+    CHUNK_SIZE = 1 << 20
+    GZIP_LEVEL = 6
+    ZSTD_LEVEL = 3
+
+    def __init__(self, workDir, resultDir, resultFormat=FORMAT_FILES, include=None, exclude=None,
+                 compression='gzip', maxWorkers=None):
+        if resultFormat not in ResultArchiver.FORMATS:
+            raise ValueError('Unknown result format {!r}'.format(resultFormat))
+        if compression not in ResultArchiver.COMPRESSION_EXTENSIONS:
+            raise ValueError('Unknown compression {!r}'.format(compression))
+        if compression == 'zstd' and zstandard is None:
+            warn('zstandard is not installed, results are compressed with gzip\n')
+            compression = 'gzip'
+        self.workDir = os.path.abspath(workDir)
+        self.resultDir = os.path.abspath(resultDir)
+        self.resultFormat = resultFormat
+        self.include = include or ['*']
+        self.exclude = exclude or []
+        self.compression = compression
+        self.maxWorkers = maxWorkers
+        self._temporary = count()
+
+    def isSelected(self, path):
+        return any(fnmatch.fnmatch(path, pattern) for pattern in self.include) and \
+               not any(fnmatch.fnmatch(path, pattern) for pattern in self.exclude)
+
+    def selectFiles(self):
+        '''Returns the selected regular files and links relative to workDir, grouped by node directory'''
+        groups = {}
+        skipped = []
+        for directory, dirNames, fileNames in os.walk(self.workDir):
+            relativeDir = os.path.relpath(directory, self.workDir)
+            # Links to directories are saved as links rather than walked
+            links = [name for name in dirNames if os.path.islink(os.path.join(directory, name))]
+            dirNames[:] = sorted(name for name in dirNames if name not in links)
+            for name in sorted(fileNames + links):
+                path = name if relativeDir == '.' else os.path.join(relativeDir, name)
+                fullPath = os.path.join(self.workDir, path)
+                if not self.isSelected(path):
+                    continue
+                if not os.path.islink(fullPath) and not os.path.isfile(fullPath):
+                    skipped.append(path)
+                    continue
+                # Top level files form the '' group
+                group = path.split(os.sep)[0] if relativeDir != '.' else ''
+                groups.setdefault(group, []).append(path)
+        if skipped:
+            warn('{} special files are not saved and stay in {}, e.g. {}\n'
+                 .format(len(skipped), self.workDir, skipped[0]))
+        return groups
+
+    def compressor(self, fileobj):
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=ResultArchiver.GZIP_LEVEL, mtime=0)
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=ResultArchiver.ZSTD_LEVEL).stream_writer(fileobj, closefd=False)
+        return fileobj
+
+    @staticmethod
+    def decompressor(fileobj, compression):
+        if compression == 'gzip':
+            return gzip.GzipFile(fileobj=fileobj, mode='rb')
+        if compression == 'zstd':
+            if zstandard is None:
+                raise ImportError('zstandard is required to read zstd compressed results')
+            return zstandard.ZstdDecompressor().stream_reader(fileobj)
+        return fileobj
+
+    def moveFile(self, path):
+        source = os.path.join(self.workDir, path)
+        target = os.path.join(self.resultDir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        link = os.readlink(source) if os.path.islink(source) else None
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Across file systems the file is copied, archive() removes the original
+            if link is not None:
+                if os.path.lexists(target):
+                    os.remove(target)
+                os.symlink(link, target)
+            else:
+                with open(source, 'rb') as original, open(target, 'wb') as destination:
+                    reader = _HashingReader(original)
+                    shutil.copyfileobj(reader, destination, ResultArchiver.CHUNK_SIZE)
+                return {'size': reader.size, 'sha256': reader.sha256.hexdigest()}
+        if link is not None:
+            return {'size': 0, 'symlink': link}
+        with open(target, 'rb') as moved:
+            reader = _HashingReader(moved)
+            while reader.read(ResultArchiver.CHUNK_SIZE):
+                pass
+        return {'size': reader.size, 'sha256': reader.sha256.hexdigest()}
+
+    def archiveGroup(self, group, paths):
+        archive = '{}.tar{}'.format(group, ResultArchiver.COMPRESSION_EXTENSIONS[self.compression])
+        entries = {}
+        with open(os.path.join(self.resultDir, archive), 'wb') as output:
+            stream = self.compressor(output)
+            # Streaming mode, the archive is never seeked so it can be compressed on the fly
+            with tarfile.open(fileobj=stream, mode='w|') as tar:
+                for path in paths:
+                    fullPath = os.path.join(self.workDir, path)
+                    if os.path.islink(fullPath):
+                        member = tar.gettarinfo(fullPath, arcname=path)
+                        tar.addfile(member)
+                        entries[path] = {'size': 0, 'symlink': member.linkname, 'archive': archive}
+                        continue
+                    with open(fullPath, 'rb') as source:
+                        reader = _HashingReader(source)
+                        tar.addfile(tar.gettarinfo(fullPath, arcname=path, fileobj=source), reader)
+                    entries[path] = {'size': reader.size, 'sha256': reader.sha256.hexdigest(), 'archive': archive}
+            if stream is not output:
+                stream.close()
+        return entries
+
+    def storeFile(self, path):
+        if os.path.islink(os.path.join(self.workDir, path)):
+            return {'size': 0, 'symlink': os.readlink(os.path.join(self.workDir, path))}
+        objectsDir = os.path.join(self.resultDir, 'objects')
+        temporaryFile = os.path.join(objectsDir, '.tmp-{}-{}'.format(os.getpid(), next(self._temporary)))
+        with open(os.path.join(self.workDir, path), 'rb') as source, open(temporaryFile, 'wb') as output:
+            reader = _HashingReader(source)
+            stream = self.compressor(output)
+            shutil.copyfileobj(reader, stream, ResultArchiver.CHUNK_SIZE)
+            if stream is not output:
+                stream.close()
+        digest = reader.sha256.hexdigest()
+        objectName = 'objects/{}/{}{}'.format(digest[:2], digest[2:], ResultArchiver.COMPRESSION_EXTENSIONS[self.compression])
+        target = os.path.join(self.resultDir, objectName)
+        if os.path.exists(target):
+            os.remove(temporaryFile)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temporaryFile, target)
+        return {'size': reader.size, 'sha256': digest, 'object': objectName}
+
+    def saveGroup(self, group, paths):
+        if group == '' or self.resultFormat == ResultArchiver.FORMAT_FILES:
+            return {path: self.moveFile(path) for path in paths}
+        if self.resultFormat == ResultArchiver.FORMAT_TAR:
+            return self.archiveGroup(group, paths)
+        return {path: self.storeFile(path) for path in paths}
+
+    def archive(self):
+        '''Saves the selected files, writes the manifest and removes the originals, returns the manifest'''
+        start = time.time()
+        os.makedirs(self.resultDir, exist_ok=True)
+        if self.resultFormat == ResultArchiver.FORMAT_STORE:
+            os.makedirs(os.path.join(self.resultDir, 'objects'), exist_ok=True)
+        groups = self.selectFiles()
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            results = list(executor.map(lambda group: self.saveGroup(*group), sorted(groups.items())))
+        files = {}
+        for entries in results:
+            files.update(entries)
+
+        manifest = {'format': self.resultFormat, 'compression': self.compression,
+                    'workDir': self.workDir, 'created': time.time(), 'files': files}
+        manifestFile = os.path.join(self.resultDir, ResultArchiver.MANIFEST)
+        with open(manifestFile + '.tmp', 'w') as output:
+            json.dump(manifest, output, indent=1, sort_keys=True)
+        os.replace(manifestFile + '.tmp', manifestFile)
+
+        # Only once everything is saved, excluded files stay in the working directory.
+        # Moved files are already gone, copied ones are removed.
+        directories = set()
+        for path in files:
+            fullPath = os.path.join(self.workDir, path)
+            if os.path.lexists(fullPath):
+                os.remove(fullPath)
+            directory = os.path.dirname(path)
+            while directory:
+                directories.add(directory)
+                directory = os.path.dirname(directory)
+        # Deepest first, directories still holding excluded or special files stay
+        for directory in sorted(directories, key=lambda directory: directory.count(os.sep), reverse=True):
+            try:
+                os.rmdir(os.path.join(self.workDir, directory))
+            except OSError:
+                pass
+        size = sum(entry['size'] for entry in files.values())
+        info('Saved {} files ({:.1f} MB) to {} in {:.2f} seconds\n'
+             .format(len(files), size / 1e6, self.resultDir, time.time() - start))
+        return manifest
+
+    @staticmethod
+    def readManifest(resultDir):
+        with open(os.path.join(resultDir, ResultArchiver.MANIFEST), 'r') as manifest:
+            return json.load(manifest)
+
+    @staticmethod
+    def readFile(resultDir, path, manifest=None):
+        '''Returns the content of a saved file, given by its path relative to the working directory'''
+        if manifest is None:
+            manifest = ResultArchiver.readManifest(resultDir)
+        entry = manifest['files'][path]
+        if 'symlink' in entry:
+            target = os.path.normpath(os.path.join(os.path.dirname(path), entry['symlink']))
+            if os.path.isabs(target) and target.startswith(manifest['workDir'] + os.sep):
+                target = os.path.relpath(target, manifest['workDir'])
+            if target in manifest['files']:
+                return ResultArchiver.readFile(resultDir, target, manifest)
+            if not os.path.isabs(entry['symlink']):
+                raise KeyError('{} links to {}, which is not in the results'.format(path, target))
+            with open(entry['symlink'], 'rb') as source:
+                return source.read()
+        if 'object' in entry:
+            with open(os.path.join(resultDir, entry['object']), 'rb') as source:
+                return ResultArchiver.decompressor(source, manifest['compression']).read()
+        if 'archive' in entry:
+            with open(os.path.join(resultDir, entry['archive']), 'rb') as source:
+                with tarfile.open(fileobj=ResultArchiver.decompressor(source, manifest['compression']),
+                                  mode='r|') as tar:
+                    for member in tar:
+                        if member.name == path:
+                            return tar.extractfile(member).read()
+            raise KeyError('{} is missing from {}'.format(path, entry['archive']))
+        with open(os.path.join(resultDir, path), 'rb') as source:
+            return source.read()
@@ -0,0 +1,327 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+
+import csv
+import glob
+import json
+import random
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+
+from mininet.log import debug, info, warn
+
+from minindn.util import getPopen
+
+class Scenario(object):
+    '''
+    Runs a timeline of failures and recoveries against a running Mini-NDN experiment and
+    measures how the routing and the consumers react to each event.
+
+    The timeline is a CSV file with time (seconds from the start), action, target and args
+    columns:
+      link-down / link-up    target node1:node2
+      kill / restart         target node/app, or node for all its apps, app being a key of apps
+      withdraw / advertise   target node, args the name prefix given to nlsrc
+    A target written random or random:<label> is drawn from the seeded generator when the
+    timeline is loaded, events sharing a label get the same draw, e.g. a link that goes down
+    and comes back up. The resolved timeline only depends on the seed and the topology.
+
+    While the timeline runs, the FIB of every host and the number of lines of the throughput
+    logs, e.g. the RTT logs of the consumers which hold one line per received segment, are
+    sampled every interval seconds. For each event, the reconvergence time is the last FIB
+    change before the next event, and the throughput dip compares the segment rate after the
+    event with its mean over the baseline seconds before it.
+    Results are written to <workDir>/scenario-results.json and scenario-throughput.csv.
+    '''
+    LINK_DOWN = 'link-down'
+    LINK_UP = 'link-up'
+    KILL = 'kill'
+    RESTART = 'restart'
+    WITHDRAW = 'withdraw'
+    ADVERTISE = 'advertise'
+    ACTIONS = [LINK_DOWN, LINK_UP, KILL, RESTART, WITHDRAW, ADVERTISE]
+    RANDOM = 'random'
+    # Fraction of the baseline rate the throughput is considered recovered at
+    RECOVERY_RATIO = 0.9
+
+    def __init__(self, ndn, timelineFile, apps=None, seed=0, throughputLogs=None, interval=0.5,
+                 baseline=5, settleTime=5, timeout=60, maxWorkers=None):
+        '''
+        :param apps: name -> {node name: Application} mapping, such as AppManager instances,
+          e.g. {'nfd': nfds, 'nlsr': nlsrs}, ordered from the lowest layer
+        :param throughputLogs: file paths or glob patterns of the logs counted as throughput
+        :param settleTime: seconds without FIB change after the last event ending the scenario
+        :param timeout: seconds after the last event after which the scenario ends regardless
+        '''
+        self.ndn = ndn
+        self.net = ndn.net
+        self.timelineFile = timelineFile
+        self.apps = apps or {}
+        self.seed = seed
+        self.throughputLogs = throughputLogs or []
+        self.interval = interval
+        self.baseline = baseline
+        self.settleTime = settleTime
+        self.timeout = timeout
+        self.maxWorkers = maxWorkers
+
+        self.events = self.resolve(Scenario.readTimeline(timelineFile), random.Random(seed))
+        self.lock = Lock()
+        self.fibs = {}
+        self.fibChanges = []
+        self.samples = []
+        self._offsets = {}
+        self._lines = 0
+        self.startTime = None
+        self.results = None
+        self._thread = None
+        self._stopEvent = Event()
+        self._monitorStopEvent = Event()
+
+    @staticmethod
+    def readTimeline(timelineFile):
+        '''Returns the events of a timeline file sorted by time, raises ValueError on invalid lines'''
+        events = []
+        with open(timelineFile, 'r') as timeline:
+            reader = csv.DictReader(row for row in timeline if not row.startswith('#'))
+            for line, row in enumerate(reader, 2):
+                action = (row.get('action') or '').strip()
+                target = (row.get('target') or '').strip()
+                if action not in Scenario.ACTIONS:
+                    raise ValueError('{}: line {}: unknown action {!r}'.format(timelineFile, line, action))
+                if not target:
+                    raise ValueError('{}: line {}: missing target'.format(timelineFile, line))
+                try:
+                    offset = float(row.get('time'))
+                except (TypeError, ValueError):
+                    raise ValueError('{}: line {}: invalid time {!r}'.format(timelineFile, line, row.get('time')))
+                args = (row.get('args') or '').strip()
+                if action in [Scenario.WITHDRAW, Scenario.ADVERTISE] and not args:
+                    raise ValueError('{}: line {}: {} needs a prefix'.format(timelineFile, line, action))
+                events.append({'time': offset, 'action': action, 'target': target, 'args': args})
+        return sorted(events, key=lambda event: event['time'])
+
+    def resolve(self, events, rng):
+        '''Replaces the random targets of events, drawing them in timeline order'''
+        links = sorted('{}:{}'.format(*sorted([link.intf1.node.name, link.intf2.node.name]))
+                       for link in self.net.links)
+        hosts = sorted(host.name for host in self.net.hosts)
+        draws = {}
+        for event in events:
+            label, _, app = event['target'].partition('/')
+            if label != Scenario.RANDOM and not label.startswith(Scenario.RANDOM + ':'):
+                continue
+            if event['action'] in [Scenario.LINK_DOWN, Scenario.LINK_UP]:
+                pool = links
+            elif app:
+                pool = [name for name in hosts if Scenario.findApp(self.apps.get(app, {}), name) is not None]
+            else:
+                pool = hosts
+            if label == Scenario.RANDOM or label not in draws:
+                if not pool:
+                    raise ValueError('No candidate for the {} target {!r}'.format(event['action'], event['target']))
+                draw = rng.choice(pool)
+                if label != Scenario.RANDOM:
+                    draws[label] = draw
+            else:
+                draw = draws[label]
+            event['target'] = '{}/{}'.format(draw, app) if app else draw
+        return events
+
+    @staticmethod
+    def findApp(apps, nodeName):
+        '''Returns the application of a node in an AppManager or a dict, None if it has none'''
+        try:
+            return apps[nodeName]
+        except KeyError:
+            return None
+
+    def getApps(self, target):
+        nodeName, _, appName = target.partition('/')
+        if appName:
+            if appName not in self.apps:
+                raise ValueError('Unknown application {!r}'.format(appName))
+            names = [appName]
+        else:
+            names = list(self.apps)
+        apps = [Scenario.findApp(self.apps[name], nodeName) for name in names]
+        return [app for app in apps if app is not None]
+
+    def apply(self, event):
+        action, target = event['action'], event['target']
+        if action in [Scenario.LINK_DOWN, Scenario.LINK_UP]:
+            node1, node2 = target.split(':')
+            self.net.configLinkStatus(node1, node2, 'down' if action == Scenario.LINK_DOWN else 'up')
+        elif action == Scenario.KILL:
+            # Applications are stopped from the top layer down, and restarted the other way
+            for app in reversed(self.getApps(target)):
+                app.stop()
+        elif action == Scenario.RESTART:
+            # Nfd.start() drops the FaceCache of the node, stale face IDs are not reused
+            for app in self.getApps(target):
+                app.restart()
+        else:
+            output = self.net[target].cmd('nlsrc {} {}'.format(action, event['args']))
+            debug('[{}] nlsrc {}: {}\n'.format(target, action, output.strip()))
+
+    def sampleFib(self, host):
+        '''Returns a digest of the FIB of host, read without its shell which the events use'''
+        try:
+            process = getPopen(host, ['nfdc', 'fib', 'list'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            debug('[{}] Cannot read the FIB: {}\n'.format(host.name, e))
+            return None
+        return hash(tuple(sorted(process.communicate()[0].decode('utf-8', errors='replace').splitlines())))
+
+    def countLines(self):
+        '''Returns the number of lines of the throughput logs, only reading what was appended'''
+        for pattern in self.throughputLogs:
+            for path in glob.glob(pattern):
+                try:
+                    with open(path, 'rb') as log:
+                        log.seek(self._offsets.get(path, 0))
+                        appended = log.read()
+                except OSError:
+                    continue
+                self._offsets[path] = self._offsets.get(path, 0) + len(appended)
+                self._lines += appended.count(b'\n')
+        return self._lines
+
+    def _monitor(self, start):
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            deadline = time.monotonic()
+            while not self._monitorStopEvent.is_set():
+                now = time.monotonic() - start
+                fibs = dict(zip([host.name for host in self.net.hosts],
+                                executor.map(self.sampleFib, self.net.hosts)))
+                with self.lock:
+                    for name, fib in fibs.items():
+                        if name in self.fibs and self.fibs[name] != fib:
+                            self.fibChanges.append(now)
+                    self.fibs = fibs
+                    self.samples.append((now, self.countLines()))
+                deadline = max(deadline + self.interval, time.monotonic())
+                self._monitorStopEvent.wait(deadline - time.monotonic())
+
+    def lastFibChange(self):
+        with self.lock:
+            return self.fibChanges[-1] if self.fibChanges else None
+
+    def run(self):
+        '''Runs the timeline, waits for the FIBs to settle and returns the results'''
+        info('Running {} scenario events of {} (seed {})\n'.format(len(self.events), self.timelineFile, self.seed))
+        start = time.monotonic()
+        self.startTime = time.time()
+        monitor = Thread(target=self._monitor, args=(start,), name='ScenarioMonitor', daemon=True)
+        monitor.start()
+
+        for event in self.events:
+            if self._stopEvent.wait(max(0, start + event['time'] - time.monotonic())):
+                break
+            event['at'] = time.monotonic() - start
+            info('{:8.2f}s {} {} {}\n'.format(event['at'], event['action'], event['target'], event['args']))
+            try:
+                self.apply(event)
+            except (ValueError, KeyError) as e:
+                event['error'] = str(e)
+                warn('Cannot apply {} {}: {}\n'.format(event['action'], event['target'], e))
+
+        # The last event is over once no FIB changed for settleTime seconds
+        lastEvent = time.monotonic() - start
+        settled = False
+        while not self._stopEvent.is_set() and time.monotonic() - start < lastEvent + self.timeout:
+            lastChange = self.lastFibChange()
+            if time.monotonic() - start - max(lastChange or 0, lastEvent) >= self.settleTime:
+                settled = True
+                break
+            self._stopEvent.wait(self.interval)
+
+        self._monitorStopEvent.set()
+        monitor.join()
+        self.results = self.writeResults(self.computeResults(time.monotonic() - start, settled))
+        return self.results
+
+    def start(self):
+        '''Runs the scenario in the background, e.g. while waiting for a consumer'''
+        self._thread = Thread(target=self.run, name='Scenario', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Cancels the remaining events of a running scenario'''
+        self._stopEvent.set()
+
+    def join(self):
+        '''Waits for a scenario run in the background, returns its results'''
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.results
+
+    def rates(self):
+        '''Returns the (time, lines per second) of every sampling interval'''
+        return [(t1, (lines1 - lines0) / (t1 - t0))
+                for (t0, lines0), (t1, lines1) in zip(self.samples, self.samples[1:]) if t1 > t0]
+
+    def computeResults(self, end, settled):
+        applied = [event for event in self.events if 'at' in event]
+        rates = self.rates()
+        for index, event in enumerate(applied):
+            at = event['at']
+            windowEnd = applied[index + 1]['at'] if index + 1 < len(applied) else end
+            changes = [t for t in self.fibChanges if at <= t < windowEnd]
+            event['reconvergence'] = max(changes) - at if changes else 0.0
+
+            before = [rate for t, rate in rates if at - self.baseline <= t < at]
+            after = [(t, rate) for t, rate in rates if at <= t < windowEnd]
+            event['rateBefore'] = sum(before) / len(before) if before else None
+            event['rateMin'] = min(rate for _, rate in after) if after else None
+            event['dip'] = event['recovery'] = None
+            if event['rateBefore'] and after:
+                event['dip'] = max(0.0, 1 - event['rateMin'] / event['rateBefore'])
+                lowest = next(t for t, rate in after if rate == event['rateMin'])
+                recovered = [t for t, rate in after
+                             if t >= lowest and rate >= Scenario.RECOVERY_RATIO * event['rateBefore']]
+                event['recovery'] = recovered[0] - at if recovered else None
+
+        return {'timeline': self.timelineFile, 'seed': self.seed, 'startTime': self.startTime,
+                'duration': end, 'settled': settled, 'interval': self.interval, 'events': self.events}
+
+    def writeResults(self, results):
+        workDir = self.ndn.workDir
+        with open('{}/scenario-results.json'.format(workDir), 'w') as resultFile:
+            json.dump(results, resultFile, indent=2)
+        with open('{}/scenario-throughput.csv'.format(workDir), 'w') as throughputFile:
+            throughputFile.write('time,lines,rate\n')
+            rates = dict(self.rates())
+            for t, lines in self.samples:
+                throughputFile.write('{:.3f},{},{}\n'.format(t, lines, '{:.3f}'.format(rates[t]) if t in rates else ''))
+        for event in results['events']:
+            if 'at' in event:
+                info('{} {}: reconverged in {:.1f}s{}\n'.format(
+                    event['action'], event['target'], event['reconvergence'],
+                    ', throughput dip {:.0%}'.format(event['dip']) if event['dip'] is not None else ''))
+        info('Scenario results written to {}/scenario-results.json\n'.format(workDir))
+        return results
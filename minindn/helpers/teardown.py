@@ -0,0 +1,155 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import signal
+import time
+from threading import Lock
+
+from mininet.log import debug, info, warn
+
+class Teardown(object):
+    '''
+    Stops the processes of an experiment: the running Applications, and the background
+    commands started with runInBackground(), which Mininet leaves running with the shell
+    they were started from. Every process gets SIGTERM at once so that it can flush its logs,
+    and only the ones still running at the deadline get SIGKILL.
+    '''
+    TIMEOUT = 5
+    POLL_INTERVAL = 0.05
+
+    # Applications with a running process, added by Application.start
+    applications = set()
+    # (node name, pid, command) of the tracked background commands
+    background = []
+    lock = Lock()
+
+    @staticmethod
+    def trackApplication(app):
+        with Teardown.lock:
+            Teardown.applications.add(app)
+
+    @staticmethod
+    def untrackApplication(app):
+        with Teardown.lock:
+            Teardown.applications.discard(app)
+
+    @staticmethod
+    def runInBackground(node, command):
+        '''Runs command in the background of the node shell, tracking its pid. Returns the pid'''
+        command = command.rstrip()
+        if not command.endswith('&'):
+            command += ' &'
+        node.cmd(command)
+        # Mininet reads the pid of a command ending with '&' into lastPid
+        if node.lastPid is None:
+            warn('[{}] No pid for background command {}\n'.format(node.name, command))
+        else:
+            with Teardown.lock:
+                Teardown.background.append((node.name, node.lastPid, command))
+        return node.lastPid
+
+    @staticmethod
+    def isRunning(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        try:
+            with open('/proc/{}/stat'.format(pid), 'r') as stat:
+                # The state follows the command name, which is in parentheses
+                return stat.read().rpartition(')')[2].split()[0] != 'Z'
+        except (OSError, IndexError):
+            return False
+
+    @staticmethod
+    def _signal(processes, pids, sig):
+        for process in processes:
+            try:
+                process.send_signal(sig)
+            except OSError:
+                pass
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except OSError:
+                pass
+
+    @staticmethod
+    def stopProcesses(processes=(), pids=(), timeout=TIMEOUT):
+        '''
+        Sends SIGTERM to every Popen process and pid, waits until all of them exited or
+        timeout seconds passed, then sends SIGKILL to the remaining ones.
+        Returns the number of processes that exited gracefully and of killed ones.
+        '''
+        processes = [process for process in processes if process.poll() is None]
+        pids = [pid for pid in pids if Teardown.isRunning(pid)]
+        total = len(processes) + len(pids)
+        if not total:
+            return 0, 0
+
+        Teardown._signal(processes, pids, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while True:
+            processes = [process for process in processes if process.poll() is None]
+            pids = [pid for pid in pids if Teardown.isRunning(pid)]
+            if not (processes or pids) or time.monotonic() >= deadline:
+                break
+            time.sleep(Teardown.POLL_INTERVAL)
+
+        killed = len(processes) + len(pids)
+        if killed:
+            debug('Killing {} process(es) still running after {} seconds\n'.format(killed, timeout))
+            Teardown._signal(processes, pids, signal.SIGKILL)
+            for process in processes:
+                process.wait()
+        return total - killed, killed
+
+    @staticmethod
+    def stopApplications(apps, pids=(), timeout=TIMEOUT):
+        '''Stops applications and pids together, then lets each application close its log'''
+        apps = list(apps)
+        processes = [app.process for app in apps if app.process is not None]
+        stopped = Teardown.stopProcesses(processes, pids, timeout)
+        for app in apps:
+            # Their processes are gone, so this only closes the logs
+            app.stop()
+        return stopped
+
+    @staticmethod
+    def stopAll(timeout=TIMEOUT):
+        '''Stops every tracked application and background command, returns a report'''
+        start = time.time()
+        with Teardown.lock:
+            apps = list(Teardown.applications)
+            background = Teardown.background
+            Teardown.background = []
+        terminated, killed = Teardown.stopApplications(apps, [pid for _, pid, _ in background], timeout)
+        report = {'applications': len(apps), 'background': len(background), 'terminated': terminated,
+                  'killed': killed, 'duration': time.time() - start}
+        info('Stopped {} processes in {:.2f} seconds, {} killed after {} seconds\n'
+             .format(terminated + killed, report['duration'], killed, timeout))
+        return report
@@ -0,0 +1,229 @@
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+'''
+This module reads Mini-NDN topology files in a single pass. Every section holds one
+entry per line, "name: params" for nodes and "node1:node2 params" for links and faces,
+where params are space separated key=value pairs and "_" stands for no parameter.
+Values are converted with the schema of their section, and every error of the file is
+collected and raised at once. The parsed topology is cached as JSON next to the file,
+which unlike a pickle cannot run code when a planted cache file is read.
+'''
+
+import json
+import os
+import re
+
+from mininet.log import debug
+
+_TIME = re.compile(r'^(\d+(?:\.\d+)?)\s*(us|ms|s)?$')
+_TIME_TO_MS = {'us': 0.001, 'ms': 1, 's': 1000, None: 1}
+
+def toMilliseconds(value):
+    '''Normalizes a time to "<n>ms", a plain number being milliseconds like in structure.csv'''
+    match = _TIME.match(value.strip())
+    if not match:
+        raise ValueError('expected a time such as 10ms')
+    milliseconds = float(match.group(1)) * _TIME_TO_MS[match.group(2)]
+    return '{}ms'.format(int(milliseconds) if milliseconds.is_integer() else round(milliseconds, 3))
+
+def toRadius(value):
+    '''Validates a radius, which stays a string for NLSR like the user wrote it'''
+    float(value)
+    return value
+
+def toAngles(value):
+    '''Validates one or more comma separated angles, which stay a string for NLSR'''
+    for angle in value.split(','):
+        float(angle)
+    return value
+
+# Converters of the known parameters of every kind of entry, other parameters stay strings
+NODE_SCHEMA = {'radius': toRadius, 'angle': toAngles}
+LINK_SCHEMA = {'bw': float, 'loss': float, 'delay': toMilliseconds, 'jitter': toMilliseconds,
+               'max_queue_size': int}
+WIFI_NODE_SCHEMA = {'range': int}
+FACE_SCHEMA = {'cost': int}
+
+# Kind of entry, schema and whether the section is required, per section
+TOPOLOGY_SECTIONS = {
+    'nodes': ('node', NODE_SCHEMA, True),
+    'switches': ('node', {}, False),
+    'links': ('link', LINK_SCHEMA, True),
+    'faces': ('face', FACE_SCHEMA, False),
+}
+WIFI_TOPOLOGY_SECTIONS = {
+    'stations': ('node', WIFI_NODE_SCHEMA, True),
+    'switches': ('node', {}, False),
+    'accessPoints': ('node', WIFI_NODE_SCHEMA, False),
+    'links': ('link', LINK_SCHEMA, True),
+    'faces': ('face', FACE_SCHEMA, False),
+}
+ADHOC_TOPOLOGY_SECTIONS = {
+    'stations': ('node', WIFI_NODE_SCHEMA, True),
+    'faces': ('face', FACE_SCHEMA, False),
+}
+
+CACHE_VERSION = 3
+
+class TopologyError(ValueError):
+    def __init__(self, topoFile, errors):
+        ValueError.__init__(self, '{}: {} error(s)\n  {}'.format(topoFile, len(errors), '\n  '.join(errors)))
+        self.errors = errors
+
+def _readLines(topoFile):
+    '''Yields the line number, section and (key, value) of every entry, like ConfigParser(delimiters=' ')'''
+    section = None
+    entry = None
+    with open(topoFile, 'r') as topo:
+        for lineNumber, line in enumerate(topo, 1):
+            stripped = line.strip()
+            if not stripped or stripped[0] in '#;':
+                continue
+            if line[0].isspace() and entry is not None:
+                # Indented lines continue the value of the previous entry
+                entry[3] = '{} {}'.format(entry[3], stripped).strip()
+                continue
+            if entry is not None:
+                yield entry
+                entry = None
+            if stripped[0] == '[' and stripped[-1] == ']':
+                section = stripped[1:-1].strip()
+                continue
+            key, _, value = stripped.partition(' ')
+            # ConfigParser lowercases the keys, node names have always been lowercase
+            entry = [lineNumber, section, key.lower(), value.strip()]
+    if entry is not None:
+        yield entry
+
+def _parseParams(value, schema, errors, where):
+    params = {}
+    for param in value.split():
+        if param == '_':
+            continue
+        key, sep, raw = param.partition('=')
+        if not sep:
+            errors.append('{}: expected key=value, got {!r}'.format(where, param))
+            continue
+        if key in params:
+            errors.append('{}: duplicate parameter {!r}'.format(where, key))
+        try:
+            params[key] = schema[key](raw) if key in schema else raw
+        except ValueError as e:
+            errors.append('{}: invalid {} {!r}: {}'.format(where, key, raw, e))
+    return params
+
+def parseTopology(topoFile, sections):
+    '''
+    Returns a dict with, per section present in the file, a list of (name, params) for nodes
+    and (node1, node2, params) for links and faces. Raises TopologyError with every error found.
+    '''
+    topology = {}
+    errors = []
+    names = set()
+    linkKeys = set()
+    coordinates = {}
+    endpoints = []
+
+    for lineNumber, section, key, value in _readLines(topoFile):
+        where = 'line {}'.format(lineNumber)
+        if section is None:
+            errors.append('{}: entry outside of a section'.format(where))
+            continue
+        if section not in sections:
+            # Sections of other readers, e.g. mobility
+            continue
+        kind, schema, _ = sections[section]
+        params = _parseParams(value, schema, errors, where)
+        entries = topology.setdefault(section, [])
+
+        if kind == 'node':
+            name = key.split(':')[0]
+            if name in names:
+                errors.append('{}: duplicate node {!r}'.format(where, name))
+            names.add(name)
+            if 'radius' in params and 'angle' in params:
+                coordinate = (params['radius'], params['angle'])
+                if coordinate in coordinates:
+                    errors.append('{}: duplicate coordinate radius={} angle={}, also used by {!r}'
+                                  .format(where, coordinate[0], coordinate[1], coordinates[coordinate]))
+                coordinates[coordinate] = name
+            entries.append((name, params))
+            continue
+
+        link = key.split(':')
+        if len(link) != 2 or not all(link):
+            errors.append('{}: expected node1:node2, got {!r}'.format(where, key))
+            continue
+        if kind == 'link':
+            if key in linkKeys:
+                errors.append('{}: duplicate link {!r}'.format(where, key))
+            linkKeys.add(key)
+        endpoints.append((where, link))
+        entries.append((link[0], link[1], params))
+
+    for where, link in endpoints:
+        for node in link:
+            if node not in names:
+                errors.append('{}: unknown node {!r}'.format(where, node))
+    for section, (_, _, required) in sections.items():
+        if required and section not in topology:
+            errors.append('missing section [{}]'.format(section))
+
+    if errors:
+        raise TopologyError(topoFile, errors)
+    return topology
+
+def _cacheFile(topoFile):
+    directory, name = os.path.split(os.path.abspath(topoFile))
+    return os.path.join(directory, '.{}.cache.json'.format(name))
+
+def loadTopology(topoFile, sections=TOPOLOGY_SECTIONS):
+    '''
+    Parses topoFile with parseTopology, reusing the cached result next to the file
+    while its modification time and size are unchanged
+    '''
+    stat = os.stat(topoFile)
+    key = [CACHE_VERSION, stat.st_mtime_ns, stat.st_size, sorted(sections)]
+    cacheFile = _cacheFile(topoFile)
+    try:
+        with open(cacheFile, 'r') as cache:
+            cached = json.load(cache)
+        if cached['key'] == key:
+            debug('Using cached topology {}\n'.format(cacheFile))
+            # JSON has no tuples, entries are turned back into the tuples parseTopology returns
+            return {section: [tuple(entry) for entry in entries]
+                    for section, entries in cached['topology'].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    topology = parseTopology(topoFile, sections)
+    try:
+        temporaryFile = '{}.{}'.format(cacheFile, os.getpid())
+        with open(temporaryFile, 'w') as cache:
+            json.dump({'key': key, 'topology': topology}, cache)
+        os.replace(temporaryFile, cacheFile)
+    except OSError as e:
+        # The topology may be in a read-only location
+        debug('Cannot cache topology {}: {}\n'.format(topoFile, e))
+    return topology
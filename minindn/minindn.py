@@ -25,18 +25,22 @@ import argparse
 import sys
 import time
 import os
-import configparser
 from subprocess import call, Popen, PIPE
-import shutil
-import glob
 from traceback import format_exc
 
 from mininet.topo import Topo
 from mininet.net import Mininet
 from mininet.link import TCLink
-from mininet.node import Switch
-from mininet.util import ipStr, ipParse
-from mininet.log import info, debug, error
+from mininet.log import info, debug, error, warn
+
+from minindn.helpers.address_planner import AddressPlanner
+from minindn.helpers.cgroup import CgroupAccounting
+from minindn.helpers.link_controller import LinkController
+from minindn.helpers.link_params import LinkParamIndex
+from minindn.helpers.result_archiver import ResultArchiver
+from minindn.helpers.teardown import Teardown
+from minindn.helpers.topology_loader import loadTopology, TopologyError
+from minindn.util import invalidateEnvCache
 
 class Minindn(object):
     """
@@ -52,9 +56,15 @@ class Minindn(object):
     ndnSecurityDisabled = False
     workDir = '/var/minindn'
     resultDir = None
+    # How stop() saves the results, see ResultArchiver
+    resultFormat = ResultArchiver.FORMAT_FILES
+    resultCompression = 'gzip'
+    resultInclude = None
+    resultExclude = None
+    cgroups = None
 
     def __init__(self, parser=argparse.ArgumentParser(), topo=None, topoFile=None, noTopo=False,
-                 link=TCLink, workDir=None, **mininetParams):
+                 link=TCLink, workDir=None, cgroupAccounting=False, **mininetParams):
         """
         Create MiniNDN object
         :param parser: Parent parser of Mini-NDN parser
@@ -64,6 +74,8 @@ class Minindn(object):
           initialized (optional)
         :param link: Allows specification of default Mininet link type for connections between
           nodes (optional)
+        :param cgroupAccounting: Account the CPU, memory and IO usage of each host in its own
+          cgroup (optional, also enabled by --cgroup-accounting)
         :param mininetParams: Any params to pass to Mininet
         """
         self.parser = Minindn.parseArgs(parser)
@@ -75,6 +87,10 @@ class Minindn(object):
             Minindn.workDir = os.path.abspath(workDir)
 
         Minindn.resultDir = self.args.resultDir
+        Minindn.resultFormat = self.args.resultFormat
+        Minindn.resultCompression = self.args.resultCompression
+        Minindn.resultInclude = self.args.resultInclude
+        Minindn.resultExclude = self.args.resultExclude
 
         if not topoFile:
             # Args has default topology if none specified
@@ -87,8 +103,8 @@ class Minindn(object):
             try:
                 info('Using topology file {}\n'.format(self.topoFile))
                 self.topo, self.faces_to_create = self.processTopo(self.topoFile)
-            except configparser.NoSectionError as e:
-                info('Error reading config file: {}\n'.format(e))
+            except TopologyError as e:
+                error('Error reading config file: {}\n'.format(e))
                 sys.exit(1)
         else:
             self.topo = topo
@@ -98,21 +114,25 @@ class Minindn(object):
         else:
             self.net = Mininet(link=link, **mininetParams)
 
+        self.initCgroupAccounting(cgroupAccounting or self.args.cgroupAccounting, self.args.cgroupInterval)
         self.initParams(self.net.hosts)
 
         self.cleanups = []
+        # Built on first use, once the links of noTopo networks are added
+        self.linkParams = None
+        self.linkController = None
 
         if not self.net.switches:
             self.ethernetPairConnectivity()
 
         try:
             process = Popen(['ndnsec-get-default', '-k'], stdout=PIPE, stderr=PIPE)
-            output, error = process.communicate()
+            output, err = process.communicate()
             if process.returncode == 0:
                 Minindn.ndnSecurityDisabled = '/dummy/KEY/-%9C%28r%B8%AA%3B%60' in output.decode("utf-8")
                 info('Dummy key chain patch is installed in ndn-cxx. Security will be disabled.\n')
             else:
-                debug(error)
+                debug(err)
         except:
             pass
 
@@ -132,121 +152,92 @@ class Minindn(object):
                             help='Specify the full path destination folder where experiment \
                             results will be moved')
 
+        parser.add_argument('--result-format', action='store', dest='resultFormat',
+                            default=ResultArchiver.FORMAT_FILES, choices=ResultArchiver.FORMATS,
+                            help='Save the results as files, as one compressed tar archive per node, \
+                            or as a compressed store deduplicating identical files')
+
+        parser.add_argument('--result-compression', action='store', dest='resultCompression', default='gzip',
+                            choices=sorted(ResultArchiver.COMPRESSION_EXTENSIONS),
+                            help='Compression of the tar and store result formats, zstd requires zstandard')
+
+        parser.add_argument('--result-include', action='store', dest='resultInclude', nargs='+', default=None,
+                            help='Globs of the paths relative to the working directory to save, e.g. "*/log/*"')
+
+        parser.add_argument('--result-exclude', action='store', dest='resultExclude', nargs='+', default=None,
+                            help='Globs of the paths relative to the working directory not to save, e.g. "*.pcap"')
+
+        parser.add_argument('--cgroup-accounting', action='store_true', dest='cgroupAccounting',
+                            help='Place the processes of each host in a cgroup v2 group and sample \
+                            its CPU, memory and IO usage')
+
+        parser.add_argument('--cgroup-interval', action='store', dest='cgroupInterval', type=float,
+                            default=1, help='Seconds between two samples of the host cgroups')
+
         return parser
 
     def ethernetPairConnectivity(self):
-        ndnNetBase = '10.0.0.0'
-        interfaces = []
-        for host in self.net.hosts:
-            for intf in host.intfList():
-                link = intf.link
-                node1, node2 = link.intf1.node, link.intf2.node
-
-                if isinstance(node1, Switch) or isinstance(node2, Switch):
-                    continue
-
-                if link.intf1 not in interfaces and link.intf2 not in interfaces:
-                    interfaces.append(link.intf1)
-                    interfaces.append(link.intf2)
-                    node1.setIP(ipStr(ipParse(ndnNetBase) + 1) + '/30', intf=link.intf1)
-                    node2.setIP(ipStr(ipParse(ndnNetBase) + 2) + '/30', intf=link.intf2)
-                    ndnNetBase = ipStr(ipParse(ndnNetBase) + 4)
+        AddressPlanner.apply(AddressPlanner.plan(self.net.hosts))
 
     @staticmethod
     def processTopo(topoFile):
-        config = configparser.ConfigParser(delimiters=' ', allow_no_value=True)
-        config.read(topoFile)
+        topology = loadTopology(topoFile)
         topo = Topo()
 
-        items = config.items('nodes')
-        coordinates = []
-
-        for item in items:
-            name = item[0].split(':')[0]
-            params = {}
-            if item[1]:
-                if all (x in item[1] for x in ['radius', 'angle']) and item[1] in coordinates:
-                    error("FATAL: Duplicate Coordinate, \'{}\' used by multiple nodes\n" \
-                        .format(item[1]))
-                    sys.exit(1)
-                coordinates.append(item[1])
-
-                for param in item[1].split(' '):
-                    if param == '_':
-                        continue
-                    params[param.split('=')[0]] = param.split('=')[1]
-
+        for name, params in topology['nodes']:
             topo.addHost(name, params=params)
 
-        try:
-            items = config.items('switches')
-            for item in items:
-                name = item[0].split(':')[0]
-                topo.addSwitch(name)
-        except configparser.NoSectionError:
-            # Switches are optional
-            pass
-
-        items = config.items('links')
-        for item in items:
-            link = item[0].split(':')
+        # Switches are optional
+        for name, _ in topology.get('switches', []):
+            topo.addSwitch(name)
 
-            params = {}
-            for param in item[1].split(' '):
-                key = param.split('=')[0]
-                value = param.split('=')[1]
-                if key in ['max_queue_size']:
-                    value = int(value)
-                if key == 'loss' or key == 'bw':
-                    value = float(value)
-                params[key] = value
+        for node1, node2, params in topology['links']:
+            topo.addLink(node1, node2, **params)
 
-            topo.addLink(link[0], link[1], **params)
+        return (topo, Minindn.getFaces(topology))
 
+    @staticmethod
+    def getFaces(topology):
         faces = {}
-        try:
-            items = config.items('faces')
-            debug("Faces")
-            for item in items:
-                face_a, face_b = item[0].split(':')
-                debug(item)
-                cost = -1
-                for param in item[1].split(' '):
-                    if param.split("=")[0] == 'cost':
-                        cost = param.split("=")[1]
-                face_info = (face_b, int(cost))
-                if face_a not in faces:
-                    faces[face_a] = [face_info]
-                else:
-                    faces[face_a].append(face_info)
-        except configparser.NoSectionError:
-            debug("Faces section is optional")
-            pass
-
-        return (topo, faces)
-
-        return topo
+        for faceA, faceB, params in topology.get('faces', []):
+            faces.setdefault(faceA, []).append((faceB, params.get('cost', -1)))
+        return faces
 
     def start(self):
         self.net.start()
+        if Minindn.cgroups is not None:
+            Minindn.cgroups.start()
         time.sleep(3)
 
     def stop(self):
+        start = time.time()
+        # Applications and background commands of every node are stopped together first,
+        # which leaves the cleanups of the application managers with their logs to close
+        self.teardownReport = Teardown.stopAll()
         for cleanup in self.cleanups:
             cleanup()
         self.net.stop()
+        invalidateEnvCache()
+
+        if Minindn.cgroups is not None:
+            Minindn.cgroups.stop()
+            Minindn.cgroups = None
 
         if Minindn.resultDir is not None:
-            info("Moving results to \'{}\'\n".format(Minindn.resultDir))
-            os.system("mkdir -p {}".format(Minindn.resultDir))
-            for file in glob.glob('{}/*'.format(Minindn.workDir)):
-                shutil.move(file, Minindn.resultDir)
+            info("Saving results to \'{}\'\n".format(Minindn.resultDir))
+            ResultArchiver(Minindn.workDir, Minindn.resultDir, Minindn.resultFormat, Minindn.resultInclude,
+                           Minindn.resultExclude, Minindn.resultCompression).archive()
+
+        self.teardownReport['total'] = time.time() - start
+        info('Teardown took {:.2f} seconds\n'.format(self.teardownReport['total']))
 
     @staticmethod
     def cleanUp():
+        start = time.time()
         devnull = open(os.devnull, 'w')
         call('nfd-stop', stdout=devnull, stderr=devnull)
         call('mn --clean'.split(), stdout=devnull, stderr=devnull)
+        debug('Cleanup took {:.2f} seconds\n'.format(time.time() - start))
 
     @staticmethod
     def verifyDependencies():
@@ -273,15 +264,31 @@ class Minindn(object):
         info(format_exc())
         exit(1)
 
+    def getLinkParams(self):
+        """Returns the LinkParamIndex of the network, building it on first use"""
+        if self.linkParams is None:
+            self.linkParams = LinkParamIndex(self.net)
+        return self.linkParams
+
+    def getLinkController(self):
+        """Returns the LinkController changing the links at runtime, stopped with the network"""
+        if self.linkController is None:
+            self.linkController = LinkController(self.net, Minindn.workDir, self.getLinkParams())
+            self.cleanups.append(self.linkController.stop)
+        return self.linkController
+
     def getInterfaceDelay(self, node, interface):
-        tc_output = node.cmd("tc qdisc show dev {}".format(interface))
-        for line in tc_output.splitlines():
-            if "qdisc netem 10:" in line:
-                split_line = line.split(" ")
-                for index in range(0, len(split_line)):
-                    if split_line[index] == "delay":
-                        return float(split_line[index + 1][:-2])
-        return 0.0
+        return self.getLinkParams().delay(node, interface)
+
+    def initCgroupAccounting(self, enabled, interval=1):
+        """Set up the opt-in per host resource accounting, hosts join it in initParams"""
+        Minindn.cgroups = None
+        if not enabled:
+            return
+        try:
+            Minindn.cgroups = CgroupAccounting(Minindn.workDir, interval)
+        except OSError as e:
+            warn('Per host cgroup accounting is disabled: {}\n'.format(e))
 
     def initParams(self, nodes):
         """Initialize Mini-NDN parameters for array of nodes"""
@@ -293,6 +300,9 @@ class Minindn(object):
             host.params['params']['homeDir'] = homeDir
             host.cmd('mkdir -p {}'.format(homeDir))
             host.cmd('export HOME={} && cd ~'.format(homeDir))
+            invalidateEnvCache(host)
+            if Minindn.cgroups is not None:
+                Minindn.cgroups.addHost(host)
 
     def nfdcBatchProcessing(self, station, faces):
         # Input format: [IP, protocol, isPermanent]
@@ -309,7 +319,13 @@ class Minindn(object):
             lines.append(nfdc_command)
         batch_file.writelines(lines)
         batch_file.close()
-        debug(station.cmd("nfdc -f {}/{}/nfdc.batch".format(Minindn.workDir, station.name)))
+        output = station.cmd("nfdc -f {}/{}/nfdc.batch".format(Minindn.workDir, station.name))
+        debug(output)
+        # Importing this before initialization causes issues
+        from minindn.helpers.nfdc import FaceCache
+        # Created face IDs can be resolved later without querying NFD again
+        FaceCache.forNode(station).update(output)
+        return output
 
     def setupFaces(self, faces_to_create=None):
         """ Method to create unicast faces between connected nodes;
@@ -329,18 +345,13 @@ class Minindn(object):
                     batch_faces[nodeBname] = []
                 nodeA = self.net[nodeAname]
                 nodeB = self.net[nodeBname]
-                if nodeA.connectionsTo(nodeB):
-                    best_interface = None
-                    delay = None
-                    for interface in nodeA.connectionsTo(nodeB):
-                        interface_delay = self.getInterfaceDelay(nodeA, interface[0])
-                        if not delay or int(interface_delay) < delay:
-                            best_interface = interface
+                connections = nodeA.connectionsTo(nodeB)
+                if connections:
+                    best_interface, delay = self.getLinkParams().bestConnection(nodeA, connections)
                     faceAIP = best_interface[0].IP()
                     faceBIP = best_interface[1].IP()
                     # Node delay will be symmetrical for connected nodes
-                    nodeDelay = int(self.getInterfaceDelay(nodeA, best_interface[0]))
-                    #nodeBDelay = int(self.getInterfaceDelay(nodeB, best_interface[1]))
+                    nodeDelay = int(delay)
                 else:
                     # If no direct wired connections exist (ie when using a switch),
                     # assume the default interface
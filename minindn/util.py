@@ -24,6 +24,7 @@
 import sys
 from os.path import isfile
 from subprocess import call
+from threading import Lock
 from six.moves.urllib.parse import quote
 
 from mininet.cli import CLI
@@ -67,16 +68,44 @@ def copyExistentFile(node, fileList, destination):
         fileName = destination.split('/')[-1]
         raise IOError('{} not found in expected directory.'.format(fileName))
 
-def popenGetEnv(node, envDict=None):
+# Environment of the processes launched on each host, read once per host
+_envCache = {}
+_envCacheLock = Lock()
+
+def parseEnv(output):
+    """Parses the NUL separated output of 'printenv -0', values may contain '=' or newlines"""
     env = {}
-    homeDir = node.params['params']['homeDir']
-    printenv = node.popen('printenv'.split(), cwd=homeDir).communicate()[0].decode('utf-8')
-    for var in printenv.split('\n'):
-        if var == '':
-            break
-        p = var.split('=')
-        env[p[0]] = p[1]
-    env['HOME'] = homeDir
+    for var in output.split('\0'):
+        key, sep, value = var.partition('=')
+        if sep:
+            env[key] = value
+    return env
+
+def getNodeEnv(node):
+    """
+    Returns the environment of the processes launched on node, reading it with printenv
+    on the first call only. The returned dict is shared, copy it before changing it.
+    """
+    env = _envCache.get(node)
+    if env is None:
+        homeDir = node.params['params']['homeDir']
+        output = node.popen(['printenv', '-0'], cwd=homeDir).communicate()[0]
+        env = parseEnv(output.decode('utf-8', errors='surrogateescape'))
+        with _envCacheLock:
+            env = _envCache.setdefault(node, env)
+    return env
+
+def invalidateEnvCache(node=None):
+    """Forgets the cached environment of node, or of every host, e.g. after changing it"""
+    with _envCacheLock:
+        if node is None:
+            _envCache.clear()
+        else:
+            _envCache.pop(node, None)
+
+def popenGetEnv(node, envDict=None):
+    env = dict(getNodeEnv(node))
+    env['HOME'] = node.params['params']['homeDir']
 
     if envDict is not None:
         for key, value in envDict.items():
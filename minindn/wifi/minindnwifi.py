@@ -27,7 +27,7 @@ import sys
 import configparser
 from subprocess import Popen, PIPE
 
-from mininet.log import info, debug
+from mininet.log import info, debug, error
 
 from mn_wifi.topo import Topo as Topo_WiFi
 from mn_wifi.net import Mininet_wifi
@@ -36,13 +36,15 @@ from mn_wifi.link import wmediumd, adhoc
 
 from minindn.minindn import Minindn
 from minindn.helpers.nfdc import Nfdc
+from minindn.helpers.topology_loader import loadTopology, TopologyError, WIFI_TOPOLOGY_SECTIONS, \
+                                            ADHOC_TOPOLOGY_SECTIONS
 
 import ast
 
 class MinindnWifi(Minindn):
     """ Class for handling default args, Mininet-wifi object and home directories """
     def __init__(self, parser=argparse.ArgumentParser(), topo=None, topoFile=None, noTopo=False,
-                 link=WirelessLink, workDir=None, **mininetParams):
+                 link=WirelessLink, workDir=None, cgroupAccounting=False, **mininetParams):
         """
         Create Mini-NDN-Wifi object
         parser: Parent parser of Mini-NDN-Wifi parser (use to specify experiment arguments)
@@ -50,7 +52,9 @@ class MinindnWifi(Minindn):
         topoFile: topology file location (optional)
         noTopo: Allows specification of topology after network object is initialized (optional)
         link: Allows specification of default Mininet/Mininet-Wifi link type for
-        connections between nodes (optional)mininetParams: Any params to pass to Mininet-WiFi
+        connections between nodes (optional)
+        cgroupAccounting: Account the CPU, memory and IO usage of each node in its own cgroup (optional)
+        mininetParams: Any params to pass to Mininet-WiFi
         """
         self.parser = self.parseArgs(parser)
         self.args = self.parser.parse_args()
@@ -74,8 +78,8 @@ class MinindnWifi(Minindn):
             try:
                 info('Using topology file {}\n'.format(self.topoFile))
                 self.topo, self.faces_to_create = self.processTopo(self.topoFile)
-            except configparser.NoSectionError as e:
-                info('Error reading config file: {}\n'.format(e))
+            except TopologyError as e:
+                error('Error reading config file: {}\n'.format(e))
                 sys.exit(1)
         else:
             self.topo = topo
@@ -91,20 +95,23 @@ class MinindnWifi(Minindn):
 
         # Prevents crashes running mixed topos
         nodes = self.net.stations + self.net.hosts + self.net.cars
+        self.initCgroupAccounting(cgroupAccounting)
         self.initParams(nodes)
 
         try:
             process = Popen(['ndnsec-get-default', '-k'], stdout=PIPE, stderr=PIPE)
-            output, error = process.communicate()
+            output, err = process.communicate()
             if process.returncode == 0:
                 Minindn.ndnSecurityDisabled = '/dummy/KEY/-%9C%28r%B8%AA%3B%60' in output.decode("utf-8")
                 info('Dummy key chain patch is installed in ndn-cxx. Security will be disabled.\n')
             else:
-                debug(error + "\n")
+                debug(err + "\n")
         except:
             pass
 
         self.cleanups = []
+        self.linkParams = None
+        self.linkController = None
 
     @staticmethod
     def parseArgs(parent):
@@ -137,98 +144,27 @@ class MinindnWifi(Minindn):
 
     @staticmethod
     def processTopo(topoFile):
-        config = configparser.ConfigParser(delimiters=' ')
-        config.read(topoFile)
+        topology = loadTopology(topoFile, WIFI_TOPOLOGY_SECTIONS)
         topo = Topo_WiFi()
 
-        items = config.items('stations')
         debug("Stations\n")
-        for item in items:
-            debug(str(item[0].split(':'))+"\n")
-            name = item[0].split(':')[0]
-            params = {}
-            for param in item[1].split(' '):
-                    if param == "_":
-                        continue
-                    key = param.split('=')[0]
-                    value = param.split('=')[1]
-                    if key in ['range']:
-                        value = int(value)
-                    params[key] = value
-
+        for name, params in topology['stations']:
+            debug("{} {}\n".format(name, params))
             topo.addStation(name, **params)
 
-        try:
-            debug("Switches\n")
-            items = config.items('switches')
-            for item in items:
-                debug(str(item[0].split(':'))+"\n")
-                name = item[0].split(':')[0]
-                topo.addSwitch(name)
-        except configparser.NoSectionError:
-            debug("Switches are optional\n")
-            pass
-
-        try:
-            debug("APs")
-            items = config.items('accessPoints')
-            for item in items:
-                debug(str(item[0].split(':'))+"\n")
-                name = item[0].split(':')[0]
-                ap_params = {}
-                for param in item[1].split(' '):
-                    if param == "_":
-                        continue
-                    key = param.split('=')[0]
-                    value = param.split('=')[1]
-                    if key in ['range']:
-                        value = int(value)
-                    ap_params[key] = value
-                topo.addAccessPoint(name, **ap_params)
-        except configparser.NoSectionError:
-            debug("APs are optional\n")
-            pass
-
-        items = config.items('links')
-        debug("Links")
-        for item in items:
-            link = item[0].split(':')
-            debug(str(link) + "\n")
-            params = {}
-            for param in item[1].split(' '):
-                if param == "_":
-                    continue
-                key = param.split('=')[0]
-                value = param.split('=')[1]
-                if key in ['max_queue_size']:
-                    value = int(value)
-                if key in ['loss', 'bw']:
-                    value = float(value)
-                params[key] = value
+        debug("Switches are optional\n")
+        for name, _ in topology.get('switches', []):
+            topo.addSwitch(name)
 
-            topo.addLink(link[0], link[1], **params)
+        debug("APs are optional\n")
+        for name, params in topology.get('accessPoints', []):
+            topo.addAccessPoint(name, **params)
 
-        faces = {}
-        try:
-            items = config.items('faces')
-            debug("Faces\n")
-            for item in items:
-                face_a, face_b = item[0].split(':')
-                debug(str(item)+"\n")
-                cost = -1
-                for param in item[1].split(' '):
-                    if param.split("=")[0] == 'cost':
-                        cost = param.split("=")[1]
-                face_info = (face_b, int(cost))
-                if face_a not in faces:
-                    faces[face_a] = [face_info]
-                else:
-                    faces[face_a].append(face_info)
-        except configparser.NoSectionError:
-            debug("Faces section is optional\n")
-            pass
+        debug("Links\n")
+        for node1, node2, params in topology['links']:
+            topo.addLink(node1, node2, **params)
 
-        return (topo, faces)
+        return (topo, Minindn.getFaces(topology))
 
     def processMobility(self, topoFile):
         config = configparser.ConfigParser(delimiters=' ')
@@ -286,14 +222,7 @@ class MinindnWifi(Minindn):
             wifi_interface = "{}-wlan0".format(node.name)
         else:
             wifi_interface = interface
-        tc_output = node.cmd("tc qdisc show dev {}".format(wifi_interface))
-        for line in tc_output.splitlines():
-            if "qdisc netem 10:" in line:
-                split_line = line.split(" ")
-                for index in range(0, len(split_line)):
-                    if split_line[index] == "delay":
-                        return float(split_line[index + 1][:-2])
-        return 0.0
+        return self.getLinkParams().delay(node, wifi_interface)
 
     def setupFaces(self, faces_to_create=None):
         """
@@ -315,17 +244,13 @@ class MinindnWifi(Minindn):
                     batch_faces[nodeBname] = []
                 nodeA = self.net[nodeAname]
                 nodeB = self.net[nodeBname]
-                if nodeA.connectionsTo(nodeB):
-                    best_interface = None
-                    delay = None
-                    for interface in nodeA.connectionsTo(nodeB):
-                        interface_delay = self.getInterfaceDelay(nodeA, interface[0])
-                        if not delay or int(interface_delay) < delay:
-                            best_interface = interface
+                connections = nodeA.connectionsTo(nodeB)
+                if connections:
+                    best_interface, delay = self.getLinkParams().bestConnection(nodeA, connections)
                     faceAIP = best_interface[0].IP()
                     faceBIP = best_interface[1].IP()
                     # Node delay should be symmetrical
-                    nodeDelay = int(self.getInterfaceDelay(nodeA, best_interface[0]))
+                    nodeDelay = int(delay)
                 else:
                     # Default IP will be the primary wireless interface, unclear if multiple wireless
                     # interfaces should be handled
@@ -333,7 +258,7 @@ class MinindnWifi(Minindn):
                     faceBIP = nodeB.IP()
                     nodeADelay = self.getWifiInterfaceDelay(nodeA)
                     nodeBDelay = self.getWifiInterfaceDelay(nodeB)
-                    nodeDelay = nodeADelay + nodeBDelay
+                    nodeDelay = int(nodeADelay + nodeBDelay)
 
                 if not faceCost == -1:
                     nodeALink = (nodeA.name, faceAIP, faceCost)
@@ -395,52 +320,19 @@ class MinindnAdhoc(MinindnWifi):
 
     @staticmethod
     def processTopo(topoFile):
-        config = configparser.ConfigParser(delimiters=' ')
-        config.read(topoFile)
+        topology = loadTopology(topoFile, ADHOC_TOPOLOGY_SECTIONS)
         topo = Topo_WiFi()
 
-        items = config.items('stations')
         debug("Stations\n")
-        id = 0
-        for item in items:
-            debug(str(item[0].split(':'))+"\n")
-            name = item[0].split(':')[0]
-            params = {}
-            for param in item[1].split(' '):
-                    if param == "_":
-                        continue
-                    key = param.split('=')[0]
-                    value = param.split('=')[1]
-                    if key in ['range']:
-                        value = int(value)
-                    params[key] = value
+        for id, (name, params) in enumerate(topology['stations']):
+            debug("{} {}\n".format(name, params))
             # ip6 address for each station using id
+            params = dict(params)
             if 'ip6' not in params:
                 params['ip6'] = 'fe80::{}'.format(id)
             topo.addStation(name, **params)
-            id += 1
-
-        faces = {}
-        try:
-            items = config.items('faces')
-            debug("Faces\n")
-            for item in items:
-                face_a, face_b = item[0].split(':')
-                debug(str(item)+"\n")
-                cost = -1
-                for param in item[1].split(' '):
-                    if param.split("=")[0] == 'cost':
-                        cost = param.split("=")[1]
-                face_info = (face_b, int(cost))
-                if face_a not in faces:
-                    faces[face_a] = [face_info]
-                else:
-                    faces[face_a].append(face_info)
-        except configparser.NoSectionError:
-            debug("Faces section is optional\n")
-            pass
 
-        return (topo, faces)
+        return (topo, Minindn.getFaces(topology))
 
     """Add adhoc links to the network"""
     # In the topo.py, all the links require two stations, but in adhoc topology, we need to add links for all the nodes.
@@ -0,0 +1,245 @@
+import argparse, contextlib, csv, itertools, json, os, shutil, subprocess, sys, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import configure
+
+# Parameters of the sweep grid, in the order of the result index 参数网格的维度
+GRID_KEYS = ['algorithm', 'pipeline_type', 'init_cwnd', 'chunk_size', 'total_size', 'bw', 'loss', 'delay']
+LINK_KEYS = ['bw', 'loss', 'delay']
+INDEX_COLUMNS = ['hash'] + GRID_KEYS + ['returncode', 'status', 'duration', 'bytes_fetched', 'goodput_bps']
+
+def main():
+    args = parse_args()
+    runs = build_grid(args)
+    print_grid(runs)
+    run_sweep(args, runs)
+
+def parse_args(test_args=None):
+    """
+    Parsing command-line arguments 解析命令行参数
+    >>> args = parse_args(['structure.csv', '--chunk-size', '1MB', '2MB', '--bw', '30', '100'])
+    >>> args.chunk_size, args.total_size, args.bw, args.loss
+    (['1MB', '2MB'], ['10MB'], ['30', '100'], None)
+    >>> args.algorithm, args.pipeline_type, args.init_cwnd
+    (['aimd'], ['hybla'], ['2.0'])
+    """
+    parser = argparse.ArgumentParser(description="A parser for arguments of sweep.py")
+
+    parser.add_argument('structure', help='the web structure csv file the link parameters are applied to')
+
+    # Every grid argument takes one or more values 每个网格参数可取一个或多个值
+    grid_group = parser.add_argument_group('Sweep grid')
+    grid_group.add_argument('-a', '--algorithm', nargs='+', default=['aimd'], help='web server algorithms')
+    grid_group.add_argument('--pipeline-type', nargs='+', default=['hybla'], help='pipeline types of the consumer')
+    grid_group.add_argument('--init-cwnd', nargs='+', default=['2.0'], help='initial congestion windows')
+    grid_group.add_argument('--chunk-size', nargs='+', default=['1MB'], help='sizes of a single chunk')
+    grid_group.add_argument('--total-size', nargs='+', default=['10MB'], help='sizes of the total file')
+    grid_group.add_argument('--bw', nargs='+', default=None, help='bandwidths of every link, default from the structure file')
+    grid_group.add_argument('--loss', nargs='+', default=None, help='loss rates of every link, default from the structure file')
+    grid_group.add_argument('--delay', nargs='+', default=None, help='delays of every link, default from the structure file')
+
+    run_group = parser.add_argument_group('Runs')
+    run_group.add_argument('-o', '--output', default='results/sweep', help='directory holding the results of every run')
+    run_group.add_argument('--work-dir', default='/tmp/minindn-sweep', help='parent of the Mini-NDN working directory of every run')
+    run_group.add_argument('--timeout', type=float, default=3600, help='seconds after which a run is stopped')
+    run_group.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='processes generating configurations')
+    run_group.add_argument('--rerun', action='store_true', help='run configurations that already have results again')
+
+    return parser.parse_args(test_args)
+
+def apply_link_params(rows, link_params):
+    """
+    Override the link parameters of a structure csv 覆盖结构文件中的链路参数
+    >>> rows = [['from', 'to', 'bw', 'loss', 'delay'], ['con0', 'agg0', '30', '0', '0']]
+    >>> apply_link_params(rows, {'bw': '100', 'loss': None, 'delay': '10'})
+    [['from', 'to', 'bw', 'loss', 'delay'], ['con0', 'agg0', '100', '0', '10']]
+    >>> rows[1]
+    ['con0', 'agg0', '30', '0', '0']
+    """
+    header = rows[0]
+    overrides = {header.index(key): value for key, value in link_params.items() if value is not None}
+    return [header] + [[overrides.get(i, value) for i, value in enumerate(row)] for row in rows[1:]]
+
+def configure_args(params, structure_file):
+    """
+    Arguments of configure.py generating the configuration of a run 生成configure.py的参数
+    >>> configure_args({'algorithm': 'aimd', 'pipeline_type': 'hybla', 'init_cwnd': '2.0',
+    ...                 'chunk_size': '1MB', 'total_size': '10MB'}, 'a.csv')[:4]
+    ['a.csv', '--algorithms', 'aimd', '--pipeline-type']
+    """
+    return [structure_file, '--algorithms', params['algorithm'], '--pipeline-type', params['pipeline_type'],
+            '--init-cwnd', params['init_cwnd'], '--chunk-size', params['chunk_size'],
+            '--total-size', params['total_size']]
+
+def config_hash(params, rows):
+    """
+    Hash configure.py gives the configuration of a run 计算运行配置的哈希值
+    >>> rows = [['from', 'to', 'bw'], ['con0', 'agg0', '30']]
+    >>> params = {'algorithm': 'aimd', 'pipeline_type': 'hybla', 'init_cwnd': '2', 'chunk_size': '1MB', 'total_size': '10MB'}
+    >>> config_hash(params, rows) == config_hash(dict(params, init_cwnd='2.0', chunk_size='1024KB'), rows)
+    True
+    >>> config_hash(params, rows) == config_hash(dict(params, algorithm='rubic'), rows)
+    False
+    """
+    args = configure.parse_args(configure_args(params, '-'))
+    return configure.config_hash(configure.normalize_inputs(args, rows))
+
+def build_grid(args):
+    """
+    Build every run of the cartesian product of the grid 生成参数网格的所有组合
+    >>> with open('_test_.csv', 'w') as f:
+    ...     _ = f.write("from,to,bw,loss,delay,max_queue_number\\n")
+    ...     _ = f.write("con0,agg0,30,0,0,10000\\n")
+    >>> runs = build_grid(parse_args(['_test_.csv', '-a', 'aimd', 'rubic', '--loss', '0', '1']))
+    >>> len(runs), len(set(run['hash'] for run in runs))
+    (4, 4)
+    >>> len(build_grid(parse_args(['_test_.csv', '--chunk-size', '1MB', '1024KB'])))
+    1
+    >>> runs[1]['params']['algorithm'], runs[1]['params']['loss'], runs[1]['structure'][1]
+    ('aimd', '1', ['con0', 'agg0', '30', '1', '0', '10000'])
+    >>> runs[0]['params']['bw'] is None
+    True
+    >>> os.remove('_test_.csv')
+    """
+    with open(args.structure, 'r') as file:
+        rows = [row for row in csv.reader(file) if row]
+
+    values = [getattr(args, key) or [None] for key in GRID_KEYS]
+    runs = {}
+    for combination in itertools.product(*values):
+        params = dict(zip(GRID_KEYS, combination))
+        structure = apply_link_params(rows, {key: params[key] for key in LINK_KEYS})
+        # equivalent values such as 1MB and 1024KB give the same configuration 等价参数只运行一次
+        runs.setdefault(config_hash(params, structure), {'params': params, 'structure': structure})
+    return [dict(run, hash=key) for key, run in runs.items()]
+
+def print_grid(runs):
+    print(f'------ Sweep of {len(runs)} run(s) ------')
+    for run in runs:
+        print(run['hash'], ' '.join(f'{key}={value}' for key, value in run['params'].items() if value is not None))
+    print()
+
+def run_message(run):
+    """
+    Name of the configuration directory of a run 运行对应的配置目录名
+    >>> run_message({'hash': '0123456789abcdef'})
+    'sweep-0123456789abcdef'
+    """
+    return f"sweep-{run['hash']}"
+
+def generate_config(run, output):
+    """
+    Generate the configuration of a run with configure.py, runs in a worker process 在子进程中生成配置
+    >>> with open('_test_.csv', 'w') as f:
+    ...     _ = f.write("from,to,bw,loss,delay,max_queue_number\\n")
+    ...     _ = f.write("con0,agg0,30,0,0,10000\\n")
+    >>> run = build_grid(parse_args(['_test_.csv', '-a', 'cubic', '--init-cwnd', '10', '--delay', '5']))[0]
+    >>> configure.INDEX_FILE = '_test_.yaml'
+    >>> _ = generate_config(run, '_test_sweep_')
+    >>> os.listdir(f"configure/{run['hash']}/algorithm"), configure.resolve_config(run_message(run)) == run['hash']
+    (['cubic'], True)
+    >>> with open(f"configure/{run['hash']}/web.conf") as f:
+    ...     print(f.read().split('[links]\\n')[1].strip())
+    con0:agg0 bw=30 loss=0 delay=5 max_queue_number=10000
+    >>> shutil.rmtree(f"configure/{run['hash']}")
+    >>> shutil.rmtree('_test_sweep_')
+    >>> os.remove('_test_.csv'); os.remove('_test_.yaml'); os.remove('_test_.yaml.lock')
+    >>> configure.INDEX_FILE = 'configure/index.yaml'
+    """
+    structure_file = f"{output}/structures/{run['hash']}.csv"
+    os.makedirs(os.path.dirname(structure_file), exist_ok=True)
+    with open(structure_file, 'w', newline='') as file:
+        csv.writer(file, lineterminator='\n').writerows(run['structure'])
+
+    # configure.py reports every written file, which would interleave between workers 屏蔽子进程输出
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        configure.main(configure_args(run['params'], structure_file) + ['-m', run_message(run), '-y'])
+    return run
+
+def run_autotest(run, args):
+    """
+    Run one configuration through autotest.py in headless mode, returns its exit code 无界面运行autotest
+    """
+    work_dir = f"{args.work_dir}/{run['hash']}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    command = [sys.executable, 'autotest.py', run['hash'], '-a', run['params']['algorithm'],
+               '--headless', '--timeout', str(args.timeout), '--work-dir', work_dir]
+    print(f"Running {run['hash']} ({' '.join(command[1:])})")
+    return subprocess.call(command)
+
+def collect_results(run, args, returncode):
+    """
+    Move the working directory of a finished run into its result directory and index it 收集运行结果
+    Runs on the collector thread while the next run is set up.
+    """
+    work_dir = f"{args.work_dir}/{run['hash']}"
+    result_dir = f"{args.output}/{run['hash']}"
+    shutil.rmtree(result_dir, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(result_dir)), exist_ok=True)
+    if os.path.isdir(work_dir):
+        shutil.move(work_dir, result_dir)
+    else:
+        os.makedirs(result_dir)
+
+    with open(f'{result_dir}/params.json', 'w') as file:
+        json.dump({'hash': run['hash'], 'params': run['params'], 'structure': run['structure']}, file, indent=2)
+
+    summary = {}
+    if os.path.exists(f'{result_dir}/run-summary.json'):
+        with open(f'{result_dir}/run-summary.json', 'r') as file:
+            summary = json.load(file)
+    row = dict(run['params'], hash=run['hash'], returncode=returncode,
+               **{key: summary.get(key) for key in ['status', 'duration', 'bytes_fetched', 'goodput_bps']})
+    append_index(f'{args.output}/index.csv', row)
+    print(f"Results of {run['hash']} collected in {result_dir} ({row['status'] or 'no summary'})")
+
+def append_index(index_file, row):
+    """
+    Append one run to the result index, writing the header first 追加结果索引
+    >>> append_index('_test_.csv', {'hash': 'a', 'algorithm': 'aimd'})
+    >>> append_index('_test_.csv', {'hash': 'b', 'status': 'exited'})
+    >>> with open('_test_.csv') as f:
+    ...     rows = list(csv.DictReader(f))
+    >>> [(row['hash'], row['algorithm'], row['status']) for row in rows]
+    [('a', 'aimd', ''), ('b', '', 'exited')]
+    >>> os.remove('_test_.csv')
+    """
+    exists = os.path.exists(index_file)
+    with open(index_file, 'a', newline='') as file:
+        writer = csv.DictWriter(file, INDEX_COLUMNS, lineterminator='\n')
+        if not exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+def has_results(run, args):
+    return os.path.exists(f"{args.output}/{run['hash']}/run-summary.json")
+
+def run_sweep(args, runs):
+    """
+    Run every configuration back to back 依次执行所有配置
+    Configurations are generated by a process pool ahead of the runs, and the results
+    of run N are collected while run N+1 starts, Mini-NDN itself only runs one
+    experiment at a time.
+    """
+    pending = [run for run in runs if args.rerun or not has_results(run, args)]
+    if len(pending) < len(runs):
+        print(f'Skipping {len(runs) - len(pending)} run(s) with existing results')
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.time()
+    failed = 0
+    collected = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as generators, ThreadPoolExecutor(max_workers=1) as collector:
+        # map yields in order as soon as each configuration is ready 按顺序产出已生成的配置
+        for run in generators.map(generate_config, pending, itertools.repeat(args.output)):
+            returncode = run_autotest(run, args)
+            failed += returncode != 0
+            collected.append(collector.submit(collect_results, run, args, returncode))
+    for future in collected:
+        future.result()
+
+    print(f'------ Sweep finished in {time.time() - start:.1f}s, {failed} of {len(pending)} run(s) failed ------')
+    print(f'Result index: {args.output}/index.csv')
+
+if __name__ == "__main__":
+    main()
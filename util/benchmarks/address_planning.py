@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script checks that AddressPlanner allocates the same /30 addresses as the
+# former per-interface setIP() loop of Minindn.ethernetPairConnectivity, on a random
+# switch-less topology, and compares their planning time and shell round trips.
+# No network namespace is created, node shells are counted instead.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from mininet.util import ipStr, ipParse
+
+from minindn.helpers.address_planner import AddressPlanner
+
+class FakeIntf(object):
+    def __init__(self, node, name):
+        self.node = node
+        self.name = name
+        self.link = None
+        self.ip = None
+        self.prefixLen = None
+
+class FakeLink(object):
+    def __init__(self, node1, node2):
+        self.intf1 = node1.addIntf(self)
+        self.intf2 = node2.addIntf(self)
+
+class FakeNode(object):
+    """Stands in for a Mininet host, recording its commands instead of running them"""
+    def __init__(self, name, homeDir):
+        self.name = name
+        self.params = {'params': {'homeDir': homeDir}}
+        self.intfs = []
+        self.commands = 0
+        os.makedirs(homeDir, exist_ok=True)
+
+    def addIntf(self, link):
+        intf = FakeIntf(self, '{}-eth{}'.format(self.name, len(self.intfs)))
+        intf.link = link
+        self.intfs.append(intf)
+        return intf
+
+    def intfList(self):
+        return self.intfs
+
+    def setIP(self, ip, intf):
+        self.commands += 1
+        intf.ip, intf.prefixLen = ip.split('/')
+
+    def cmd(self, command):
+        self.commands += 1
+        return ''
+
+def listPairConnectivity(hosts):
+    """The former implementation, with its list membership test"""
+    ndnNetBase = '10.0.0.0'
+    interfaces = []
+    for host in hosts:
+        for intf in host.intfList():
+            link = intf.link
+            node1, node2 = link.intf1.node, link.intf2.node
+            if link.intf1 not in interfaces and link.intf2 not in interfaces:
+                interfaces.append(link.intf1)
+                interfaces.append(link.intf2)
+                node1.setIP(ipStr(ipParse(ndnNetBase) + 1) + '/30', intf=link.intf1)
+                node2.setIP(ipStr(ipParse(ndnNetBase) + 2) + '/30', intf=link.intf2)
+                ndnNetBase = ipStr(ipParse(ndnNetBase) + 4)
+
+def buildTopology(nNodes, nLinks, seed, workDir):
+    rng = random.Random(seed)
+    hosts = [FakeNode('n{}'.format(i), path.join(workDir, 'n{}'.format(i))) for i in range(nNodes)]
+    # A random spanning tree keeps the topology connected
+    for i in range(1, nNodes):
+        FakeLink(hosts[rng.randrange(i)], hosts[i])
+    for _ in range(nLinks - nNodes + 1):
+        FakeLink(*rng.sample(hosts, 2))
+    return hosts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Number of nodes", type=int, default=300)
+    parser.add_argument("-L", "--links", help="Number of links", type=int, nargs='+', default=[1000, 4000])
+    parser.add_argument("-s", "--seed", help="Seed of the topology generator", type=int, default=1)
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    workDir = tempfile.mkdtemp(prefix='address-planning-')
+    mismatches = 0
+    print('{:>6} {:>12} {:>12} {:>14} {:>14}'.format('links', 'list', 'planner', 'list shells', 'planner shells'))
+    for nLinks in args.links:
+        hosts = buildTopology(args.nodes, nLinks, args.seed, workDir)
+        start = time.perf_counter()
+        listPairConnectivity(hosts)
+        listTime = time.perf_counter() - start
+        expected = {intf.name: (intf.ip, int(intf.prefixLen)) for host in hosts for intf in host.intfs}
+        listShells = sum(host.commands for host in hosts)
+
+        hosts = buildTopology(args.nodes, nLinks, args.seed, workDir)
+        start = time.perf_counter()
+        AddressPlanner.apply(AddressPlanner.plan(hosts))
+        plannerTime = time.perf_counter() - start
+        actual = {intf.name: (intf.ip, intf.prefixLen) for host in hosts for intf in host.intfs}
+        plannerShells = sum(host.commands for host in hosts)
+
+        if actual != expected:
+            mismatches += 1
+            logging.error("Addresses differ for {} links".format(nLinks))
+        print('{:>6} {:>11.3f}s {:>11.3f}s {:>14} {:>14}'.format(nLinks, listTime, plannerTime,
+                                                                 listShells, plannerShells))
+
+    shutil.rmtree(workDir)
+    sys.exit(1 if mismatches else 0)
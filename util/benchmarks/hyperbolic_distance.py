@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script checks that the NumPy hyperbolic distance matrix yields the same
+# FIB costs as the pairwise getHyperbolicDistance() computation, for hyperbolic
+# (one angle) and geohyperbolic (two angles) coordinates, and times both.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from minindn.helpers.ndn_routing_helper import getHyperbolicDistance, getHyperbolicDistanceMatrix, \
+                                               HYPERBOLIC_COST_ADJUSTMENT_FACTOR
+
+def generateCoordinates(nNodes, nAngles, seed):
+    rng = random.Random(seed)
+    nodeDict = defaultdict(dict)
+    for i in range(nNodes):
+        radius = round(rng.uniform(1.0, 30.0), 5)
+        angles = [round(rng.uniform(0, math.pi), 5) for _ in range(nAngles - 1)] + \
+                 [round(rng.uniform(0, 2 * math.pi), 5)]
+        nodeDict['n{}'.format(i)][radius] = angles
+    return nodeDict
+
+def toCost(distance):
+    return int(HYPERBOLIC_COST_ADJUSTMENT_FACTOR * round(distance, 6))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Number of nodes to benchmark", type=int, nargs='+',
+                        default=[50, 200, 1000])
+    parser.add_argument("-s", "--seed", help="Seed of the coordinate generator", type=int, default=1)
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    mismatches = 0
+    print('{:>6} {:>7} {:>12} {:>12}'.format('nodes', 'angles', 'pairwise', 'matrix'))
+    for nNodes in args.nodes:
+        for nAngles in [1, 2]:
+            nodeDict = generateCoordinates(nNodes, nAngles, args.seed)
+            nodeNames = list(nodeDict)
+
+            start = time.perf_counter()
+            pairwise = [[toCost(getHyperbolicDistance(nodeDict[a], nodeDict[b])) if a != b else 0
+                         for b in nodeNames] for a in nodeNames]
+            pairwiseTime = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matrix = [[toCost(d) for d in row] for row in getHyperbolicDistanceMatrix(nodeDict, nodeNames).tolist()]
+            matrixTime = time.perf_counter() - start
+
+            for i, a in enumerate(nodeNames):
+                for j, b in enumerate(nodeNames):
+                    if i != j and pairwise[i][j] != matrix[i][j]:
+                        mismatches += 1
+                        logging.error("Cost from {} to {} differs: {} != {}"
+                                      .format(a, b, pairwise[i][j], matrix[i][j]))
+            print('{:>6} {:>7} {:>12.3f} {:>12.3f}'.format(nNodes, nAngles, pairwiseTime, matrixTime))
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script times IPRoutingHelper.calcAllRoutes on grid topologies in the
+# all-pairs mode and in the shortest path tree mode, counting the shell commands
+# each needs. The routes of the tree mode are checked to be shortest, to reach
+# their destination and to be symmetric. The all-pairs mode enumerates every
+# shortest path of every pair and is only run on the smaller grids.
+# No network namespace is created, node shells are counted instead.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from os import path
+from types import SimpleNamespace
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from minindn.helpers.ip_routing_helper import IPRoutingHelper
+
+class CountingNode(object):
+    """Stands in for a Mininet host, counting its commands instead of running them"""
+    def __init__(self, name, homeDir):
+        self.name = name
+        self.params = {'params': {'homeDir': homeDir}}
+        self.intfs = {}
+        self.commands = 0
+        os.makedirs(homeDir, exist_ok=True)
+
+    def addIntf(self, ip):
+        intf = SimpleNamespace(node=self, name='{}-eth{}'.format(self.name, len(self.intfs)), ip=ip)
+        self.intfs[intf.name] = intf
+        return intf
+
+    def cmd(self, command):
+        self.commands += 1
+        return ''
+
+def generateGrid(rows, columns, workDir):
+    hosts = [CountingNode('n{}'.format(i), path.join(workDir, 'n{}'.format(i))) for i in range(rows * columns)]
+    links = []
+    for i in range(rows * columns):
+        for j in [i + 1 if (i + 1) % columns else None, i + columns if i + columns < rows * columns else None]:
+            if j is not None:
+                # One /30 per link, as Minindn.ethernetPairConnectivity assigns
+                subnet = 4 * len(links)
+                ip = lambda offset: '10.{}.{}.{}'.format(subnet >> 16, (subnet >> 8) & 255, (subnet & 255) + offset)
+                links.append(SimpleNamespace(intf1=hosts[i].addIntf(ip(1)), intf2=hosts[j].addIntf(ip(2))))
+    byName = {host.name: host for host in hosts}
+    return SimpleNamespace(hosts=hosts, links=links, get=byName.get)
+
+def hopDistances(net, source):
+    neighbors = {}
+    for link in net.links:
+        neighbors.setdefault(link.intf1.node.name, []).append(link.intf2.node.name)
+        neighbors.setdefault(link.intf2.node.name, []).append(link.intf1.node.name)
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in neighbors[node]:
+            if neighbor not in distances:
+                distances[neighbor] = distances[node] + 1
+                queue.append(neighbor)
+    return distances
+
+def checkTrees(net, firstHops, nSources):
+    """Returns the number of (source, destination) pairs whose route is wrong"""
+    errors = 0
+    names = [host.name for host in net.hosts]
+    step = max(1, len(names) // nSources)
+    for source in names[::step]:
+        distances = hopDistances(net, source)
+        for destination in names:
+            if destination == source:
+                continue
+            forward, node = [source], source
+            while node != destination and len(forward) <= len(names):
+                node = firstHops[node][destination]
+                forward.append(node)
+            backward, node = [destination], destination
+            while node != source and len(backward) <= len(names):
+                node = firstHops[node][source]
+                backward.append(node)
+            if len(forward) - 1 != distances[destination] or forward != backward[::-1]:
+                errors += 1
+    return errors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Approximate number of nodes of the square grids", type=int,
+                        nargs='+', default=[36, 100, 250, 500, 1000])
+    parser.add_argument("--all_pairs_max", help="Largest grid run in the all-pairs mode", type=int, default=36)
+    parser.add_argument("--check_sources", help="Number of sources whose routes are checked", type=int,
+                        default=50)
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    errors = 0
+    print('{:>6} {:>6} {:>12} {:>12} {:>14} {:>14} {:>10}'.format('nodes', 'links', 'all-pairs', 'spt',
+                                                                  'pairs shells', 'spt shells', 'routes'))
+    for nNodes in args.nodes:
+        side = int(round(math.sqrt(nNodes)))
+        workDir = tempfile.mkdtemp(prefix='ip-routes-')
+
+        pairsTime = pairsShells = '-'
+        if side * side <= args.all_pairs_max:
+            net = generateGrid(side, side, workDir)
+            start = time.perf_counter()
+            IPRoutingHelper.calcAllRoutes(net)
+            pairsTime = '{:.2f}s'.format(time.perf_counter() - start)
+            pairsShells = sum(host.commands for host in net.hosts)
+
+        net = generateGrid(side, side, workDir)
+        start = time.perf_counter()
+        IPRoutingHelper.calcAllRoutes(net, mode=IPRoutingHelper.MODE_SHORTEST_PATH_TREE)
+        sptTime = time.perf_counter() - start
+        sptShells = sum(host.commands for host in net.hosts)
+        nRoutes = sum(1 for host in net.hosts
+                      for _ in open(path.join(host.params['params']['homeDir'], 'ip-routes.batch')) if _.strip())
+
+        edges = [(link.intf1.node.name, link.intf2.node.name) for link in net.links]
+        firstHops = IPRoutingHelper.shortestPathTrees([host.name for host in net.hosts], edges)
+        wrong = checkTrees(net, firstHops, args.check_sources)
+        if wrong:
+            errors += 1
+            logging.error("{} wrong routes on the {}x{} grid".format(wrong, side, side))
+
+        print('{:>6} {:>6} {:>12} {:>11.2f}s {:>14} {:>14} {:>10}'.format(side * side, len(net.links), pairsTime,
+                                                                         sptTime, pairsShells, sptShells, nRoutes))
+        shutil.rmtree(workDir)
+    sys.exit(1 if errors else 0)
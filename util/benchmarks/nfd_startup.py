@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script measures the configuration step of Nfd.__init__ for a number of
+# nodes, counting the subprocesses spawned per node, with the in-process
+# nfd.conf templating and with the infoconv round trip. The generated
+# configuration values are compared between both modes.
+# Requires an installed nfd.conf, and infoconv for the comparison.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from minindn.apps.nfd import Nfd
+from minindn.helpers.info_tree import InfoTree
+from minindn.minindn import Minindn
+
+class CountingNode(object):
+    """Stands in for a Mininet host, running commands in a local shell and counting them"""
+    def __init__(self, name, homeDir):
+        self.name = name
+        self.params = {'params': {'homeDir': homeDir}}
+        self.spawned = 0
+        os.makedirs(homeDir)
+
+    def cmd(self, command):
+        self.spawned += 1
+        return subprocess.run(['bash', '-c', command], cwd=self.params['params']['homeDir'],
+                              stdout=subprocess.PIPE, universal_newlines=True).stdout
+
+    def popen(self, *args, **kwargs):
+        self.spawned += 1
+        return subprocess.Popen(*args, **kwargs)
+
+def configureNodes(workDir, nNodes, useInfoconv):
+    nodes = [CountingNode('n{}'.format(i), '{}/n{}'.format(workDir, i)) for i in range(nNodes)]
+    start = time.perf_counter()
+    for node in nodes:
+        Nfd(node, useInfoconv=useInfoconv)
+    return time.perf_counter() - start, sum(node.spawned for node in nodes) / nNodes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Number of nodes to configure", type=int, default=100)
+    parser.add_argument("--no-infoconv", help="Skip the infoconv round trip", action="store_true")
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    # Key generation is identical in both modes and would dominate the measurement
+    Minindn.ndnSecurityDisabled = True
+
+    modes = [False] if args.no_infoconv or shutil.which('infoconv') is None else [False, True]
+    if len(modes) == 1:
+        logging.info("Skipping the infoconv round trip")
+
+    workDirs = {}
+    print('{:>10} {:>6} {:>10} {:>14}'.format('mode', 'nodes', 'seconds', 'spawns/node'))
+    for useInfoconv in modes:
+        workDirs[useInfoconv] = tempfile.mkdtemp(prefix='nfd-startup-')
+        elapsed, spawned = configureNodes(workDirs[useInfoconv], args.nodes, useInfoconv)
+        print('{:>10} {:>6} {:>10.3f} {:>14.1f}'.format('infoconv' if useInfoconv else 'template',
+                                                        args.nodes, elapsed, spawned))
+
+    mismatches = 0
+    if len(modes) == 2:
+        renderedKeys = ['log.default_level', 'face_system.unix.path', 'tables.cs_max_packets',
+                        'tables.cs_policy', 'tables.cs_unsolicited_policy']
+        for i in range(args.nodes):
+            template, infoconv = [InfoTree.load('{}/n{}/nfd.conf'.format(workDirs[mode], i)) for mode in modes]
+            if any(template.get(key) != infoconv.get(key) for key in renderedKeys):
+                mismatches += 1
+                logging.error("Rendered values of n{} differ between both modes".format(i))
+            elif template.dump() != infoconv.dump():
+                # JSON objects cannot hold repeated keys, which the round trip drops
+                logging.debug("nfd.conf of n{} differs outside of the rendered values".format(i))
+
+    for workDir in workDirs.values():
+        shutil.rmtree(workDir)
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script measures the launch latency of getPopen, which Application.start and
+# NfdcBatch.executeBatch use, with the per-host environment cache and with the cache
+# invalidated before every launch as printenv used to run on each of them.
+# It also checks that values containing '=' or newlines survive the environment parsing.
+# Processes run in the local namespace instead of a Mininet host.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from minindn.util import getPopen, invalidateEnvCache
+
+class CountingNode(object):
+    """Stands in for a Mininet host, running processes locally and counting them"""
+    def __init__(self, name, homeDir):
+        self.name = name
+        self.params = {'params': {'homeDir': homeDir}}
+        self.spawned = 0
+        os.makedirs(homeDir)
+
+    def popen(self, *args, **kwargs):
+        self.spawned += 1
+        kwargs.setdefault('stdout', subprocess.PIPE)
+        return subprocess.Popen(*args, **kwargs)
+
+def launch(nodes, nLaunches, cached):
+    invalidateEnvCache()
+    latencies = []
+    for _ in range(nLaunches):
+        for node in nodes:
+            if not cached:
+                invalidateEnvCache(node)
+            start = time.perf_counter()
+            getPopen(node, ['true'], stdout=subprocess.DEVNULL).wait()
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], sum(latencies), sum(node.spawned for node in nodes)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Number of nodes", type=int, default=20)
+    parser.add_argument("-L", "--launches", help="Number of launches per node", type=int, default=20)
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    workDir = tempfile.mkdtemp(prefix='process-launch-')
+    errors = 0
+
+    # Values the former line based parsing truncated or dropped
+    os.environ['MININDN_BENCHMARK_EQUALS'] = 'a=b=c'
+    os.environ['MININDN_BENCHMARK_NEWLINE'] = 'first\n\nsecond'
+    node = CountingNode('check', path.join(workDir, 'check'))
+    output = getPopen(node, ['printenv', '-0'], envDict={'NDN_LOG': 'nlsr.*=TRACE'}).communicate()[0]
+    env = dict(var.partition('=')[::2] for var in output.decode('utf-8').split('\0') if var)
+    expected = {'MININDN_BENCHMARK_EQUALS': 'a=b=c', 'MININDN_BENCHMARK_NEWLINE': 'first\n\nsecond',
+                'NDN_LOG': 'nlsr.*=TRACE', 'HOME': node.params['params']['homeDir']}
+    for key, value in expected.items():
+        if env.get(key) != value:
+            errors += 1
+            logging.error("{} is {!r} instead of {!r}".format(key, env.get(key), value))
+
+    print('{:>10} {:>14} {:>12} {:>10}'.format('mode', 'median launch', 'total', 'processes'))
+    for mode, cached in [('printenv', False), ('cached', True)]:
+        nodes = [CountingNode('{}{}'.format(mode, i), path.join(workDir, '{}{}'.format(mode, i)))
+                 for i in range(args.nodes)]
+        median, total, spawned = launch(nodes, args.launches, cached)
+        print('{:>10} {:>12.2f}ms {:>11.2f}s {:>10}'.format(mode, median * 1000, total, spawned))
+
+    invalidateEnvCache()
+    shutil.rmtree(workDir)
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2020, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script compares the per-pair dijkstra() route computation of the
+# link-state routing helper with the shortest path tree engine on generated
+# topologies, and verifies that both produce the same routes.
+# To use, run with python3 from the repository root
+
+import argparse
+import logging
+import random
+import sys
+import time
+from os import path
+from types import SimpleNamespace
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '..'))
+
+from minindn.helpers.ndn_routing_helper import _CalculateRoutes, dijkstra
+
+def generateTopology(nNodes, degree, seed):
+    """Returns a connected random topology shaped like the net object used by _CalculateRoutes"""
+    rng = random.Random(seed)
+    names = ['n{}'.format(i) for i in range(nNodes)]
+    edges = {}
+    # Random spanning tree first so that the topology is connected
+    for i in range(1, nNodes):
+        edges[(names[rng.randrange(i)], names[i])] = rng.randint(1, 50)
+    while len(edges) < nNodes * degree // 2:
+        a, b = rng.sample(names, 2)
+        if (a, b) not in edges and (b, a) not in edges:
+            edges[(a, b)] = rng.randint(1, 50)
+
+    hosts = [SimpleNamespace(name=name, params={'params': {}}) for name in names]
+    links = [(a, b, {'delay': '{}ms'.format(delay)}) for (a, b), delay in edges.items()]
+    topo = SimpleNamespace(links=lambda withInfo=True: links)
+    return SimpleNamespace(hosts=hosts, topo=topo)
+
+def legacyDijkastra(routeObject):
+    """Per-pair dijkstra() computation of _CalculateRoutes.computeDijkastra before the tree engine"""
+    distanceMatrix = routeObject.getNestedDictionary()
+    nodeNames = routeObject.getNodeNames()
+    for node in nodeNames:
+        others = [x for x in nodeNames if x not in [node]]
+        for destinationNode in others:
+            cost, path = dijkstra(routeObject.adjacenctMatrix, node, destinationNode)
+            distanceMatrix[node][destinationNode][path[1]] = cost
+    return distanceMatrix
+
+def legacyDijkastraAll(routeObject):
+    """Per-pair dijkstra() computation of _CalculateRoutes.computeDijkastraAll before the tree engine"""
+    distanceMatrixViaNeighbor = routeObject.getNestedDictionary()
+    nodeNames = routeObject.getNodeNames()
+    adjacenctMatrix = routeObject.adjacenctMatrix
+    for node in nodeNames:
+        for viaNeighbor in [k for k in adjacenctMatrix[node]]:
+            distanceMatrixViaNeighbor[node][viaNeighbor][viaNeighbor] = adjacenctMatrix[node][viaNeighbor]
+            others = [x for x in nodeNames if x not in [viaNeighbor, node]]
+            for destinationNode in others:
+                cost, path = dijkstra(adjacenctMatrix, viaNeighbor, destinationNode, node)
+                if cost != 0 and path != None:
+                    totalCost = cost + adjacenctMatrix[node][viaNeighbor]
+                    distanceMatrixViaNeighbor[node][destinationNode][viaNeighbor] = totalCost
+    return distanceMatrixViaNeighbor
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", help="Topology sizes to benchmark", type=int, nargs='+',
+                        default=[50, 100, 200, 500, 1000])
+    parser.add_argument("-d", "--degree", help="Average node degree", type=int, default=4)
+    parser.add_argument("-s", "--seed", help="Seed of the topology generator", type=int, default=1)
+    parser.add_argument("--legacy-max-nodes", help="Skip the per-pair computation above this size",
+                        type=int, default=200)
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    print('{:>6} {:>6} {:>14} {:>14} {:>14} {:>14}'.format('nodes', 'links', 'best-legacy', 'best-tree',
+                                                           'all-legacy', 'all-tree'))
+    for nNodes in args.nodes:
+        net = generateTopology(nNodes, args.degree, args.seed)
+        routeObject = _CalculateRoutes(net, 'link-state')
+        bestTree, bestRoutes = timed(routeObject.computeDijkastra)
+        allTree, allRoutes = timed(routeObject.computeDijkastraAll)
+        bestLegacy = allLegacy = None
+        if nNodes <= args.legacy_max_nodes:
+            bestLegacy, legacyBestRoutes = timed(legacyDijkastra, routeObject)
+            allLegacy, legacyAllRoutes = timed(legacyDijkastraAll, routeObject)
+            if legacyBestRoutes != bestRoutes or legacyAllRoutes != allRoutes:
+                logging.error("Routes differ from the per-pair computation for {} nodes".format(nNodes))
+                sys.exit(1)
+        else:
+            logging.info("Skipping per-pair computation for {} nodes".format(nNodes))
+
+        print('{:>6} {:>6} {:>14} {:>14.3f} {:>14} {:>14.3f}'.format(
+            nNodes, len(net.topo.links()),
+            '-' if bestLegacy is None else '{:.3f}'.format(bestLegacy), bestTree,
+            '-' if allLegacy is None else '{:.3f}'.format(allLegacy), allTree))
@@ -31,67 +31,88 @@ import argparse
 import datetime
 import json
 import logging
+import os
 from os import path
 from urllib.request import urlopen
 
-def testbedGen():
-    """Returns a string with the Mini-NDN topology version of the testbed"""
-    topology = None
-    connections = None
-    hosts = []
-    links = []
-    try:
-        with urlopen("https://ndndemo.arl.wustl.edu/testbedNodes.json") as url:
-            topology = json.loads(url.read().decode())
-        with urlopen("https://ndndemo.arl.wustl.edu/links.json") as url:
-            connections = json.loads(url.read().decode())
-    except:
-        logging.error("Failed to retrieve testbed info from WUSTL servers")
-        if __name__ == '__main__':
-            from sys import exit
-            exit(1)
-        raise
+TESTBED_URLS = {'testbedNodes.json': "https://ndndemo.arl.wustl.edu/testbedNodes.json",
+                'links.json': "https://ndndemo.arl.wustl.edu/links.json"}
 
-    logging.info("Generating testbed topology...")
+def loadTestbed(snapshotDir=None):
+    """
+    Returns the testbed nodes and links, read from the JSON snapshot in snapshotDir when it
+    exists and fetched from the WUSTL servers otherwise, in which case a snapshot is saved
+    """
+    data = {}
+    for fileName, url in TESTBED_URLS.items():
+        snapshot = path.join(snapshotDir, fileName) if snapshotDir else None
+        if snapshot and path.isfile(snapshot):
+            logging.info("Reading testbed snapshot {}".format(snapshot))
+            with open(snapshot, 'r') as file:
+                data[fileName] = json.load(file)
+            continue
+        try:
+            with urlopen(url) as response:
+                data[fileName] = json.loads(response.read().decode())
+        except:
+            logging.error("Failed to retrieve testbed info from WUSTL servers")
+            if __name__ == '__main__':
+                from sys import exit
+                exit(1)
+            raise
+        if snapshot:
+            os.makedirs(snapshotDir, exist_ok=True)
+            with open(snapshot, 'w') as file:
+                json.dump(data[fileName], file)
+            logging.info("Saved testbed snapshot {}".format(snapshot))
+    return data['testbedNodes.json'], data['links.json']
+
+def testbedNodes(topology):
+    """Yields the name and hyperbolic coordinates of every testbed node with neighbors"""
     for node_name in topology:
         node = topology[node_name]
         if node['neighbors']:
-            radius = node['hr_radius']
-            angle = node['hr_angle']
-            host_str = "{}: _ radius={} angle={}\n".format(node_name, radius, angle)
-            hosts.append(host_str)
-            logging.debug("Add node: {}".format(host_str)[:-1])
+            yield node_name, {'radius': node['hr_radius'], 'angle': node['hr_angle']}
         else:
             # A node without neighbors shouldn't be considered part of the testbed
             # for testing purposes
             logging.debug("Node {} has no neighbors, passing...".format(node_name))
+
+def testbedLinks(connections):
+    """Yields the endpoints and delay of every testbed link"""
     for link in connections:
-        node1 = link['start']
-        node2 = link['end']
         # This value is equivalent to RTT in the testbed
-        delay = link['nlsr_weight']
-        link_str = "{}:{} delay={}ms\n".format(node1, node2, delay)
-        logging.debug("Add link: {}".format(link_str)[:-1])
-        links.append(link_str.strip())
+        yield link['start'], link['end'], {'delay': '{}ms'.format(link['nlsr_weight'])}
 
-    topo_str = "[nodes]\n"
-    for host in hosts:
-        topo_str = topo_str + host
-    topo_str = topo_str + "[links]\n"
-    for link in links:
-        topo_str = topo_str + link
-    return topo_str.strip()
+def testbedGen(snapshotDir=None):
+    """Returns a string with the Mini-NDN topology version of the testbed"""
+    topology, connections = loadTestbed(snapshotDir)
+
+    logging.info("Generating testbed topology...")
+    lines = ["[nodes]"]
+    for node_name, params in testbedNodes(topology):
+        host_str = "{}: _ radius={} angle={}".format(node_name, params['radius'], params['angle'])
+        logging.debug("Add node: {}".format(host_str))
+        lines.append(host_str)
+    lines.append("[links]")
+    for node1, node2, params in testbedLinks(connections):
+        link_str = "{}:{} delay={}".format(node1, node2, params['delay'])
+        logging.debug("Add link: {}".format(link_str))
+        lines.append(link_str)
+    return "\n".join(lines)
 
 if __name__ == '__main__':
     default_path = path.dirname(__file__) + '/../topologies/testbed{}.conf'.format(str(datetime.date.today()))
     parser = argparse.ArgumentParser()
     parser.add_argument("-l", "--log_level", help="Log level to output", default="info", choices=["debug", "info", "warning", "error"])
     parser.add_argument("-o", "--output_dir", help="File output location", default=default_path)
+    parser.add_argument("-s", "--snapshot_dir", help="Directory of a testbed JSON snapshot to read instead of the WUSTL servers, "
+                        "saved there when missing", default=None)
     args = parser.parse_args()
     log_level = getattr(logging, args.log_level.upper())
     topologies_path = path.abspath(args.output_dir)
     logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
-    topo = testbedGen()
+    topo = testbedGen(args.snapshot_dir)
     logging.info("Testbed generated, writing to file...")
     with open(topologies_path, "w") as file:
         file.writelines(topo)
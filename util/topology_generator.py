@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- Mode:python; c-file-style:"gnu"; indent-tabs-mode:nil -*- */
+#
+# Copyright (C) 2015-2021, The University of Memphis,
+#                          Arizona Board of Regents,
+#                          Regents of the University of California.
+#
+# This file is part of Mini-NDN.
+# See AUTHORS.md for a complete list of Mini-NDN authors and contributors.
+#
+# Mini-NDN is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mini-NDN is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mini-NDN, e.g., in COPYING.md file.
+# If not, see <http://www.gnu.org/licenses/>.
+
+# This script generates parametric topologies without network access, for
+# scale testing routing and startup. It writes a Mini-NDN topology file
+# (web.conf) and the matching structure.csv of configure.py, streaming nodes
+# and links to disk as they are generated:
+#   tree        k-ary aggregation tree, con0 -> agg* -> pro* like structure.csv
+#   fattree     k-ary fat-tree of core, aggregation and edge nodes and hosts
+#   waxman      Waxman random graph on the unit square
+#   ba          Barabasi-Albert preferential attachment graph
+#   hyperbolic  random hyperbolic graph, nodes carry radius and angle for hr routing
+#   testbed     NDN testbed, from a JSON snapshot saved by testbed_topo_generator.py
+# structure.csv cannot hold node parameters, use web.conf for hyperbolic routing.
+# Waxman and hyperbolic graphs require NumPy.
+# To use, run with python3, e.g. python3 util/topology_generator.py tree -k 4 -d 6
+
+import argparse
+import csv
+import logging
+import math
+import os
+import random
+import time
+from os import path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LINK_COLUMNS = ['bw', 'loss', 'delay', 'max_queue_number']
+
+def karyTree(k, depth):
+    """
+    Consumer con0 at the root, aggregators agg* at the inner levels and producers pro* as leaves
+    """
+    def nodes():
+        yield 'con0', {}
+        inner = sum(k ** level for level in range(1, depth))
+        for i in range(inner):
+            yield 'agg{}'.format(i), {}
+        for i in range(k ** depth):
+            yield 'pro{}'.format(i), {}
+
+    def links():
+        # Nodes are numbered breadth first, the children of node i are k * i + 1 ... k * i + k
+        inner = sum(k ** level for level in range(0, depth))
+        name = lambda i: 'con0' if i == 0 else ('agg{}'.format(i - 1) if i < inner else 'pro{}'.format(i - inner))
+        for parent in range(inner):
+            for child in range(k * parent + 1, k * parent + k + 1):
+                yield name(parent), name(child), {}
+
+    return nodes(), links()
+
+def fatTree(k):
+    """
+    k pods of k/2 aggregation and k/2 edge nodes, (k/2)^2 core nodes and k^3/4 hosts
+    """
+    if k % 2:
+        raise ValueError('The fat-tree arity must be even')
+    half = k // 2
+
+    def nodes():
+        for prefix, count in [('core', half * half), ('agg', k * half), ('edge', k * half), ('host', k * half * half)]:
+            for i in range(count):
+                yield '{}{}'.format(prefix, i), {}
+
+    def links():
+        for pod in range(k):
+            for i in range(half):
+                agg = pod * half + i
+                # Aggregation node i of every pod connects to core nodes i * k/2 ... i * k/2 + k/2 - 1
+                for j in range(half):
+                    yield 'core{}'.format(i * half + j), 'agg{}'.format(agg), {}
+                for j in range(half):
+                    yield 'agg{}'.format(agg), 'edge{}'.format(pod * half + j), {}
+            for i in range(half):
+                edge = pod * half + i
+                for j in range(half):
+                    yield 'edge{}'.format(edge), 'host{}'.format(edge * half + j), {}
+
+    return nodes(), links()
+
+def waxman(n, alpha, beta, seed):
+    """
+    Nodes placed uniformly on the unit square, u and v are linked with probability
+    beta * exp(-d(u, v) / (alpha * sqrt(2)))
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.random((n, 2))
+    scale = alpha * math.sqrt(2)
+
+    def nodes():
+        for i in range(n):
+            yield 'n{}'.format(i), {}
+
+    def links():
+        # One row of the distance matrix at a time keeps the memory linear in n
+        for i in range(n - 1):
+            distances = np.hypot(*(positions[i + 1:] - positions[i]).T)
+            linked = np.nonzero(rng.random(n - i - 1) < beta * np.exp(-distances / scale))[0]
+            for j in (linked + i + 1).tolist():
+                yield 'n{}'.format(i), 'n{}'.format(j), {}
+
+    return nodes(), links()
+
+def barabasiAlbert(n, m, seed):
+    """
+    Starts from a clique of m + 1 nodes, every further node links to m distinct
+    nodes chosen with a probability proportional to their degree
+    """
+    if not 1 <= m < n:
+        raise ValueError('The number of links per node must be between 1 and n - 1')
+    rng = random.Random(seed)
+
+    def nodes():
+        for i in range(n):
+            yield 'n{}'.format(i), {}
+
+    def links():
+        # Every node appears once per link end, so a uniform pick is degree proportional
+        ends = []
+        for i in range(m + 1):
+            for j in range(i + 1, m + 1):
+                ends += [i, j]
+                yield 'n{}'.format(i), 'n{}'.format(j), {}
+        for new in range(m + 1, n):
+            targets = set()
+            while len(targets) < m:
+                targets.add(rng.choice(ends))
+            for target in sorted(targets):
+                ends += [new, target]
+                yield 'n{}'.format(new), 'n{}'.format(target), {}
+
+    return nodes(), links()
+
+def hyperbolic(n, degree, gamma, seed):
+    """
+    Random hyperbolic graph of Krioukov et al. at zero temperature: nodes are placed in a disk
+    of radius R with a radial density giving a power-law degree distribution of exponent gamma,
+    and linked when their hyperbolic distance is below R, which is chosen to give the average
+    degree. The coordinates are written as the radius and angle of NLSR hyperbolic routing.
+    """
+    if gamma <= 2:
+        raise ValueError('The power-law exponent must be above 2')
+    rng = np.random.default_rng(seed)
+    alpha = (gamma - 1) / 2
+    xi = alpha / (alpha - 0.5)
+    radius = 2 * math.log(2 * xi * xi * n / (math.pi * degree))
+    radii = np.arccosh(1 + (math.cosh(alpha * radius) - 1) * rng.random(n)) / alpha
+    angles = rng.random(n) * 2 * math.pi
+    # Coordinates are written rounded, NLSR and processTopo only see these
+    radii, angles = np.round(radii, 6), np.round(angles, 6)
+    coshRadii, sinhRadii = np.cosh(radii), np.sinh(radii)
+    coshRadius = math.cosh(radius)
+
+    def nodes():
+        for i, (r, theta) in enumerate(zip(radii.tolist(), angles.tolist())):
+            yield 'n{}'.format(i), {'radius': r, 'angle': theta}
+
+    def links():
+        for i in range(n - 1):
+            deltas = np.pi - np.abs(np.pi - np.abs(angles[i + 1:] - angles[i]))
+            coshDistances = coshRadii[i] * coshRadii[i + 1:] - sinhRadii[i] * sinhRadii[i + 1:] * np.cos(deltas)
+            for j in (np.nonzero(coshDistances <= coshRadius)[0] + i + 1).tolist():
+                yield 'n{}'.format(i), 'n{}'.format(j), {}
+
+    return nodes(), links()
+
+def testbed(snapshotDir):
+    from testbed_topo_generator import loadTestbed, testbedNodes, testbedLinks
+    topology, connections = loadTestbed(snapshotDir)
+    return testbedNodes(topology), testbedLinks(connections)
+
+def writeTopology(nodes, links, outputDir, linkParams):
+    """
+    Streams nodes and links to outputDir/web.conf and the links to outputDir/structure.csv,
+    returns the number of nodes and links
+    """
+    os.makedirs(outputDir, exist_ok=True)
+    nNodes = nLinks = 0
+    with open(path.join(outputDir, 'web.conf'), 'w') as conf, \
+         open(path.join(outputDir, 'structure.csv'), 'w', newline='') as structure:
+        conf.write('[nodes]\n')
+        for name, params in nodes:
+            if params:
+                conf.write('{}: _ {}\n'.format(name, ' '.join('{}={}'.format(*param) for param in params.items())))
+            else:
+                conf.write('{}:_\n'.format(name))
+            nNodes += 1
+
+        conf.write('\n[links]\n')
+        writer = csv.writer(structure, lineterminator='\n')
+        writer.writerow(['from', 'to'] + LINK_COLUMNS)
+        for node1, node2, params in links:
+            values = [params.get(column, linkParams[column]) for column in LINK_COLUMNS]
+            conf.write('{}:{} {}\n'.format(node1, node2, ' '.join('{}={}'.format(*param)
+                                                                  for param in zip(LINK_COLUMNS, values))))
+            writer.writerow([node1, node2] + values)
+            nLinks += 1
+    return nNodes, nLinks
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-l", "--log_level", help="Log level to output", default="info",
+                        choices=["debug", "info", "warning", "error"])
+    parser.add_argument("-o", "--output_dir", help="Directory web.conf and structure.csv are written to, "
+                        "default is topologies/<kind>", default=None)
+    parser.add_argument("-s", "--seed", help="Seed of the random graphs", type=int, default=1)
+    parser.add_argument("--bw", help="Bandwidth of every link", default='30')
+    parser.add_argument("--loss", help="Loss rate of every link", default='0')
+    parser.add_argument("--delay", help="Delay of every link", default='10ms')
+    parser.add_argument("--max_queue_number", help="Queue size of every link", default='10000')
+    kinds = parser.add_subparsers(dest='kind', required=True)
+
+    tree = kinds.add_parser('tree', help='k-ary aggregation tree')
+    tree.add_argument("-k", help="Children per node", type=int, default=2)
+    tree.add_argument("-d", "--depth", help="Number of levels below the consumer", type=int, default=2)
+
+    fattree = kinds.add_parser('fattree', help='k-ary fat-tree')
+    fattree.add_argument("-k", help="Arity, must be even", type=int, default=4)
+
+    wax = kinds.add_parser('waxman', help='Waxman random graph')
+    wax.add_argument("-n", "--nodes", help="Number of nodes", type=int, default=100)
+    wax.add_argument("--alpha", help="Link probability decay with the distance", type=float, default=0.1)
+    wax.add_argument("--beta", help="Link probability at zero distance", type=float, default=0.4)
+
+    ba = kinds.add_parser('ba', help='Barabasi-Albert graph')
+    ba.add_argument("-n", "--nodes", help="Number of nodes", type=int, default=100)
+    ba.add_argument("-m", help="Links of every new node", type=int, default=2)
+
+    hr = kinds.add_parser('hyperbolic', help='random hyperbolic graph with coordinates')
+    hr.add_argument("-n", "--nodes", help="Number of nodes", type=int, default=100)
+    hr.add_argument("--degree", help="Average degree", type=float, default=6)
+    hr.add_argument("--gamma", help="Exponent of the power-law degree distribution", type=float, default=2.5)
+
+    bed = kinds.add_parser('testbed', help='NDN testbed from a JSON snapshot')
+    bed.add_argument("--snapshot_dir", help="Directory of the snapshot, fetched and saved there when missing",
+                     required=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=getattr(logging, args.log_level.upper()))
+
+    if args.kind in ['waxman', 'hyperbolic'] and np is None:
+        logging.error("NumPy is required for {} graphs".format(args.kind))
+        from sys import exit
+        exit(1)
+
+    if args.kind == 'tree':
+        nodes, links = karyTree(args.k, args.depth)
+    elif args.kind == 'fattree':
+        nodes, links = fatTree(args.k)
+    elif args.kind == 'waxman':
+        nodes, links = waxman(args.nodes, args.alpha, args.beta, args.seed)
+    elif args.kind == 'ba':
+        nodes, links = barabasiAlbert(args.nodes, args.m, args.seed)
+    elif args.kind == 'hyperbolic':
+        nodes, links = hyperbolic(args.nodes, args.degree, args.gamma, args.seed)
+    else:
+        nodes, links = testbed(args.snapshot_dir)
+
+    outputDir = path.abspath(args.output_dir or path.join(path.dirname(__file__), '..', 'topologies', args.kind))
+    linkParams = {'bw': args.bw, 'loss': args.loss, 'delay': args.delay, 'max_queue_number': args.max_queue_number}
+    logging.info("Generating {} topology into {}".format(args.kind, outputDir))
+    start = time.perf_counter()
+    nNodes, nLinks = writeTopology(nodes, links, outputDir, linkParams)
+    logging.info("Wrote {} nodes and {} links in {:.2f}s".format(nNodes, nLinks, time.perf_counter() - start))